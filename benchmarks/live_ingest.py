@@ -0,0 +1,105 @@
+"""
+Live feed ingest benchmark
+Lines per second and per-line update latency of live_feed.LiveAggregates,
+in process and through a followed file, plus snapshot time
+
+The export of the synthetic tree is replayed line by line. The aggregates
+are checked against the batch traffic cube of the same export, so a fast
+but wrong update path does not go unnoticed.
+
+Usage (from the repository root or benchmarks/):
+    python live_ingest.py --scale 10
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+# run_benchmarks puts src/ on sys.path
+from run_benchmarks import RESULTS_DIR, SEED, synthetic_tree, git_commit, load_json, save_json
+
+import processing
+from live_feed import LineParser, LiveAggregates, consume, follow
+from traffic_cube import TrafficCube
+
+INGEST_PATH = os.path.join(RESULTS_DIR, 'live_ingest.json')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest rate of the live till feed')
+    parser.add_argument('--scale', type=float, default=1)
+    args = parser.parse_args()
+
+    print("="*80)
+    print("LIVE FEED INGEST")
+    print("="*80)
+
+    tree = synthetic_tree(args.scale, SEED)
+    os.chdir(os.path.join(tree, 'src'))
+    with open(processing.RAW_PATH) as f:
+        header, *lines = f.readlines()
+    line_parser = LineParser(header)
+    print(f"Scale {args.scale:g}x: {len(lines):,} lines")
+
+    aggregates = LiveAggregates()
+    start = time.perf_counter()
+    for line in lines:
+        aggregates.add(*line_parser.parse(line))
+    in_process_s = time.perf_counter() - start
+
+    latencies = np.empty(min(len(lines), 200_000))
+    sampled = LiveAggregates()
+    clock = time.perf_counter_ns
+    for i, line in enumerate(lines[:len(latencies)]):
+        begin = clock()
+        sampled.add(*line_parser.parse(line))
+        latencies[i] = clock() - begin
+    p50, p99, worst = np.percentile(latencies, [50, 99, 100]) / 1000
+
+    batch = TrafficCube.from_lines(processing.prepare(processing.load_bakery()))
+    live = aggregates.cube()
+    consistent = (np.array_equal(live.dates, batch.dates) and np.array_equal(live.transactions, batch.transactions)
+                  and np.array_equal(live.items, batch.items))
+
+    with tempfile.TemporaryDirectory() as directory:
+        feed = os.path.join(directory, 'till.csv')
+        with open(feed, 'w') as f:
+            f.write(header)
+            f.writelines(lines)
+        followed = LiveAggregates()
+        start = time.perf_counter()
+        consume(follow(feed, poll=0.01, idle=0), followed, snapshot_dir=None)
+        followed_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        aggregates.snapshot(os.path.join(directory, 'snapshot'))
+        snapshot_s = time.perf_counter() - start
+
+    print(f"\n  In process:     {len(lines) / in_process_s:>12,.0f} lines/s")
+    print(f"  Followed file:  {len(lines) / followed_s:>12,.0f} lines/s")
+    print(f"  Per line (parse + update): p50 {p50:.1f} µs, p99 {p99:.1f} µs, max {worst:.1f} µs")
+    print(f"  Snapshot: {snapshot_s * 1000:.0f} ms ({len(aggregates.pair_counts):,} pairs, {len(aggregates.days)} dates)")
+    print(f"  {'✓' if consistent else '✗'} Live traffic cube {'matches' if consistent else 'differs from'} the batch cube")
+
+    history = load_json(INGEST_PATH, [])
+    history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'scale': args.scale,
+        'lines': len(lines),
+        'in_process_per_second': len(lines) / in_process_s,
+        'followed_per_second': len(lines) / followed_s,
+        'p50_us': p50, 'p99_us': p99, 'max_us': worst,
+        'snapshot_s': snapshot_s,
+        'consistent': consistent
+    })
+    save_json(INGEST_PATH, history)
+    print(f"✓ Appended results to: {INGEST_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Parallel mining scaling benchmark
+Times pair + triplet counting with itemsets.count_parallel at increasing
+process counts on synthetic data, checks every result against the serial
+Counter implementation, and reports speedup and parallel efficiency
+
+Usage (from the repository root or benchmarks/):
+    python mining_scaling.py --scale 100 --processes 1,2,4,8
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+# run_benchmarks puts src/ on sys.path
+from run_benchmarks import RESULTS_DIR, SEED, synthetic_tree, git_commit, load_json, save_json
+
+import itemsets
+import processing
+
+SCALING_PATH = os.path.join(RESULTS_DIR, 'mining_scaling.json')
+SIZES = (2, 3)
+
+
+def best_time(func, repeat):
+    """Fastest of `repeat` calls and the result of the last one."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling of shared-memory parallel itemset mining')
+    parser.add_argument('--scale', type=float, default=100)
+    parser.add_argument('--processes', default='1,2,4,8')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-counter-check', action='store_true',
+                        help='do not run the (slow) serial Counter reference')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("PARALLEL MINING SCALING")
+    print("="*80)
+
+    tree = synthetic_tree(args.scale, SEED)
+    os.chdir(os.path.join(tree, 'src'))
+    bakery_df = processing.prepare(processing.load_bakery())
+    items = pd.Index(sorted(bakery_df['Item'].unique()))
+    B = itemsets.basket_incidence(bakery_df, items)
+    print(f"Scale {args.scale:g}x: {B.shape[0]:,} baskets, {B.nnz:,} distinct basket lines, "
+          f"{os.cpu_count()} CPUs available\n")
+
+    serial_time, serial = best_time(
+        lambda: {k: itemsets.count_itemsets(B.indptr, B.indices, len(items), k) for k in SIZES}, args.repeat)
+
+    if not args.skip_counter_check:
+        lists = processing.transaction_item_lists(bakery_df)
+        counter_time, reference = best_time(
+            lambda: (processing.count_pairs(lists), processing.count_triplets(lists)), 1)
+        for k, counter in zip(SIZES, reference):
+            assert itemsets.to_counter(serial[k], items, k) == counter, f"size {k} differs from Counter"
+        print(f"  Counter reference (serial Python): {counter_time:8.3f} s  ✓ identical counts")
+    print(f"  Vectorized, single process:        {serial_time:8.3f} s\n")
+
+    rows = []
+    for processes in [int(p) for p in args.processes.split(',')]:
+        elapsed, counts = best_time(lambda: itemsets.count_parallel(B, SIZES, processes), args.repeat)
+        for k in SIZES:
+            assert (counts[k] != serial[k]).nnz == 0, f"size {k} differs with {processes} processes"
+        rows.append({'processes': processes, 'wall_s': elapsed})
+
+    # Speedups against the single-process run measured above, whatever --processes lists
+    print(f"  {'processes':>9s}  {'wall':>9s}  {'speedup':>8s}  {'efficiency':>10s}")
+    for row in rows:
+        row['speedup'] = serial_time / row['wall_s']
+        row['efficiency'] = row['speedup'] / row['processes']
+        print(f"  {row['processes']:9d}  {row['wall_s']:8.3f}s  {row['speedup']:7.2f}x  {row['efficiency']:9.0%}")
+    print("\n✓ All parallel results identical to the serial counts")
+
+    history = load_json(SCALING_PATH, [])
+    history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'cpus': os.cpu_count(),
+        'scale': args.scale,
+        'serial_s': serial_time,
+        'runs': rows
+    })
+    save_json(SCALING_PATH, history)
+    print(f"✓ Appended results to: {SCALING_PATH}")
+
+
+if __name__ == '__main__':
+    main()
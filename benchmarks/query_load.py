@@ -0,0 +1,133 @@
+"""
+Query service load test
+Starts query_service.py on a free local port and drives it with concurrent
+keep-alive connections for a fixed time, cycling through a mix of queries,
+then reports requests per second and response latency percentiles
+
+The client runs on the same machine and competes with the server for CPU,
+so results are a lower bound for the server on its own.
+
+Usage (from the repository root or benchmarks/, after 00b):
+    python query_load.py --connections 16 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from run_benchmarks import RESULTS_DIR, ROOT, git_commit, load_json, save_json
+
+LOAD_PATH = os.path.join(RESULTS_DIR, 'query_load.json')
+
+QUERIES = [
+    '/hourly?day=Monday',
+    '/hourly?day=Saturday',
+    '/peak?day=Sunday',
+    '/dayparts',
+    '/pairs?daypart=Morning&top=10',
+    '/pairs?daypart=Afternoon&top=5',
+    '/basket-sizes?day=all',
+    '/recommend?items=BREAD&k=3',
+    '/recommend?items=BREAD,TEA&k=3',
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, timeout=120):
+    """Run the service in a subprocess and wait until it prints its address."""
+    server = subprocess.Popen([sys.executable, 'query_service.py', '--port', str(port)],
+                              cwd=os.path.join(ROOT, 'src'), stdout=subprocess.PIPE, text=True)
+    deadline = time.monotonic() + timeout
+    for line in server.stdout:
+        if line.startswith('✓ Serving on'):
+            return server
+        if line.startswith('✗') or time.monotonic() > deadline:
+            break
+    server.kill()
+    raise RuntimeError("query service did not start; has 00b_data_processing.py been run?")
+
+
+async def client(port, offset, stop_at, latencies):
+    """One keep-alive connection sending queries back to back until stop_at."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    requests = [f"GET {query} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode() for query in QUERIES]
+    i = offset
+    errors = 0
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter_ns()
+        writer.write(requests[i % len(requests)])
+        head = await reader.readuntil(b'\r\n\r\n')
+        length = int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter_ns() - start)
+        errors += not head.startswith(b'HTTP/1.1 200')
+        i += 1
+    writer.close()
+    await writer.wait_closed()
+    return errors
+
+
+async def load(port, connections, duration):
+    latencies = []
+    stop_at = time.perf_counter() + duration
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(client(port, c, stop_at, latencies) for c in range(connections)))
+    return time.perf_counter() - start, np.array(latencies), sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Requests per second of the bakery query service')
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("QUERY SERVICE LOAD TEST")
+    print("="*80)
+
+    port = free_port()
+    server = start_server(port)
+    try:
+        asyncio.run(load(port, 1, 0.5))  # warm the per-query cache
+        elapsed, latencies, errors = asyncio.run(load(port, args.connections, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+    per_second = len(latencies) / elapsed
+    p50, p99 = np.percentile(latencies, [50, 99]) / 1000
+    print(f"\n  {len(latencies):,} requests over {args.connections} connections in {elapsed:.1f} s "
+          f"({os.cpu_count()} CPUs shared by client and server)")
+    print(f"  Throughput: {per_second:,.0f} requests/s")
+    print(f"  Latency:    p50 {p50:.0f} µs, p99 {p99:.0f} µs")
+    print(f"  ✗ {errors:,} non-200 responses" if errors else "  ✓ All responses 200")
+
+    history = load_json(LOAD_PATH, [])
+    history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'cpus': os.cpu_count(),
+        'connections': args.connections,
+        'requests': len(latencies),
+        'per_second': per_second,
+        'p50_us': p50, 'p99_us': p99,
+        'errors': errors
+    })
+    save_json(LOAD_PATH, history)
+    print(f"✓ Appended results to: {LOAD_PATH}")
+
+
+if __name__ == '__main__':
+    main()
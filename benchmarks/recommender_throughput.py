@@ -0,0 +1,100 @@
+"""
+Recommender throughput benchmark
+Recommendations per second and per-call latency of recommender.Recommender
+for batches of realistic baskets
+
+Baskets are drawn from the transactions themselves with one item removed,
+i.e. what the till knows just before the last item is scanned.
+
+Usage (from the repository root or benchmarks/):
+    python recommender_throughput.py --scale 10 --batch 100000
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+# run_benchmarks puts src/ on sys.path
+from run_benchmarks import RESULTS_DIR, SEED, synthetic_tree, git_commit, load_json, save_json
+
+import processing
+from recommender import Recommender
+
+THROUGHPUT_PATH = os.path.join(RESULTS_DIR, 'recommender_throughput.json')
+
+
+def sample_baskets(bakery_df, n, seed=SEED):
+    """n partial baskets: real baskets with one random item dropped (single items kept)."""
+    baskets = bakery_df.groupby('Transaction')['Item'].agg(lambda s: sorted(set(s))).tolist()
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(baskets), size=n)
+    drops = rng.random(n)
+    partial = []
+    for pick, drop in zip(picks, drops):
+        basket = baskets[pick]
+        if len(basket) > 1:
+            basket = basket[:int(drop * len(basket))] + basket[int(drop * len(basket)) + 1:]
+        partial.append(basket)
+    return partial
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of the basket recommender')
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--batch', type=int, default=100_000, help='baskets per batch')
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print("="*80)
+    print("RECOMMENDER THROUGHPUT")
+    print("="*80)
+
+    tree = synthetic_tree(args.scale, SEED)
+    os.chdir(os.path.join(tree, 'src'))
+    bakery_df = processing.prepare(processing.load_bakery())
+
+    start = time.perf_counter()
+    recommender = Recommender.from_lines(bakery_df)
+    build_s = time.perf_counter() - start
+    baskets = sample_baskets(bakery_df, args.batch)
+    print(f"Scale {args.scale:g}x: index over {len(recommender.items)} items built in {build_s * 1000:.1f} ms")
+
+    batch_s = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        recommender.recommend_batch(baskets, args.k)
+        batch_s = min(batch_s, time.perf_counter() - start)
+
+    latencies = np.empty(min(len(baskets), 20_000))
+    clock = time.perf_counter_ns
+    for i, basket in enumerate(baskets[:len(latencies)]):
+        start = clock()
+        recommender.recommend(basket, args.k)
+        latencies[i] = clock() - start
+    p50, p99, worst = np.percentile(latencies, [50, 99, 100]) / 1000
+
+    print(f"\n  Batch of {len(baskets):,} baskets: {batch_s:.3f} s "
+          f"→ {len(baskets) / batch_s:,.0f} recommendations/s")
+    print(f"  Per call: p50 {p50:.1f} µs, p99 {p99:.1f} µs, max {worst:.1f} µs")
+
+    history = load_json(THROUGHPUT_PATH, [])
+    history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'scale': args.scale,
+        'batch': len(baskets),
+        'k': args.k,
+        'build_s': build_s,
+        'per_second': len(baskets) / batch_s,
+        'p50_us': p50, 'p99_us': p99, 'max_us': worst
+    })
+    save_json(THROUGHPUT_PATH, history)
+    print(f"✓ Appended results to: {THROUGHPUT_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+"""
+Pipeline benchmarks
+Times every pipeline stage and figure script against synthetic data at
+several scales, recording wall time, peak RSS, peak traced allocation and
+the memory blocks a stage leaves behind
+
+Every measurement runs in a fresh interpreter so peak RSS belongs to one
+stage only. In-process stages (load, features, pairs, ...) build their inputs
+untimed and then time the stage itself; script stages run a whole script from
+src/ against a synthetic data tree. With allocation tracing on, each stage is
+run a second time under tracemalloc so the tracing overhead does not leak into
+the timings.
+
+Usage (from the repository root or benchmarks/):
+    python run_benchmarks.py --scales 1,10
+    python run_benchmarks.py --scales 1,10 --save-baseline
+    python run_benchmarks.py --scales 1,10 --check --threshold 15
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import resource
+import runpy
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+SRC = os.path.join(ROOT, 'src')
+sys.path.insert(0, SRC)
+
+import ingest  # noqa: E402
+import itemsets  # noqa: E402
+import processing  # noqa: E402
+
+DATA_ROOT = os.path.join(ROOT, 'data', 'synthetic', 'bench')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+HISTORY_PATH = os.path.join(RESULTS_DIR, 'history.json')
+BASELINE_PATH = os.path.join(RESULTS_DIR, 'baseline.json')
+
+DEFAULT_SCALES = [1, 10, 100, 1000]
+SEED = 42
+
+# Files copied unchanged from data/raw into every synthetic tree
+STATIC_RAW_FILES = ['edinburgh_weather.csv', 'product_categories.csv', 'item_aliases.csv', 'item_prices.csv']
+
+# Files written by 00b that the figure scripts read
+PIPELINE_OUTPUTS = ['processed_bakery_data.csv', 'transactions.csv', 'traffic_cube.npz',
+                    'item_catalogue.csv', 'pair_revenue.csv']
+
+
+# ============================================================================
+# STAGES
+# ============================================================================
+
+def _prepared():
+    return processing.prepare(processing.load_bakery())
+
+
+def _with_weather():
+    return _prepared(), processing.load_weather()
+
+
+def _ingested():
+    if not os.path.isdir(ingest.INGEST_PATH):
+        ingest.ingest()
+    return ()
+
+
+# name -> (setup, stage); setup output is passed to stage and is not timed
+STAGES = {
+    'load': (lambda: (), lambda: processing.load_bakery()),
+    'ingest': (lambda: (), lambda: ingest.ingest(chunk_rows=ingest.CHUNK_ROWS)),
+    'features': (lambda: (processing.load_bakery(),), processing.prepare),
+    'pairs': (lambda: (processing.transaction_item_lists(_prepared()),), processing.count_pairs),
+    'triplets': (lambda: (processing.transaction_item_lists(_prepared()),), processing.count_triplets),
+    'itemsets_partitioned': (_ingested, lambda: itemsets.count_partitioned(sizes=(2, 3))),
+    'weather_merge': (_with_weather, processing.merge_weather),
+    'temperature_fit': (_with_weather, lambda bakery_df, weather_df: processing.fit_temperature_curve(
+        processing.daily_temperature_table(bakery_df, weather_df))),
+}
+
+# name -> script in src/, run in order; the figure scripts need 00b's outputs
+SCRIPTS = {
+    'pipeline': '00b_data_processing.py',
+    'render_01': '01_create_bakery_visualizations.py',
+    'render_02': '02_create_better_pairing_viz.py',
+    'render_03': '03_analyze_temperature_statistical.py',
+    'render_04': '04_create_weekend_weekday_comparison.py',
+    'render_05': '05_create_supplemental_visualizations.py',
+    'render_06': '06_create_surprising_findings_viz.py',
+}
+
+ALL_STAGES = list(STAGES) + list(SCRIPTS)
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def _stage_callable(name):
+    """The stage callable and its (untimed) arguments."""
+    if name in SCRIPTS:
+        script = os.path.join(SRC, SCRIPTS[name])
+        args = ()
+
+        def stage():
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                try:
+                    runpy.run_path(script, run_name='__main__')
+                except SystemExit as e:
+                    if e.code not in (None, 0):
+                        raise
+    else:
+        setup, stage = STAGES[name]
+        args = setup()
+    return stage, args
+
+
+def worker(name, tree, mode):
+    """Entry point of the measuring subprocess; prints one JSON line."""
+    os.chdir(os.path.join(tree, 'src'))
+    stage, args = _stage_callable(name)
+    gc.collect()
+
+    if mode == 'alloc':
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        stage(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        # Blocks allocated by the stage and still alive when it returns; freed temporaries
+        # never show up in a snapshot diff, their cost is in the peak
+        surviving = sum(s.count_diff for s in after.compare_to(before, 'filename') if s.count_diff > 0)
+        result = {'alloc_peak_mb': peak / 2**20, 'surviving_blocks': surviving}
+    else:
+        setup_rss = _peak_rss_mb()
+        start = time.perf_counter()
+        stage(*args)
+        result = {'wall_s': time.perf_counter() - start,
+                  'setup_rss_mb': setup_rss,
+                  'peak_rss_mb': _peak_rss_mb()}
+    print(json.dumps(result))
+
+
+# ============================================================================
+# DATA TREES
+# ============================================================================
+
+def synthetic_tree(scale, seed=SEED):
+    """
+    data/synthetic/bench/x<scale>/ laid out like the repository, so the
+    scripts' relative ../data paths resolve inside it. The static raw files
+    are copied on every run; the export is regenerated only when the scale
+    or seed changes.
+    """
+    import synthetic
+
+    tree = os.path.join(DATA_ROOT, f'x{scale:g}')
+    for sub in ['src', 'data/raw', 'data/processed', 'visualizations']:
+        os.makedirs(os.path.join(tree, sub), exist_ok=True)
+    for name in STATIC_RAW_FILES:
+        source = os.path.join(ROOT, 'data', 'raw', name)
+        if os.path.exists(source):
+            shutil.copy(source, os.path.join(tree, 'data', 'raw', name))
+
+    marker = os.path.join(tree, 'params.json')
+    params = {'scale': scale, 'seed': seed, 'generator': synthetic.GENERATOR_VERSION}
+    if os.path.exists(marker):
+        with open(marker) as f:
+            if json.load(f) == params:
+                return tree
+
+    print(f"Generating synthetic data at {scale:g}x...")
+    synthetic.generate(os.path.join(tree, 'data', 'raw', 'BreadBasket_DMS.csv'), scale=scale, seed=seed,
+                       raw_path=os.path.join(ROOT, 'data', 'raw', 'BreadBasket_DMS.csv'))
+    with open(marker, 'w') as f:
+        json.dump(params, f)
+    return tree
+
+
+def measure(name, tree, mode, timeout):
+    """Run a worker subprocess for one stage; None on timeout, dict on error."""
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', name, '--tree', tree, '--mode', mode]
+    env = dict(os.environ, MPLBACKEND='Agg')
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        return None
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f'exit {proc.returncode}'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_scale(scale, stages, repeat, trace_alloc, timeout):
+    tree = synthetic_tree(scale)
+    if any(s in SCRIPTS and s != 'pipeline' for s in stages) and 'pipeline' not in stages \
+            and not all(os.path.exists(os.path.join(tree, 'data', 'processed', name))
+                        for name in PIPELINE_OUTPUTS):
+        print("  (running 00b untimed to produce processed data)")
+        measure('pipeline', tree, 'time', timeout)
+
+    results = {}
+    for name in stages:
+        runs = [measure(name, tree, 'time', timeout) for _ in range(repeat)]
+        if any(r is None for r in runs):
+            results[name] = {'status': 'timeout'}
+        elif any('error' in r for r in runs):
+            results[name] = {'status': 'error', 'error': next(r['error'] for r in runs if 'error' in r)}
+        else:
+            best = min(runs, key=lambda r: r['wall_s'])
+            results[name] = dict(best, status='ok', repeats=repeat)
+            if trace_alloc:
+                alloc = measure(name, tree, 'alloc', timeout)
+                if alloc and 'error' not in alloc:
+                    results[name].update(alloc)
+        _print_row(scale, name, results[name])
+    return results
+
+
+# ============================================================================
+# HISTORY AND REGRESSION CHECK
+# ============================================================================
+
+def git_commit():
+    """Short hash of the checked-out commit; None outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_json(path, default):
+    """Contents of a JSON results file, or `default` if there is none."""
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    """Write a JSON results file, creating its directory."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def regressions(run, baseline, threshold, min_seconds):
+    """
+    Stages more than `threshold` percent slower than the baseline.
+
+    Differences below min_seconds are treated as noise. Stages missing from
+    the baseline are skipped; timeouts and errors count as regressions.
+    """
+    flagged = []
+    for scale, stages in run['results'].items():
+        for name, result in stages.items():
+            base = baseline['results'].get(scale, {}).get(name)
+            if not base or base.get('status') != 'ok':
+                continue
+            if result.get('status') != 'ok':
+                flagged.append((scale, name, base['wall_s'], None))
+                continue
+            slower = result['wall_s'] - base['wall_s']
+            if slower > min_seconds and result['wall_s'] > base['wall_s'] * (1 + threshold / 100):
+                flagged.append((scale, name, base['wall_s'], result['wall_s']))
+    return flagged
+
+
+def _print_row(scale, name, result):
+    if result.get('status') != 'ok':
+        print(f"  {scale:>6g}x  {name:22s}  {result.get('status')}  {result.get('error', '')}")
+        return
+    alloc = ''
+    if 'alloc_peak_mb' in result:
+        alloc = f"  alloc peak {result['alloc_peak_mb']:8.1f} MB / {result['surviving_blocks']:,} surviving blocks"
+    print(f"  {scale:>6g}x  {name:22s}  {result['wall_s']:9.3f} s  RSS {result['peak_rss_mb']:8.1f} MB{alloc}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the bakery pipeline on synthetic data')
+    parser.add_argument('--scales', default=','.join(str(s) for s in DEFAULT_SCALES),
+                        help='comma-separated data scales relative to the real export')
+    parser.add_argument('--stages', default=','.join(ALL_STAGES),
+                        help=f"comma-separated subset of: {', '.join(ALL_STAGES)}")
+    parser.add_argument('--repeat', type=int, default=1, help='timing runs per stage (best is kept)')
+    parser.add_argument('--no-alloc', action='store_true', help='skip the tracemalloc run')
+    parser.add_argument('--timeout', type=float, default=1800, help='seconds per stage run')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--check', action='store_true', help='exit 1 if a stage regressed against the baseline')
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='ignore slowdowns smaller than this')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--tree', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', default='time', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.tree, args.mode)
+        return
+
+    scales = [float(s) for s in args.scales.split(',')]
+    stages = [s for s in ALL_STAGES if s in args.stages.split(',')]
+    unknown = set(args.stages.split(',')) - set(ALL_STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    print("="*80)
+    print("PIPELINE BENCHMARKS")
+    print("="*80)
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': {}
+    }
+    for scale in scales:
+        run['results'][f'{scale:g}x'] = run_scale(scale, stages, args.repeat, not args.no_alloc, args.timeout)
+
+    history = load_json(HISTORY_PATH, [])
+    history.append(run)
+    save_json(HISTORY_PATH, history)
+    print(f"\n✓ Appended run to: {HISTORY_PATH}")
+
+    if args.save_baseline:
+        save_json(BASELINE_PATH, run)
+        print(f"✓ Saved baseline to: {BASELINE_PATH}")
+
+    if args.check:
+        baseline = load_json(BASELINE_PATH, None)
+        if baseline is None:
+            print("✗ No baseline stored - run with --save-baseline first")
+            sys.exit(1)
+        flagged = regressions(run, baseline, args.threshold, args.min_seconds)
+        if flagged:
+            print(f"\n✗ {len(flagged)} stage(s) more than {args.threshold:g}% slower than baseline "
+                  f"({baseline['commit']}):")
+            for scale, name, before, after in flagged:
+                now = f"{after:.3f} s" if after is not None else "failed"
+                print(f"  {scale:>7s} {name:22s}: {before:.3f} s -> {now}")
+            sys.exit(1)
+        print(f"\n✓ No regressions above {args.threshold:g}% against baseline ({baseline['commit']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,24 @@ Bakery Analysis
 Market Basket Analysis and Temporal Patterns for Bakery Outlets
 """
 
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
-from collections import Counter
+from baskets import Baskets, basket_matrix, cooccurrence_matrix
+from catalogue import Catalogue, CATALOGUE_PATH
+from processing import (RAW_PATH, load_bakery, load_weather, prepare, classify_daypart, transaction_item_lists,
+                        count_pairs, count_triplets, count_itemsets_parallel, merge_weather)
+from pricing import (PriceTable, PRICES_PATH, PAIR_REVENUE_PATH, add_prices, value_matrix, pair_revenue_table,
+                     daypart_revenue)
+from product_graph import centrality_table, anchor_products
+from recommender import Recommender, INDEX_PATH
+from sequencing import sequencing_profile
+from traffic_cube import TrafficCube, CUBE_PATH
+from transactions import build_transactions, save_transactions
+from instrument import step
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -21,12 +33,13 @@ print()
 # 1. LOAD AND PREPARE DATA
 # ============================================================================
 
+step('load')
 print("Step 1: Loading Bakery Sales Data")
 print("-"*80)
 
 try:
     # Load bakery data
-    bakery_df = pd.read_csv('../data/raw/BreadBasket_DMS.csv')
+    bakery_df = load_bakery()
     print(f"✓ Loaded bakery data: {len(bakery_df):,} records")
     print(f"  Columns: {list(bakery_df.columns)}")
 
@@ -35,7 +48,7 @@ try:
     print(bakery_df.head())
 
 except FileNotFoundError:
-    print("✗ Error: ../data/raw/BreadBasket_DMS.csv not found")
+    print(f"✗ Error: {RAW_PATH} not found")
     print("\nPlease download the dataset:")
     print("1. Visit: https://www.kaggle.com/datasets/akashdeepkuila/bakery")
     print("2. Download and extract to ../data/raw/ directory")
@@ -44,8 +57,7 @@ except FileNotFoundError:
 
 # Load weather data
 try:
-    weather_df = pd.read_csv('../data/raw/edinburgh_weather.csv')
-    weather_df['timestamp'] = pd.to_datetime(weather_df['timestamp'])
+    weather_df = load_weather()
     print(f"\n✓ Loaded weather data: {len(weather_df):,} hourly records")
 except:
     print("\n⚠ Weather data not found, continuing without weather analysis")
@@ -57,61 +69,36 @@ print()
 # 2. DATA PREPARATION
 # ============================================================================
 
+step('preparation')
 print("Step 2: Data Preparation and Feature Engineering")
 print("-"*80)
 
-# Rename columns to standard names
-if 'TransactionNo' in bakery_df.columns:
-    bakery_df.rename(columns={'TransactionNo': 'Transaction'}, inplace=True)
-if 'Items' in bakery_df.columns:
-    bakery_df.rename(columns={'Items': 'Item'}, inplace=True)
-
-# Parse datetime
-if 'DateTime' in bakery_df.columns:
-    bakery_df['DateTime'] = pd.to_datetime(bakery_df['DateTime'])
-elif 'Date' in bakery_df.columns and 'Time' in bakery_df.columns:
-    bakery_df['DateTime'] = pd.to_datetime(bakery_df['Date'] + ' ' + bakery_df['Time'])
-else:
-    print("✗ Error: No datetime column found")
+# Standard column names, temporal features, 15-minute intervals, dayparts
+# and canonical item names with int codes (NONE / empty lines removed)
+try:
+    bakery_df = prepare(bakery_df)
+except ValueError as e:
+    print(f"✗ Error: {e}")
     exit(1)
 
-# Extract temporal features
-bakery_df['Date'] = bakery_df['DateTime'].dt.date
-bakery_df['Year'] = bakery_df['DateTime'].dt.year
-bakery_df['Month'] = bakery_df['DateTime'].dt.month
-bakery_df['MonthName'] = bakery_df['DateTime'].dt.month_name()
-bakery_df['DayOfWeek'] = bakery_df['DateTime'].dt.dayofweek
-bakery_df['DayName'] = bakery_df['DateTime'].dt.day_name()
-bakery_df['Hour'] = bakery_df['DateTime'].dt.hour
-bakery_df['Minute'] = bakery_df['DateTime'].dt.minute
-bakery_df['TimeOfDay'] = bakery_df['Hour'] + bakery_df['Minute']/60
-bakery_df['IsWeekend'] = bakery_df['DayOfWeek'].isin([5, 6])
-
-# Create 15-minute intervals
-bakery_df['QuarterHour'] = (bakery_df['Hour'] * 4 + bakery_df['Minute'] // 15) / 4
-
-# Daypart classification
-def classify_daypart(hour):
-    if 5 <= hour < 12:
-        return 'Morning'
-    elif 12 <= hour < 17:
-        return 'Afternoon'
-    elif 17 <= hour < 21:
-        return 'Evening'
-    else:
-        return 'Night'
-
-bakery_df['DayPart'] = bakery_df['Hour'].apply(classify_daypart)
-
-# Clean item names
-bakery_df['Item'] = bakery_df['Item'].str.strip().str.upper()
-
-# Remove "NONE" and empty items
-bakery_df = bakery_df[bakery_df['Item'] != 'NONE']
-bakery_df = bakery_df[bakery_df['Item'].notna()]
+# Item dictionary of the cleaned lines: canonical names and their ItemCode
+catalogue = Catalogue.from_items(bakery_df['Item'])
+
+# Unit price of every line by item code and date (optional price table)
+prices = PriceTable.load(catalogue)
+if prices is not None:
+    add_prices(bakery_df, prices)
+else:
+    print(f"⚠ No price table at {PRICES_PATH}, continuing without revenue figures")
+
+# One row per basket for all basket-level questions (with BasketValue when priced)
+transactions_df = build_transactions(bakery_df)
+
+# Transactions / items per date and quarter hour for the day × time profiles
+traffic = TrafficCube.from_lines(bakery_df)
 
 print(f"Clean records: {len(bakery_df):,}")
-print(f"Unique transactions: {bakery_df['Transaction'].nunique():,}")
+print(f"Unique transactions: {len(transactions_df):,}")
 print(f"Unique items: {bakery_df['Item'].nunique():,}")
 print(f"Date range: {bakery_df['DateTime'].min()} to {bakery_df['DateTime'].max()}")
 
@@ -121,6 +108,7 @@ print()
 # 3. TEMPORAL ANALYSIS - MINUTE-LEVEL GRANULARITY
 # ============================================================================
 
+step('temporal_patterns')
 print("="*80)
 print("ANALYSIS 1: TEMPORAL PATTERNS (MINUTE-LEVEL GRANULARITY)")
 print("="*80)
@@ -130,12 +118,10 @@ print("\nTransactions by Day of Week:")
 print("-"*60)
 
 day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-dow_analysis = bakery_df.groupby(['DayName', 'Transaction']).size().reset_index(name='items_per_trans')
-dow_counts = dow_analysis.groupby('DayName').agg({
-    'Transaction': 'count',
-    'items_per_trans': 'mean'
-}).reset_index()
-dow_counts.columns = ['DayName', 'NumTransactions', 'AvgItemsPerTransaction']
+dow_counts = transactions_df.groupby('DayName').agg(
+    NumTransactions=('Transaction', 'count'),
+    AvgItemsPerTransaction=('BasketSize', 'mean')
+).reset_index()
 
 dow_counts['DayName'] = pd.Categorical(dow_counts['DayName'], categories=day_order, ordered=True)
 dow_counts = dow_counts.sort_values('DayName')
@@ -159,7 +145,7 @@ print(f"  Weekend lift: {weekend_lift:+.1f}%")
 print("\n\nHourly Patterns (15-minute intervals):")
 print("-"*60)
 
-quarter_analysis = bakery_df.groupby('QuarterHour')['Transaction'].nunique().reset_index()
+quarter_analysis = traffic.by_quarter().reset_index()
 quarter_analysis.columns = ['QuarterHour', 'NumTransactions']
 
 # Find peak quarter hour
@@ -181,7 +167,8 @@ for _, row in top_quarters.iterrows():
 print("\n\nDaypart Performance:")
 print("-"*60)
 
-daypart_analysis = bakery_df.groupby('DayPart')['Transaction'].nunique().reset_index()
+hourly_totals = traffic.by_hour()
+daypart_analysis = hourly_totals.groupby(classify_daypart(hourly_totals.index)).sum().reset_index()
 daypart_analysis.columns = ['DayPart', 'NumTransactions']
 daypart_order = ['Morning', 'Afternoon', 'Evening', 'Night']
 daypart_analysis['DayPart'] = pd.Categorical(daypart_analysis['DayPart'], categories=daypart_order, ordered=True)
@@ -197,6 +184,7 @@ print()
 # 4. MARKET BASKET ANALYSIS
 # ============================================================================
 
+step('market_basket')
 print("="*80)
 print("ANALYSIS 2: MARKET BASKET ANALYSIS (Products Bought Together)")
 print("="*80)
@@ -213,7 +201,7 @@ for i, (item, count) in enumerate(item_counts.items(), 1):
 print("\n\nBasket Size Distribution:")
 print("-"*60)
 
-basket_sizes = bakery_df.groupby('Transaction').size()
+basket_sizes = transactions_df['BasketSize']
 print(f"Average basket size: {basket_sizes.mean():.2f} items")
 print(f"Median basket size: {basket_sizes.median():.0f} items")
 print(f"Max basket size: {basket_sizes.max()} items")
@@ -229,18 +217,16 @@ for size, count in basket_dist.head(10).items():
 print("\n\nProduct Pairing Analysis:")
 print("-"*60)
 
-# Create transaction-item matrix
-transactions_items = bakery_df.groupby('Transaction')['Item'].apply(list).reset_index()
-
 # Find frequent pairs
-from itertools import combinations
-pair_counts = Counter()
-
-for items in transactions_items['Item']:
-    if len(items) >= 2:
-        # Get all 2-item combinations
-        for pair in combinations(sorted(set(items)), 2):
-            pair_counts[pair] += 1
+# BAKERY_PROCESSES > 1 mines pairs and triplets on a process pool; the counts
+# are identical, only equally frequent itemsets may be listed in another order
+mining_processes = int(os.environ.get('BAKERY_PROCESSES', '1'))
+if mining_processes > 1:
+    pair_counts, triplet_counts = count_itemsets_parallel(bakery_df, mining_processes)
+else:
+    transactions_items = transaction_item_lists(bakery_df, catalogue)
+    pair_counts = count_pairs(transactions_items)
+    triplet_counts = count_triplets(transactions_items)
 
 # Top 15 product pairs
 print("Top 15 Product Pairs (Frequently Bought Together):")
@@ -248,23 +234,56 @@ top_pairs = pair_counts.most_common(15)
 
 for i, (pair, count) in enumerate(top_pairs, 1):
     # Calculate support
-    total_trans = bakery_df['Transaction'].nunique()
+    total_trans = len(transactions_df)
     support = count / total_trans * 100
     print(f"  {i:2d}. {pair[0][:25]:25s} + {pair[1][:25]:25s}: {count:4,} times ({support:.1f}%)")
 
 # Product triplets for cross-selling
 print("\n\nTop 10 Product Triplets (3 items bought together):")
-triplet_counts = Counter()
-
-for items in transactions_items['Item']:
-    if len(items) >= 3:
-        for triplet in combinations(sorted(set(items)), 3):
-            triplet_counts[triplet] += 1
-
 top_triplets = triplet_counts.most_common(10)
 for i, (triplet, count) in enumerate(top_triplets, 1):
     print(f"  {i:2d}. {triplet[0][:20]:20s} + {triplet[1][:20]:20s} + {triplet[2][:20]:20s}: {count:3,} times")
 
+# Product centrality over the full co-occurrence graph
+print("\n\nProduct Centrality (Co-occurrence Graph):")
+print("-"*60)
+
+basket_incidence, basket_items, _ = basket_matrix(bakery_df, catalogue=catalogue)
+cooccurrence = cooccurrence_matrix(basket_incidence)
+centrality_df = centrality_table(cooccurrence, basket_items)
+
+for _, row in centrality_df.head(10).iterrows():
+    print(f"  {row['Rank']:2d}. {row['Item'][:25]:25s}: PageRank {row['PageRank']:.3f}, "
+          f"betweenness {row['Betweenness']:.3f}, community {row['Community']}")
+
+print(f"\n✓ Anchor product: {anchor_products(centrality_df)[0]} "
+      f"({centrality_df['Community'].nunique()} product communities)")
+
+# Per-item top-k consequents for till recommendations
+recommender = Recommender.from_cooccurrence(cooccurrence, basket_items, basket_incidence.shape[0])
+
+# Revenue next to the counts: what each pair and daypart takes at the till
+pair_revenue_df = None
+if prices is not None:
+    print("\n\nRevenue-Weighted Pairs and Dayparts:")
+    print("-"*60)
+
+    baskets = Baskets.from_lines(bakery_df, catalogue=catalogue)
+    pair_revenue_df = pair_revenue_table(basket_incidence, value_matrix(baskets, bakery_df['Price']), basket_items)
+    unpriced = bakery_df['Price'].isna()
+    print(f"Revenue: £{bakery_df['Price'].sum():,.2f}, £{transactions_df['BasketValue'].mean():.2f} per basket "
+          f"({unpriced.sum():,} unpriced lines)")
+
+    print("\nTop pairs by revenue:")
+    for row in pair_revenue_df.sort_values('Revenue', ascending=False).head(10).itertuples(index=False):
+        print(f"  {row.Product1[:20]:20s} + {row.Product2[:20]:20s}: £{row.Revenue:>8,.2f} "
+              f"({row.Count:,} baskets, £{row.RevenuePerBasket:.2f} per basket)")
+
+    print("\nRevenue by daypart:")
+    for daypart, row in daypart_revenue(transactions_df).iterrows():
+        print(f"  {daypart:10s}: £{row['Revenue']:>9,.2f} ({row['RevenueShare']:.1%}), "
+              f"£{row['AvgBasketValue']:.2f} per basket")
+
 print()
 
 # ============================================================================
@@ -272,23 +291,13 @@ print()
 # ============================================================================
 
 if weather_df is not None:
+    step('weather_impact')
     print("="*80)
     print("ANALYSIS 3: WEATHER IMPACT ON BAKERY SALES")
     print("="*80)
 
-    # Merge with weather
-    bakery_df['Date_dt'] = pd.to_datetime(bakery_df['Date'])
-    weather_df['Date'] = weather_df['timestamp'].dt.date
-
     # Hourly merge
-    bakery_df['DateHour'] = bakery_df['DateTime'].dt.floor('H')
-    weather_df['DateHour'] = weather_df['timestamp'].dt.floor('H')
-
-    merged_df = bakery_df.merge(
-        weather_df[['DateHour', 'temperature', 'precipitation', 'humidity']],
-        on='DateHour',
-        how='left'
-    )
+    merged_df = merge_weather(bakery_df, weather_df)
 
     print(f"\nMerged {merged_df['temperature'].notna().sum():,} records with weather data")
 
@@ -331,14 +340,14 @@ if weather_df is not None:
 # 6. DAY-OF-WEEK × TIME-OF-DAY ANALYSIS
 # ============================================================================
 
+step('day_time')
 print("="*80)
 print("ANALYSIS 4: DAY × TIME INTERACTION PATTERNS")
 print("="*80)
 
 # Create heatmap data
-heatmap_data = bakery_df.groupby(['DayName', 'Hour'])['Transaction'].nunique().reset_index()
-heatmap_pivot = heatmap_data.pivot(index='DayName', columns='Hour', values='Transaction')
-heatmap_pivot = heatmap_pivot.reindex(day_order)
+heatmap_pivot = traffic.weekday_hour()
+heatmap_pivot = heatmap_pivot.where(heatmap_pivot > 0).set_axis(day_order)
 
 print("\nBusiest Hour by Day of Week:")
 print("-"*60)
@@ -356,31 +365,31 @@ print()
 # 7. PRODUCT SEQUENCING ANALYSIS
 # ============================================================================
 
+step('sequencing')
 print("="*80)
 print("ANALYSIS 5: PRODUCT SEQUENCING (What's Bought First)")
 print("="*80)
 
-# For each transaction, identify first item (earliest in item list or random if simultaneous)
-first_items = bakery_df.sort_values(['Transaction', 'DateTime']).groupby('Transaction')['Item'].first()
+# Position of every item within its basket (first line of a basket = entry product)
+sequence_profile = sequencing_profile(bakery_df)
 
 print("\nTop 15 'First Purchase' Items (Entry Products):")
 print("-"*60)
 
-first_item_counts = first_items.value_counts().head(15)
-total_first = len(first_items)
+first_item_counts = sequence_profile['Pos1'].sort_values(ascending=False, kind='stable').head(15)
+total_first = sequence_profile['Pos1'].sum()
 
 for i, (item, count) in enumerate(first_item_counts.items(), 1):
     pct = count / total_first * 100
     print(f"  {i:2d}. {item[:45]:45s}: {count:4,} times ({pct:.1f}%)")
 
 # Items that are never first (always added to basket)
-all_items = set(bakery_df['Item'].unique())
-first_item_set = set(first_items.unique())
-add_on_items = all_items - first_item_set
+add_on_profile = sequence_profile[sequence_profile['Pos1'] == 0]
+add_on_items = set(add_on_profile.index)
 
 if add_on_items:
     print(f"\n\nAdd-On Items (Never bought first): {len(add_on_items)} items")
-    add_on_counts = bakery_df[bakery_df['Item'].isin(add_on_items)]['Item'].value_counts().head(10)
+    add_on_counts = add_on_profile['Total'].head(10)
     for item, count in add_on_counts.items():
         print(f"  - {item[:45]:45s}: {count:,} total sales (never first)")
 
@@ -390,6 +399,7 @@ print()
 # 8. KEY INSIGHTS SUMMARY
 # ============================================================================
 
+step('summary')
 print("="*80)
 print("KEY INSIGHTS FOR AOFRIO BAKERY OUTLETS")
 print("="*80)
@@ -411,7 +421,7 @@ DATA PROCESSING SUMMARY:
     num_pairs=len(pair_counts),
     num_triplets=len(triplet_counts),
     num_addon=len(add_on_items),
-    total_trans=bakery_df['Transaction'].nunique(),
+    total_trans=len(transactions_df),
     unique_items=bakery_df['Item'].nunique(),
     date_range=f"{bakery_df['DateTime'].min().date()} to {bakery_df['DateTime'].max().date()}",
     weather_status="Yes" if weather_df is not None else "No"
@@ -421,10 +431,23 @@ print("="*80)
 print("ANALYSIS COMPLETE - Ready for visualization")
 print("="*80)
 
+step('write_csv')
 # Save processed data
 bakery_df.to_csv('../data/processed/processed_bakery_data.csv', index=False)
 print("\n✓ Saved processed data to: ../data/processed/processed_bakery_data.csv")
 
+# Save the item catalogue so later scripts use the same names and codes
+catalogue.save(CATALOGUE_PATH)
+print(f"✓ Saved item catalogue to: {CATALOGUE_PATH}")
+
+# Save transaction-level table for downstream scripts
+save_transactions(transactions_df)
+print("✓ Saved transaction table to: ../data/processed/transactions.csv")
+
+# Save date × quarter-hour traffic cube
+traffic.save(CUBE_PATH)
+print(f"✓ Saved traffic cube to: {CUBE_PATH}")
+
 # Save product pairs for visualization
 pairs_df = pd.DataFrame(top_pairs, columns=['Products', 'Count'])
 pairs_df['Product1'] = pairs_df['Products'].apply(lambda x: x[0])
@@ -432,3 +455,19 @@ pairs_df['Product2'] = pairs_df['Products'].apply(lambda x: x[1])
 pairs_df = pairs_df[['Product1', 'Product2', 'Count']]
 pairs_df.to_csv('../data/processed/product_pairs.csv', index=False)
 print("✓ Saved product pairs to: ../data/processed/product_pairs.csv")
+
+# Save revenue-weighted pairs
+if pair_revenue_df is not None:
+    pair_revenue_df.to_csv(PAIR_REVENUE_PATH, index=False)
+    print(f"✓ Saved pair revenue to: {PAIR_REVENUE_PATH}")
+elif os.path.exists(PAIR_REVENUE_PATH):
+    # Revenue of an earlier run with prices would no longer match the data
+    os.remove(PAIR_REVENUE_PATH)
+
+# Save product centrality ranking
+centrality_df.to_csv('../data/processed/product_centrality.csv', index=False)
+print("✓ Saved product centrality to: ../data/processed/product_centrality.csv")
+
+# Save recommender index
+recommender.save(INDEX_PATH)
+print(f"✓ Saved recommender index to: {INDEX_PATH}")
@@ -8,17 +8,24 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import networkx as nx
 from matplotlib.patches import Rectangle
+from processing import classify_daypart
+from traffic_cube import TrafficCube
+from transactions import load_transactions
+from instrument import step
 import warnings
 warnings.filterwarnings('ignore')
 
+step('load')
 print("Loading processed bakery data...")
 
 try:
     df = pd.read_csv('../data/processed/processed_bakery_data.csv')
     df['DateTime'] = pd.to_datetime(df['DateTime'])
-    print(f"✓ Loaded {len(df):,} transaction records")
+    transactions_df = load_transactions()
+    traffic = TrafficCube.load()
+    print(f"✓ Loaded {len(df):,} transaction records ({len(transactions_df):,} baskets)")
 except FileNotFoundError:
-    print("✗ Error: processed_bakery_data.csv not found")
+    print("✗ Error: processed_bakery_data.csv, transactions.csv or traffic_cube.npz not found")
     print("Please run bakery_market_basket_analysis.py first")
     exit(1)
 
@@ -33,6 +40,7 @@ print("Creating visualizations...\n")
 # ============================================================================
 # VIZ 1: 15-Minute Granularity Heatmap (Day × Time)
 # ============================================================================
+step('viz1_temporal_heatmap')
 
 print("1. Creating minute-level temporal heatmap...")
 
@@ -40,9 +48,8 @@ fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12))
 
 # Day of week × Hour heatmap
 day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-heatmap_data = df.groupby(['DayName', 'Hour'])['Transaction'].nunique().reset_index()
-heatmap_pivot = heatmap_data.pivot(index='DayName', columns='Hour', values='Transaction')
-heatmap_pivot = heatmap_pivot.reindex(day_order)
+heatmap_pivot = traffic.weekday_hour()
+heatmap_pivot = heatmap_pivot.where(heatmap_pivot > 0).set_axis(day_order).rename_axis('DayName')
 
 sns.heatmap(heatmap_pivot, annot=False, cmap='YlOrRd', ax=ax1,
             cbar_kws={'label': 'Number of Transactions'})
@@ -52,7 +59,7 @@ ax1.set_xlabel('Hour of Day', fontsize=12, fontweight='bold')
 ax1.set_ylabel('Day of Week', fontsize=12, fontweight='bold')
 
 # Hourly pattern across all days
-hourly_pattern = df.groupby('Hour')['Transaction'].nunique()
+hourly_pattern = traffic.by_hour()
 
 ax2.bar(hourly_pattern.index, hourly_pattern.values, color='#2ecc71', alpha=0.8, edgecolor='darkgreen')
 ax2.set_xlabel('Hour of Day', fontsize=12, fontweight='bold')
@@ -79,6 +86,7 @@ plt.close()
 # ============================================================================
 # VIZ 2: Market Basket - Product Pairing Network
 # ============================================================================
+step('viz2_pairing_network')
 
 print("2. Creating product pairing network graph...")
 
@@ -141,13 +149,14 @@ except Exception as e:
 # ============================================================================
 # VIZ 3: Daypart Performance Comparison
 # ============================================================================
+step('viz3_daypart')
 
 print("3. Creating daypart performance analysis...")
 
 fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
 
 # Daypart distribution
-daypart_trans = df.groupby('DayPart')['Transaction'].nunique()
+daypart_trans = hourly_pattern.groupby(classify_daypart(hourly_pattern.index)).sum()
 daypart_order = ['Morning', 'Afternoon', 'Evening', 'Night']
 daypart_trans = daypart_trans.reindex(daypart_order, fill_value=0)
 
@@ -165,11 +174,8 @@ for bar, val in zip(bars, daypart_trans.values):
              f'{int(val):,}', ha='center', va='bottom', fontsize=11, fontweight='bold')
 
 # Weekend vs Weekday
-weekend_data = df[df['IsWeekend'] == True]
-weekday_data = df[df['IsWeekend'] == False]
-
-weekend_trans = weekend_data.groupby('Hour')['Transaction'].nunique()
-weekday_trans = weekday_data.groupby('Hour')['Transaction'].nunique()
+weekend_trans = traffic.by_hour(traffic.is_weekend)
+weekday_trans = traffic.by_hour(~traffic.is_weekend)
 
 ax2.plot(weekend_trans.index, weekend_trans.values, marker='o', linewidth=2.5,
          markersize=7, label='Weekend', color='#e74c3c')
@@ -209,13 +215,14 @@ plt.close()
 # ============================================================================
 # VIZ 4: Basket Size and Product Affinity Matrix
 # ============================================================================
+step('viz4_basket_affinity')
 
 print("4. Creating basket analysis and affinity matrix...")
 
 fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
 
 # Basket size distribution
-basket_sizes = df.groupby('Transaction')['Item'].count()
+basket_sizes = transactions_df['BasketSize']
 basket_dist = basket_sizes.value_counts().sort_index().head(15)
 
 bars = ax1.bar(basket_dist.index, basket_dist.values, color='#2ecc71', alpha=0.8, edgecolor='darkgreen')
@@ -7,9 +7,14 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.patches import Rectangle, FancyBboxPatch
+from baskets import basket_matrix, cooccurrence_matrix
+from categories import load_taxonomy, category_matrix, category_cooccurrence, category_pair_table
+from transactions import transaction_summary, entry_product_metrics
+from instrument import step
 import warnings
 warnings.filterwarnings('ignore')
 
+step('load')
 print("Loading product pairing data...")
 
 # Load the pairing data
@@ -27,6 +32,7 @@ plt.rcParams['font.family'] = 'sans-serif'
 # ============================================================================
 # VISUALIZATION 1: Clean Bar Chart of Top Product Pairs
 # ============================================================================
+step('pairing_bar_chart')
 
 print("Creating Visualization 1: Top Product Pairs Bar Chart...")
 
@@ -83,6 +89,7 @@ plt.close()
 # ============================================================================
 # VISUALIZATION 2: Product Affinity Matrix (Heatmap Style)
 # ============================================================================
+step('affinity_heatmap')
 
 print("Creating Visualization 2: Product Affinity Heatmap...")
 
@@ -129,6 +136,7 @@ plt.close()
 # ============================================================================
 # VISUALIZATION 3: Sankey-Style Flow Diagram
 # ============================================================================
+step('pairing_flow')
 
 print("Creating Visualization 3: Product Pairing Flow Chart...")
 
@@ -219,6 +227,7 @@ plt.close()
 # ============================================================================
 # VISUALIZATION 4: Coffee-Centric Radial Chart
 # ============================================================================
+step('coffee_radial')
 
 print("Creating Visualization 4: Coffee-Centric Product Pairs...")
 
@@ -279,32 +288,26 @@ plt.close()
 # ============================================================================
 # VISUALIZATION 5: Grouped Product Categories
 # ============================================================================
+step('category_analysis')
 
 print("Creating Visualization 5: Product Pairing by Category...")
 
 fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
 
-# Define product categories
-categories = {
-    'Hot Drinks': ['COFFEE', 'TEA', 'HOT CHOCOLATE'],
-    'Baked Goods': ['BREAD', 'CAKE', 'PASTRY', 'MUFFIN', 'SCONE', 'TOAST', 'BROWNIE'],
-    'Lunch Items': ['SANDWICH', 'SOUP', 'SALAD'],
-    'Sweets': ['COOKIES', 'TRUFFLES', 'ALFAJORES', 'MEDIALUNA']
-}
+# Product categories come from the taxonomy file (../data/raw/product_categories.csv)
+taxonomy = load_taxonomy()
+
+# Category pairing = Cᵀ · P · C over the complete item pair matrix
+basket_incidence, basket_items, _ = basket_matrix(bakery_df)
+item_pairs = cooccurrence_matrix(basket_incidence)
+category_membership, category_names = category_matrix(basket_items, taxonomy)
+category_pairs_df = category_pair_table(category_cooccurrence(item_pairs, category_membership), category_names)
 
-# Analyze pairing patterns between categories
 cat_pairs = {}
-for cat1, prods1 in categories.items():
-    for cat2, prods2 in categories.items():
-        if cat1 <= cat2:  # Avoid duplicates
-            count = 0
-            for _, row in pairs_df.iterrows():
-                if ((row['Product1'] in prods1 and row['Product2'] in prods2) or
-                    (row['Product1'] in prods2 and row['Product2'] in prods1)):
-                    count += row['Count']
-            if count > 0:
-                key = f"{cat1} +\n{cat2}" if cat1 != cat2 else cat1
-                cat_pairs[key] = count
+for row in category_pairs_df.itertuples():
+    cat1, cat2 = sorted([row.Category1, row.Category2])
+    key = f"{cat1} +\n{cat2}" if cat1 != cat2 else cat1
+    cat_pairs[key] = row.Count
 
 # Plot 1: Category pairing frequencies
 sorted_cats = sorted(cat_pairs.items(), key=lambda x: x[1], reverse=True)[:10]
@@ -331,20 +334,21 @@ ax2.set_ylabel('Total Sales', fontsize=11, fontweight='bold')
 ax2.set_title('Top 10 Individual Products', fontsize=12, fontweight='bold')
 ax2.grid(True, alpha=0.3, axis='y')
 
-# Plot 3: Basket size by entry product
-entry_products = ['COFFEE', 'BREAD', 'TEA', 'CAKE', 'SANDWICH']
-basket_sizes = []
-for prod in entry_products:
-    # Get transactions that start with this product
-    avg_size = bakery_df[bakery_df['Item'] == prod].groupby('Transaction').size().mean()
-    basket_sizes.append(avg_size if not pd.isna(avg_size) else 0)
+# Plot 3: Basket size by entry product (first item of the basket, whole-basket size)
+txn_summary = transaction_summary(bakery_df)
+entry_metrics = entry_product_metrics(txn_summary)
+top_entry_metrics = entry_metrics.head(5)
+entry_products = top_entry_metrics.index.tolist()
+basket_sizes = top_entry_metrics['AvgBasketSize'].tolist()
+overall_avg_basket = txn_summary['BasketSize'].mean()
 
 bars3 = ax3.bar(range(len(entry_products)), basket_sizes, color='lightgreen', alpha=0.8, edgecolor='black')
 ax3.set_xticks(range(len(entry_products)))
 ax3.set_xticklabels(entry_products, fontsize=10)
 ax3.set_ylabel('Average Basket Size', fontsize=11, fontweight='bold')
 ax3.set_title('Average Basket Size When Starting With Each Product', fontsize=12, fontweight='bold')
-ax3.axhline(y=2.17, color='red', linestyle='--', linewidth=2, label='Overall Average (2.17)')
+ax3.axhline(y=overall_avg_basket, color='red', linestyle='--', linewidth=2,
+            label=f'Overall Average ({overall_avg_basket:.2f})')
 ax3.legend(fontsize=9)
 ax3.grid(True, alpha=0.3, axis='y')
 
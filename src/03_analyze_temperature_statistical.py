@@ -7,47 +7,35 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
-from scipy.optimize import curve_fit
+from processing import (load_bakery, load_weather, standardise_columns, daily_temperature_table,
+                        fit_temperature_curve, quadratic)
+from catalogue import Catalogue
+from instrument import step
 import warnings
 warnings.filterwarnings('ignore')
 
+step('load')
 print("Loading data...")
-bakery_df = pd.read_csv('../data/raw/BreadBasket_DMS.csv')
-if 'TransactionNo' in bakery_df.columns:
-    bakery_df.rename(columns={'TransactionNo': 'Transaction'}, inplace=True)
-if 'Items' in bakery_df.columns:
-    bakery_df.rename(columns={'Items': 'Item'}, inplace=True)
-if 'DateTime' in bakery_df.columns:
-    bakery_df['DateTime'] = pd.to_datetime(bakery_df['DateTime'])
+bakery_df = standardise_columns(load_bakery())
 
 bakery_df['Date'] = bakery_df['DateTime'].dt.date
 bakery_df['DayOfWeek'] = bakery_df['DateTime'].dt.dayofweek
-bakery_df = bakery_df[bakery_df['Item'] != 'NONE'].copy()
+# Canonical item names and codes of 00b (NONE lines dropped)
+catalogue = Catalogue.load()
+bakery_df = catalogue.clean(bakery_df)
 
 # Load weather
-weather_df = pd.read_csv('../data/raw/edinburgh_weather.csv')
-weather_df['DateTime'] = pd.to_datetime(weather_df['timestamp'])
-weather_df['Date'] = weather_df['DateTime'].dt.date
-
-# Daily aggregates
-bakery_daily = bakery_df.groupby('Date').agg({
-    'Transaction': 'nunique',
-    'Item': 'count',
-    'DayOfWeek': 'first'
-}).reset_index()
-bakery_daily.columns = ['Date', 'Transactions', 'Items', 'DayOfWeek']
-
-weather_daily = weather_df.groupby('Date')['temperature'].mean().reset_index()
-weather_daily.columns = ['Date', 'AvgTemp']
+weather_df = load_weather()
 
-# Merge
-merged_df = bakery_daily.merge(weather_daily, on='Date', how='inner')
+# Daily aggregates merged with mean daily temperature
+merged_df = daily_temperature_table(bakery_df, weather_df)
 print(f"Merged data: {len(merged_df)} days")
 
 print("\n" + "="*80)
 print("STATISTICAL ANALYSIS: Temperature vs Transactions")
 print("="*80)
 
+step('statistics')
 # 1. Basic statistics
 print("\nTemperature range:", merged_df['AvgTemp'].min(), "to", merged_df['AvgTemp'].max(), "°C")
 print("Transaction range:", merged_df['Transactions'].min(), "to", merged_df['Transactions'].max())
@@ -56,17 +44,8 @@ print("Transaction range:", merged_df['Transactions'].min(), "to", merged_df['Tr
 correlation = merged_df['AvgTemp'].corr(merged_df['Transactions'])
 print(f"\nPearson correlation: {correlation:.3f}")
 
-# 3. Fit quadratic curve to find optimal temperature
-def quadratic(x, a, b, c):
-    return a * x**2 + b * x + c
-
-# Fit curve
-params, _ = curve_fit(quadratic, merged_df['AvgTemp'], merged_df['Transactions'])
-a, b, c = params
-
-# Find optimal temperature (vertex of parabola)
-optimal_temp = -b / (2 * a)
-optimal_txns = quadratic(optimal_temp, a, b, c)
+# 3. Fit quadratic curve to find optimal temperature (vertex of parabola)
+(a, b, c), optimal_temp, optimal_txns = fit_temperature_curve(merged_df)
 
 print(f"\nQUADRATIC FIT ANALYSIS:")
 print(f"  Optimal temperature: {optimal_temp:.1f}°C")
@@ -114,6 +93,7 @@ for i in range(7):
     if i in dow_stats.index:
         print(f"  {days[i]}: {dow_stats.loc[i, 'mean']:.1f} avg txns ({dow_stats.loc[i, 'count']:.0f} days)")
 
+step('temperature_figure')
 # 7. Create detailed visualization
 fig, axes = plt.subplots(2, 2, figsize=(16, 12))
 fig.suptitle('Statistical Analysis: Temperature Sweet Spot', fontsize=16, fontweight='bold')
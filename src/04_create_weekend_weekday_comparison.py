@@ -2,44 +2,35 @@
 Weekend vs Weekday comparison visualization
 """
 
-import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+from contrasts import CohortContrast
+from traffic_cube import TrafficCube
+from instrument import step
 import warnings
 warnings.filterwarnings('ignore')
 
+step('load')
 print("Loading and analyzing data...")
-bakery_df = pd.read_csv('../data/raw/BreadBasket_DMS.csv')
+traffic = TrafficCube.load()
 
-if 'TransactionNo' in bakery_df.columns:
-    bakery_df.rename(columns={'TransactionNo': 'Transaction'}, inplace=True)
-if 'Items' in bakery_df.columns:
-    bakery_df.rename(columns={'Items': 'Item'}, inplace=True)
-if 'DateTime' in bakery_df.columns:
-    bakery_df['DateTime'] = pd.to_datetime(bakery_df['DateTime'])
+# Per-day averages for both day types in one pass over the cube
+daytype = CohortContrast.from_cube(traffic).compare({
+    'Weekend': lambda d: d['IsWeekend'],
+    'Weekday': lambda d: ~d['IsWeekend']
+})
 
-bakery_df['Date'] = bakery_df['DateTime'].dt.date
-bakery_df['Hour'] = bakery_df['DateTime'].dt.hour
-bakery_df['DayOfWeekNum'] = bakery_df['DateTime'].dt.dayofweek
-bakery_df['IsWeekend'] = bakery_df['DayOfWeekNum'].isin([5, 6])
-bakery_df = bakery_df[bakery_df['Item'] != 'NONE'].copy()
+weekend_hourly = daytype.profile('Weekend')
+weekday_hourly = daytype.profile('Weekday')
 
-# Calculate per-day averages
-weekend_days = bakery_df[bakery_df['IsWeekend']]['Date'].nunique()
-weekday_days = bakery_df[~bakery_df['IsWeekend']]['Date'].nunique()
+weekend_basket_avg = daytype.basket_size['Weekend']
+weekday_basket_avg = daytype.basket_size['Weekday']
 
-weekend_hourly = bakery_df[bakery_df['IsWeekend']].groupby('Hour')['Transaction'].nunique() / weekend_days
-weekday_hourly = bakery_df[~bakery_df['IsWeekend']].groupby('Hour')['Transaction'].nunique() / weekday_days
-
-basket_sizes = bakery_df.groupby(['Transaction', 'IsWeekend']).size().reset_index(name='BasketSize')
-weekend_basket_avg = basket_sizes[basket_sizes['IsWeekend'] == True]['BasketSize'].mean()
-weekday_basket_avg = basket_sizes[basket_sizes['IsWeekend'] == False]['BasketSize'].mean()
-
-morning_mask = bakery_df['Hour'] < 12
-weekend_morning_avg = bakery_df[(bakery_df['IsWeekend']) & (morning_mask)].groupby('Date')['Transaction'].nunique().mean()
-weekday_morning_avg = bakery_df[(~bakery_df['IsWeekend']) & (morning_mask)].groupby('Date')['Transaction'].nunique().mean()
+morning_avg = daytype.window_average((0, 12))
+weekend_morning_avg = morning_avg['Weekend']
+weekday_morning_avg = morning_avg['Weekday']
 
+step('weekend_weekday_figure')
 # Simple clean style
 plt.style.use('seaborn-v0_8-whitegrid')
 
@@ -131,4 +122,9 @@ print(f"  - Both peak at {peak_hour}:00 AM (no time shift)")
 print(f"  - Weekend peak +{peak_diff:.0f}% busier")
 print(f"  - Weekend morning +{morning_diff:.1f}% more transactions")
 print(f"  - Basket size: {weekday_basket_avg:.2f} → {weekend_basket_avg:.2f} (+{((weekend_basket_avg-weekday_basket_avg)/weekday_basket_avg*100):.1f}%)")
+tests = daytype.tests(reference='Weekday')
+daily_p = tests.loc[tests['Metric'] == 'transactions_per_day', 'PValue'].item()
+basket_p = tests.loc[tests['Metric'] == 'basket_size', 'PValue'].item()
+peak_p = tests.loc[(tests['Metric'] == 'hourly') & (tests['Hour'] == peak_hour), 'PValue'].item()
+print(f"  - Welch t-test p-values: transactions/day {daily_p:.3g}, basket size {basket_p:.3g}, {peak_hour}:00 traffic {peak_p:.3g}")
 plt.close()
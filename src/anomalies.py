@@ -0,0 +1,210 @@
+"""
+Traffic anomaly detection
+Flags unusual hours and days in the per-date / per-quarter-hour traffic
+series against a robust seasonal baseline: the median and MAD of the same
+weekday × hour (for hours) or weekday (for days) over recent weeks
+
+Each key of the baseline keeps its last WINDOW observations in a ring
+buffer, so adding an observation is O(1) and the exact median and MAD are
+computed from at most WINDOW values, however long the history or large
+the counts. Every hour and day is scored against the baseline of the weeks before it
+and only then added, so batch backfill over history and a live feed give
+the same flags.
+
+    detector = AnomalyDetector()
+    for date, slot, count in feed:       # quarter-hour counts in time order
+        for anomaly in detector.observe(date, slot, count):
+            print(anomaly)
+    detector.flush()                      # close the last hour and day
+
+Usage:
+    python anomalies.py                   # backfill over the processed traffic cube
+    python anomalies.py --threshold 3 --window 12
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from traffic_cube import TrafficCube, DAY_NAMES, SLOTS_PER_HOUR
+
+# Robust z-score above which an hour or day is flagged (Iglewicz & Hoaglin)
+THRESHOLD = 3.5
+# Observations per weekday × hour kept in the baseline (weeks)
+WINDOW = 12
+# Observations a key needs before it is scored
+MIN_HISTORY = 4
+# Scale floor, so a key whose recent counts are all equal does not flag every change of 1
+MIN_SCALE = 1.0
+MAD_TO_SIGMA = 1.4826
+
+HOURS = 24
+
+
+def _weekday(date):
+    """0 = Monday for a datetime64[D] date."""
+    return int((np.datetime64(date, 'D').astype(np.int64) + 3) % 7)
+
+
+class RobustBaseline:
+    """Rolling median / MAD of integer observations for a fixed number of keys."""
+
+    def __init__(self, keys, window=WINDOW):
+        self.window = window
+        self.recent = np.zeros((keys, window), dtype=np.int64)
+        self.count = np.zeros(keys, dtype=np.int64)
+
+    def add(self, key, value):
+        """Add an observation to a key, dropping the oldest beyond the window."""
+        self.recent[key, self.count[key] % self.window] = value
+        self.count[key] += 1
+
+    def size(self, key):
+        return int(min(self.count[key], self.window))
+
+    def median_mad(self, key):
+        """Exact (median, MAD) of a key's window; (nan, nan) while it is empty."""
+        if self.count[key] == 0:
+            return np.nan, np.nan
+        values = self.recent[key, :self.size(key)]
+        median = np.median(values)
+        return median, np.median(np.abs(values - median))
+
+    def score(self, key, value):
+        """(median, MAD, robust z) of value against a key's window."""
+        median, mad = self.median_mad(key)
+        return median, mad, (value - median) / max(MAD_TO_SIGMA * mad, MIN_SCALE)
+
+
+class AnomalyDetector:
+    """Streaming hour- and day-level anomaly detector over quarter-hour counts."""
+
+    def __init__(self, threshold=THRESHOLD, window=WINDOW, min_history=MIN_HISTORY, flagged_only=False):
+        self.threshold = threshold
+        self.min_history = min_history
+        # A live feed runs indefinitely: keep only the flagged rows, not every scored hour
+        self.flagged_only = flagged_only
+        self.hours = RobustBaseline(7 * HOURS, window)
+        self.days = RobustBaseline(7, window)
+        self.scores = []
+        self._date = None
+        self._hour = 0
+        self._hour_count = 0
+        self._day_count = 0
+
+    def _record(self, level, baseline, key, date, hour, value):
+        """Score one completed hour or day, then add it to its baseline."""
+        scored = baseline.size(key) >= self.min_history
+        median, mad, z = baseline.score(key, value) if scored else (np.nan, np.nan, np.nan)
+        baseline.add(key, value)
+        row = {'Level': level, 'Date': date, 'Hour': hour, 'Transactions': value,
+               'Median': median, 'MAD': mad, 'Score': z,
+               'IsAnomaly': bool(scored and abs(z) > self.threshold)}
+        if row['IsAnomaly'] or not self.flagged_only:
+            self.scores.append(row)
+        return row
+
+    def _close_hours(self, until):
+        """Score the open hour and the empty hours before `until` (24 closes the day's hours)."""
+        flagged = []
+        weekday = _weekday(self._date)
+        while self._hour < until:
+            row = self._record('hour', self.hours, weekday * HOURS + self._hour,
+                               self._date, self._hour, self._hour_count)
+            if row['IsAnomaly']:
+                flagged.append(row)
+            self._hour += 1
+            self._hour_count = 0
+        return flagged
+
+    def _close_day(self):
+        flagged = self._close_hours(HOURS)
+        row = self._record('day', self.days, _weekday(self._date), self._date, np.nan, self._day_count)
+        if row['IsAnomaly']:
+            flagged.append(row)
+        self._date, self._hour, self._day_count = None, 0, 0
+        return flagged
+
+    def observe(self, date, slot, count):
+        """
+        Add the transactions of one quarter hour (slot 0-95 of date).
+
+        Observations arrive in time order; slots without traffic may be
+        skipped and count as zero. Returns the hours and days this
+        observation completed that were flagged.
+        """
+        date = np.datetime64(date, 'D')
+        flagged = []
+        if self._date is not None and date != self._date:
+            if date < self._date:
+                raise ValueError(f"observation for {date} after {self._date}: feed must be in time order")
+            flagged += self._close_day()
+        if self._date is None:
+            self._date = date
+        hour = slot // SLOTS_PER_HOUR
+        if hour < self._hour:
+            raise ValueError(f"observation for {date} hour {hour} after hour {self._hour}")
+        flagged += self._close_hours(hour)
+        self._hour_count += int(count)
+        self._day_count += int(count)
+        return flagged
+
+    def flush(self):
+        """Close the open day (e.g. at the end of a feed or at closing time); returns flagged rows."""
+        return self._close_day() if self._date is not None else []
+
+    def table(self):
+        """
+        Every scored hour and day so far (only the flagged ones with
+        flagged_only): Level, Date, Hour, Transactions, Median, MAD, Score, IsAnomaly.
+        """
+        return pd.DataFrame(self.scores, columns=['Level', 'Date', 'Hour', 'Transactions',
+                                                  'Median', 'MAD', 'Score', 'IsAnomaly'])
+
+    def backfill(self, cube, layer='transactions'):
+        """Run a traffic cube's history through the detector in date order; returns table()."""
+        counts = getattr(cube, layer)
+        for date, row in zip(cube.dates, counts):
+            for slot in np.flatnonzero(row):
+                self.observe(date, slot, row[slot])
+            if self._date is None:
+                self.observe(date, 0, 0)
+            self.flush()
+        return self.table()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Flag unusual hours and days of traffic')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--window', type=int, default=WINDOW, help='weeks of history per weekday × hour')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("TRAFFIC ANOMALIES")
+    print("="*80)
+
+    try:
+        traffic = TrafficCube.load()
+    except FileNotFoundError as e:
+        print(f"✗ Error: {e.filename} not found")
+        print("  Please run 00b_data_processing.py first")
+        raise SystemExit(1)
+
+    scores = AnomalyDetector(args.threshold, args.window).backfill(traffic)
+    anomalies = scores[scores['IsAnomaly']]
+    days = anomalies[anomalies['Level'] == 'day']
+    hours = anomalies[anomalies['Level'] == 'hour']
+    scored = scores['Score'].notna()
+    print(f"Scored {scored[scores['Level'] == 'day'].sum()} days and {scored[scores['Level'] == 'hour'].sum():,} hours "
+          f"(|robust z| > {args.threshold}, {args.window}-week weekday baseline)")
+
+    print(f"\n⚠ Unusual days: {len(days)}")
+    for row in days.itertuples(index=False):
+        print(f"  {row.Date:%Y-%m-%d} {DAY_NAMES[_weekday(row.Date)]:9s}: {row.Transactions:4d} transactions "
+              f"(typical {row.Median:.0f}, z = {row.Score:+.1f})")
+
+    print(f"\n⚠ Unusual hours: {len(hours)} (strongest 10)")
+    for row in hours.reindex(hours['Score'].abs().sort_values(ascending=False).index).head(10).itertuples(index=False):
+        print(f"  {row.Date:%Y-%m-%d} {int(row.Hour):02d}:00: {row.Transactions:3d} transactions "
+              f"(typical {row.Median:.0f}, z = {row.Score:+.1f})")
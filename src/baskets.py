@@ -0,0 +1,164 @@
+"""
+Basket encoding helpers
+Turns line-item transaction data into baskets (offsets into one item code
+array) and sparse basket × item matrices
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def is_sorted(keys):
+    """True if keys never decrease (one O(n) comparison, no sort)."""
+    keys = np.asarray(keys)
+    return len(keys) < 2 or bool(np.all(keys[1:] >= keys[:-1]))
+
+
+class Baskets:
+    """
+    Line items grouped by transaction as runs of one item code array.
+
+    Basket b is codes[offsets[b]:offsets[b + 1]], a view, with its lines in
+    input order. Till exports are already ordered by transaction, so the
+    runs are found with one pass over the transaction column; otherwise the
+    lines are put in order with a stable argsort first (`order`, None when
+    the input was already sorted).
+    """
+
+    def __init__(self, txn_ids, offsets, codes, items, order=None):
+        self.txn_ids = txn_ids
+        self.offsets = offsets
+        self.codes = codes
+        self.items = items
+        self.order = order
+
+    @classmethod
+    def from_lines(cls, df, txn_col='Transaction', item_col='Item', items=None, catalogue=None):
+        """
+        Baskets of a line-item frame.
+
+        Item codes index the sorted item names, or the given `items`
+        vocabulary (lines with other items get code -1). With the catalogue
+        the lines were cleaned with, its int ItemCode column is used instead
+        of the names.
+        """
+        txn = df[txn_col].to_numpy()
+        order = None if is_sorted(txn) else np.argsort(txn, kind='stable')
+        if order is not None:
+            txn = txn[order]
+        starts = np.flatnonzero(txn[1:] != txn[:-1]) + 1
+        offsets = np.concatenate(([0], starts, [len(txn)])) if len(txn) else np.zeros(1, dtype=np.int64)
+
+        if catalogue is not None:
+            codes = df['ItemCode'].to_numpy()
+            if items is None:
+                # compact to the products present; catalogue codes are already in name order
+                present = np.bincount(codes, minlength=len(catalogue)) > 0
+                codes = (np.cumsum(present) - 1)[codes]
+                items = catalogue.names[present]
+            else:
+                codes = np.append(pd.Index(items).get_indexer(catalogue.names), -1)[codes]
+        else:
+            codes, uniques = pd.factorize(df[item_col], sort=True)
+            if items is None:
+                items = uniques
+            else:
+                # factorize, then map the few distinct names onto the vocabulary
+                codes = np.append(pd.Index(items).get_indexer(uniques), -1)[codes]
+        if order is not None:
+            codes = codes[order]
+        return cls(txn[offsets[:-1]], offsets, codes, items, order)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, b):
+        return self.codes[self.offsets[b]:self.offsets[b + 1]]
+
+    @property
+    def sizes(self):
+        """Lines per basket."""
+        return np.diff(self.offsets)
+
+    def ordered(self, values):
+        """Per-line values (input order) in basket order."""
+        values = np.asarray(values)
+        return values if self.order is None else values[self.order]
+
+    def first(self, values):
+        """Value of the first line of every basket."""
+        return self.ordered(values)[self.offsets[:-1]]
+
+    def positions(self):
+        """0-based position of every line (in basket order) within its basket."""
+        return np.arange(self.offsets[-1]) - np.repeat(self.offsets[:-1], self.sizes)
+
+    def names(self):
+        """Item name of every line, in basket order (None for unknown items)."""
+        return np.append(np.asarray(self.items, dtype=object), None)[self.codes]
+
+    def lists(self):
+        """Item names of every basket, lines in input order."""
+        names, offsets = self.names().tolist(), self.offsets.tolist()
+        return [names[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def incidence(self):
+        """
+        Binary basket × item CSR matrix, built straight from the offsets.
+
+        Repeated items collapse to a single 1 and lines with unknown items
+        (code -1) are dropped; column indices end up sorted and unique.
+        """
+        known = self.codes >= 0
+        if known.all():
+            indices, indptr = self.codes, self.offsets
+        else:
+            indices = self.codes[known]
+            indptr = np.concatenate(([0], np.cumsum(np.add.reduceat(known, self.offsets[:-1]))))
+        B = sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), indices, indptr),
+                              shape=(len(self), len(self.items)))
+        B.sum_duplicates()
+        B.data[:] = 1
+        return B
+
+
+def encode_items(df, txn_col='Transaction', item_col='Item'):
+    """Factorize transactions and items into dense integer codes."""
+    txn_codes, txn_ids = pd.factorize(df[txn_col], sort=True)
+    item_codes, items = pd.factorize(df[item_col], sort=True)
+    return txn_codes, item_codes, txn_ids, items
+
+
+def basket_matrix(df, txn_col='Transaction', item_col='Item', catalogue=None):
+    """
+    Binary transaction × item incidence matrix.
+
+    Repeated lines of the same item in a basket collapse to a single 1, which
+    matches the set semantics of the pair counting in 00b.
+    Returns (B, items, transaction_ids).
+    """
+    baskets = Baskets.from_lines(df, txn_col, item_col, catalogue=catalogue)
+    return baskets.incidence(), pd.Index(baskets.items), pd.Index(baskets.txn_ids)
+
+
+def cooccurrence_matrix(B):
+    """
+    Item × item co-occurrence counts from an incidence matrix.
+
+    Off-diagonal entries are the number of baskets containing both items,
+    the diagonal holds the number of baskets containing each item.
+    """
+    return (B.T @ B).tocsr().astype(np.int64)
+
+
+def pair_table(P, items):
+    """Long-format pair counts (upper triangle of P), most frequent first."""
+    upper = sparse.triu(P, k=1).tocoo()
+    pairs = pd.DataFrame({
+        'Product1': np.asarray(items)[upper.row],
+        'Product2': np.asarray(items)[upper.col],
+        'Count': upper.data
+    })
+    return pairs.sort_values(['Count', 'Product1', 'Product2'],
+                             ascending=[False, True, True]).reset_index(drop=True)
@@ -0,0 +1,160 @@
+"""
+Item catalogue
+One interned item dictionary for every stage: names are normalised once
+(trimmed, single-spaced, upper case), aliases resolved from a mapping file,
+NONE / empty lines dropped, and every canonical name gets a dense int code
+
+Codes follow the sorted canonical names, so they equal the codes of
+pd.factorize(names, sort=True) used elsewhere, and 00b writes the
+catalogue next to its outputs so later scripts encode lines the same way.
+Normalisation runs on the distinct spellings only (a few hundred), never
+per line; lines are mapped through an int lookup.
+
+    catalogue = Catalogue.from_items(bakery_df['Item'])
+    catalogue.encode(['Coffee ', 'hot chocolate']) # array([23, 48], dtype=int32)
+    catalogue.name(23)                           # 'COFFEE'
+
+Aliases live in data/raw/item_aliases.csv (columns Alias, Item; lines
+starting with # are comments); both sides are normalised before use.
+
+Usage:
+    python catalogue.py                          # catalogue of the raw export
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+ALIASES_PATH = '../data/raw/item_aliases.csv'
+CATALOGUE_PATH = '../data/processed/item_catalogue.csv'
+
+# Till placeholders that are not products
+DROPPED = ('NONE', '')
+
+
+def normalise(names):
+    """Canonical spelling of item names: trimmed, single spaces, upper case (missing stays NaN)."""
+    return pd.Index(names, dtype=object).str.strip().str.replace(r'\s+', ' ', regex=True).str.upper()
+
+
+def load_aliases(path=ALIASES_PATH):
+    """{alias: item} in canonical spelling; empty without an alias file."""
+    if not os.path.exists(path):
+        return {}
+    table = pd.read_csv(path, comment='#', skipinitialspace=True)
+    aliases = dict(zip(normalise(table['Alias']), normalise(table['Item'])))
+    chained = sorted(set(aliases) & set(aliases.values()))
+    if chained:
+        raise ValueError(f"Aliases that are themselves aliased: {chained}")
+    return aliases
+
+
+def canonical(names, aliases=None):
+    """
+    Canonical name of each distinct spelling in `names` (NaN for dropped lines).
+
+    Returns an object array aligned with `names`; normalisation and alias
+    lookup run once per distinct spelling.
+    """
+    aliases = load_aliases() if aliases is None else aliases
+    codes, uniques = pd.factorize(np.asarray(names, dtype=object))
+    resolved = [aliases.get(name, name) if isinstance(name, str) and name not in DROPPED else None
+                for name in normalise(uniques)]
+    return np.append(np.array(resolved, dtype=object), None)[codes]
+
+
+class Catalogue:
+    """Canonical item names and their dense int codes."""
+
+    def __init__(self, names, aliases=None):
+        self.names = pd.Index(names, name='Item')
+        self.aliases = load_aliases() if aliases is None else aliases
+        self._codes = {name: code for code, name in enumerate(self.names)}
+        self._names = self.names.to_numpy(dtype=object)
+
+    @classmethod
+    def from_items(cls, items, aliases=None):
+        """Catalogue of every product in an item column (sorted canonical names)."""
+        aliases = load_aliases() if aliases is None else aliases
+        uniques = pd.unique(np.asarray(items, dtype=object))
+        names = {name for name in canonical(uniques, aliases) if name is not None}
+        return cls(sorted(names), aliases)
+
+    @classmethod
+    def load(cls, path=CATALOGUE_PATH, aliases=None):
+        table = pd.read_csv(path, keep_default_na=False).sort_values('Code')
+        if not np.array_equal(table['Code'].to_numpy(), np.arange(len(table))):
+            raise ValueError(f"{path}: codes are not 0..{len(table) - 1}")
+        return cls(table['Item'].tolist(), aliases)
+
+    def save(self, path=CATALOGUE_PATH):
+        pd.DataFrame({'Code': np.arange(len(self.names)), 'Item': self.names}).to_csv(path, index=False)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.lookup(name) is not None
+
+    def lookup(self, name):
+        """Code of any spelling or alias of a product; None if unknown or dropped."""
+        resolved = canonical([name], self.aliases)[0]
+        return self._codes.get(resolved)
+
+    def code(self, name):
+        code = self.lookup(name)
+        if code is None:
+            raise KeyError(f"unknown item {name!r}")
+        return code
+
+    def name(self, code):
+        return self._names[code]
+
+    def decode(self, codes):
+        """Canonical names of an array of codes."""
+        return self._names[np.asarray(codes)]
+
+    def encode(self, items):
+        """
+        int32 codes of an item column; -1 for dropped lines (NONE, empty)
+        and for products the catalogue does not know.
+        """
+        codes, uniques = pd.factorize(np.asarray(items, dtype=object))
+        lookup = [self._codes.get(name, -1) if name is not None else -1 for name in canonical(uniques, self.aliases)]
+        return np.append(np.array(lookup, dtype=np.int32), np.int32(-1))[codes]
+
+    def clean(self, df, item_col='Item', code_col='ItemCode'):
+        """
+        Lines with canonical item names and an int code column; dropped lines
+        are removed. Raises ValueError for products missing from the catalogue.
+        """
+        codes = self.encode(df[item_col])
+        dropped = canonical(df[item_col], self.aliases) == None  # noqa: E711 (elementwise)
+        unknown = (codes < 0) & ~dropped
+        if unknown.any():
+            missing = sorted(set(df[item_col].to_numpy()[unknown]))
+            raise ValueError(f"Items not in the catalogue: {missing[:10]} (rerun 00b_data_processing.py?)")
+        df = df[codes >= 0].copy()
+        df[item_col] = self._names[codes[codes >= 0]]
+        df[code_col] = codes[codes >= 0]
+        return df
+
+
+if __name__ == '__main__':
+    from processing import RAW_PATH
+
+    print("="*80)
+    print("ITEM CATALOGUE")
+    print("="*80)
+
+    raw_items = pd.read_csv(RAW_PATH, usecols=lambda column: column in ('Items', 'Item')).iloc[:, 0]
+    catalogue = Catalogue.from_items(raw_items)
+    spellings = pd.unique(raw_items.to_numpy(dtype=object))
+    resolved = canonical(spellings, catalogue.aliases)
+    changed = [(spelling, name) for spelling, name in zip(spellings, resolved) if spelling != name]
+
+    print(f"{len(spellings)} spellings → {len(catalogue)} products ({len(catalogue.aliases)} aliases known)")
+    for spelling, name in sorted(changed, key=lambda pair: str(pair[1])):
+        if name is None or spelling.upper() != name:
+            print(f"  {spelling!r:35s} → {name}")
@@ -0,0 +1,86 @@
+"""
+Product category helpers
+Maps products onto a category taxonomy and aggregates pair counts by category
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from catalogue import canonical
+
+DEFAULT_TAXONOMY_PATH = '../data/raw/product_categories.csv'
+
+
+def load_taxonomy(path=DEFAULT_TAXONOMY_PATH):
+    """
+    Load a product → category mapping.
+
+    Accepts a CSV with Item and Category columns, or a JSON object of
+    {category: [items]} in the same shape as the old inline dict.
+    Item names are normalised the same way as in 00b.
+    """
+    if os.path.splitext(path)[1].lower() == '.json':
+        with open(path) as f:
+            groups = json.load(f)
+        taxonomy = pd.DataFrame(
+            [(item, category) for category, items in groups.items() for item in items],
+            columns=['Item', 'Category']
+        )
+    else:
+        taxonomy = pd.read_csv(path)
+
+    taxonomy['Item'] = canonical(taxonomy['Item'])
+    taxonomy['Category'] = taxonomy['Category'].str.strip()
+
+    duplicated = taxonomy['Item'][taxonomy['Item'].duplicated()]
+    if len(duplicated) > 0:
+        raise ValueError(f"Items mapped to more than one category: {sorted(duplicated.unique())}")
+    return taxonomy
+
+
+def category_matrix(items, taxonomy):
+    """
+    Sparse item × category membership matrix.
+
+    Rows follow `items` (the labels of the co-occurrence matrix); items missing
+    from the taxonomy get an empty row. Returns (C, categories).
+    """
+    categories = pd.Index(taxonomy['Category'].drop_duplicates())
+    item_category = pd.Index(items).map(taxonomy.set_index('Item')['Category'])
+
+    rows = np.flatnonzero(item_category.notna())
+    cols = categories.get_indexer(item_category[rows])
+    C = sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, cols)),
+                          shape=(len(items), len(categories)))
+    return C, categories
+
+
+def category_cooccurrence(P, C):
+    """
+    Category × category co-purchase counts as Cᵀ · P · C.
+
+    P is the item co-occurrence matrix; its diagonal (single-item basket
+    counts) is dropped so only pairs are aggregated. Within-category pairs are
+    seen twice by the symmetric product, so the diagonal is halved to count
+    each pair once.
+    """
+    pairs = P - sparse.diags(P.diagonal(), dtype=P.dtype)
+    M = np.asarray((C.T @ pairs @ C).todense())
+    M[np.diag_indices_from(M)] //= 2
+    return M
+
+
+def category_pair_table(M, categories):
+    """Long-format category pairs (upper triangle incl. diagonal) with non-zero counts."""
+    first, second = np.triu_indices(len(categories))
+    table = pd.DataFrame({
+        'Category1': np.asarray(categories)[first],
+        'Category2': np.asarray(categories)[second],
+        'Count': M[first, second]
+    })
+    table = table[table['Count'] > 0]
+    return table.sort_values('Count', ascending=False).reset_index(drop=True)
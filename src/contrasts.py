@@ -0,0 +1,331 @@
+"""
+Cohort contrasts
+Compares any set of cohorts of trading days (weekend/weekday, rainy/dry,
+month A/month B, outlet X/outlet Y, or N cohorts at once) on per-day
+hourly traffic, basket size and product mix, with significance tests
+
+Cohorts are predicates over a day table with one row per cube row (Date,
+DayOfWeek, DayName, IsWeekend, Month, plus Outlet or weather columns when
+given). All cohorts are evaluated in one pass: a cohorts × days membership
+matrix times the per-day hourly counts gives every cohort's sums and sums
+of squares, from which means, variances and Welch t-tests follow for all
+hours at once.
+
+    contrast = CohortContrast.from_cube(TrafficCube.load())
+    result = contrast.compare({'Weekend': lambda d: d['IsWeekend'],
+                               'Weekday': lambda d: ~d['IsWeekend']})
+    result.hourly            # transactions per day by hour, one column per cohort
+    result.tests()           # Welch tests against the first cohort
+
+Usage:
+    python contrasts.py --by weekend
+    python contrasts.py --by rain
+    python contrasts.py --by month --months 2016-12,2017-02
+    python contrasts.py --by outlet --chain ../data/processed/chain --outlets outlet_001,outlet_002
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+
+from traffic_cube import TrafficCube, DAY_NAMES, SLOTS_PER_HOUR
+
+HOURS = 24
+RAIN_MM = 0.5
+WEATHER_PATH = '../data/raw/edinburgh_weather.csv'
+
+
+def day_table(dates, **columns):
+    """Calendar attributes of cube rows (datetime64[D] dates), plus extra columns."""
+    dates = pd.to_datetime(np.asarray(dates, dtype='datetime64[D]'))
+    days = pd.DataFrame({
+        'Date': dates,
+        'DayOfWeek': dates.dayofweek,
+        'DayName': dates.day_name(),
+        'IsWeekend': dates.dayofweek >= 5,
+        'Month': dates.strftime('%Y-%m')
+    })
+    for name, values in columns.items():
+        days[name] = values
+    return days
+
+
+def rainy_days(weather_df, threshold=RAIN_MM):
+    """Date, IsRaining: a day with at least one hour above `threshold` mm (the hourly rule of 00b)."""
+    timestamps = pd.to_datetime(weather_df['timestamp'])
+    rain = (weather_df['precipitation'] > threshold).groupby(timestamps.dt.normalize()).any()
+    return pd.DataFrame({'Date': rain.index, 'IsRaining': rain.to_numpy()})
+
+
+def item_hour_counts(lines, dates, items=None):
+    """
+    Sparse (len(dates) * 24, n_items) line-item counts per (date, hour) row.
+
+    Lines on dates outside `dates` are dropped. Returns (counts, items).
+    """
+    timestamps = pd.to_datetime(lines['DateTime'])
+    day = timestamps.to_numpy().astype('datetime64[D]')
+    rows = np.searchsorted(dates, day)
+    known = (rows < len(dates)) & (dates[np.minimum(rows, len(dates) - 1)] == day)
+    codes, items = (pd.factorize(lines['Item'], sort=True) if items is None
+                    else (pd.Categorical(lines['Item'], categories=items).codes, pd.Index(items)))
+    known &= codes >= 0
+    row_index = rows[known] * HOURS + timestamps.dt.hour.to_numpy()[known]
+    counts = sparse.coo_matrix((np.ones(known.sum(), dtype=np.int64), (row_index, codes[known])),
+                               shape=(len(dates) * HOURS, len(items))).tocsr()
+    return counts, items
+
+
+def welch_test(mean_a, var_a, n_a, mean_b, var_b, n_b):
+    """
+    Vectorized Welch t-test from summary statistics; returns (t, p).
+
+    Inputs broadcast; p is two-sided and NaN where both variances are zero
+    or a cohort has fewer than two days.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        se_a, se_b = var_a / n_a, var_b / n_b
+        se2 = se_a + se_b
+        t = (mean_a - mean_b) / np.sqrt(se2)
+        df = se2 ** 2 / (se_a ** 2 / (n_a - 1) + se_b ** 2 / (n_b - 1))
+        p = 2 * stats.t.sf(np.abs(t), df)
+    valid = (se2 > 0) & (np.minimum(n_a, n_b) > 1)
+    return np.where(valid, t, np.nan), np.where(valid, p, np.nan)
+
+
+class CohortContrast:
+    """Per-day traffic (and optionally product mix) that cohorts are compared on."""
+
+    def __init__(self, days, transactions, items, item_hours=None, item_names=None):
+        self.days = days.reset_index(drop=True)
+        self.transactions = np.asarray(transactions)
+        self.items = np.asarray(items)
+        self.item_hours = item_hours
+        self.item_names = item_names
+
+    @classmethod
+    def from_cube(cls, cube, lines=None, daily=None):
+        """
+        Contrast over one traffic cube.
+
+        lines (DateTime, Item) adds product mix; daily is a frame keyed by
+        Date whose other columns (e.g. rainy_days output) join the day table.
+        """
+        days = day_table(cube.dates)
+        if daily is not None:
+            days = days.merge(daily.assign(Date=pd.to_datetime(daily['Date'])), on='Date', how='left')
+        item_hours, item_names = (None, None) if lines is None else item_hour_counts(lines, cube.dates)
+        return cls(days, cube.transactions, cube.items, item_hours, item_names)
+
+    @classmethod
+    def from_cubes(cls, cubes, daily=None):
+        """Contrast over several cubes (e.g. {outlet: cube}); the day table gains an Outlet column."""
+        contrasts = [cls.from_cube(cube, daily=daily) for cube in cubes.values()]
+        days = pd.concat([c.days.assign(Outlet=outlet) for outlet, c in zip(cubes, contrasts)], ignore_index=True)
+        return cls(days, np.concatenate([c.transactions for c in contrasts]),
+                   np.concatenate([c.items for c in contrasts]))
+
+    def membership(self, cohorts):
+        """
+        (names, k × days float matrix) for {name: predicate over the day
+        table, or boolean mask}. Raises ValueError for cohorts without days.
+        """
+        rows = []
+        for predicate in cohorts.values():
+            mask = predicate(self.days) if callable(predicate) else predicate
+            rows.append(np.asarray(mask, dtype=bool))
+        M = np.vstack(rows)
+        empty = [name for name, row in zip(cohorts, M) if not row.any()]
+        if empty:
+            raise ValueError(f"Cohorts without trading days: {empty}")
+        return list(cohorts), M.astype(np.float64)
+
+    def compare(self, cohorts):
+        """Compare cohorts ({name: predicate}); returns a Comparison."""
+        names, M = self.membership(cohorts)
+        return Comparison(self, names, M)
+
+
+class Comparison:
+    """Per-cohort statistics of one compare() call, computed in one matrix pass."""
+
+    def __init__(self, contrast, names, M):
+        self.contrast = contrast
+        self.names = names
+        self.M = M
+        self.n_days = M.sum(axis=1)
+
+        rows = len(contrast.days)
+        self.daily_hourly = contrast.transactions.reshape(rows, HOURS, SLOTS_PER_HOUR).sum(axis=2, dtype=np.int64)
+        self.daily_transactions = self.daily_hourly.sum(axis=1)
+        self.daily_items = contrast.items.sum(axis=1, dtype=np.int64)
+
+        X = self.daily_hourly.astype(np.float64)
+        self._hour_sum = M @ X
+        self._hour_sumsq = M @ X ** 2
+        # Cohorts without days (or traffic) get NaN rather than a division warning
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.hourly = pd.DataFrame((self._hour_sum / self.n_days[:, None]).T,
+                                       index=pd.Index(range(HOURS), name='Hour'), columns=names)
+            self.basket_size = pd.Series((M @ self.daily_items) / (M @ self.daily_transactions), index=names)
+
+    def _moments(self, values, weights=None):
+        """Per-cohort n, mean and sample variance of one value per day (NaN days skipped)."""
+        present = ~np.isnan(values)
+        M = self.M * present if weights is None else self.M * weights * present
+        values = np.where(present, values, 0.0)
+        n = M.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (M @ values) / n
+            var = ((M @ values ** 2) - n * mean ** 2) / (n - 1)
+        return n, mean, np.maximum(var, 0)
+
+    def profile(self, name):
+        """Transactions per day by hour for one cohort, hours without traffic dropped."""
+        column = self.hourly[name]
+        return column[self._hour_sum[self.names.index(name)] > 0]
+
+    def window_average(self, hours):
+        """Transactions per day within hours (start, end), over the days that traded in that window."""
+        start, end = hours
+        window = self.daily_hourly[:, start:end].sum(axis=1).astype(np.float64)
+        traded = self.M @ (window > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.Series((self.M @ window) / traded, index=self.names)
+
+    def summary(self):
+        """Days, transactions and items per day and basket size per cohort (NaN for a cohort without days)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.DataFrame({
+                'Days': self.n_days.astype(int),
+                'TransactionsPerDay': (self.M @ self.daily_transactions) / self.n_days,
+                'ItemsPerDay': (self.M @ self.daily_items) / self.n_days,
+                'BasketSize': self.basket_size.to_numpy()
+            }, index=pd.Index(self.names, name='Cohort'))
+
+    def product_mix(self, hours=None):
+        """Line items per product (rows) and cohort (columns), optionally within hours (start, end)."""
+        contrast = self.contrast
+        if contrast.item_hours is None:
+            raise ValueError("product mix needs line items: build the contrast with from_cube(cube, lines=...)")
+        hour_mask = np.zeros(HOURS)
+        start, end = hours or (0, HOURS)
+        hour_mask[start:end] = 1
+        weights = sparse.csr_matrix(np.kron(self.M, hour_mask))
+        counts = (weights @ contrast.item_hours).toarray()
+        return pd.DataFrame(counts.T.astype(np.int64), index=contrast.item_names, columns=self.names)
+
+    def tests(self, reference=None):
+        """
+        Every other cohort against `reference` (default: the first cohort).
+
+        Welch t-tests on transactions per day, on each day's mean basket size
+        and on transactions per day for every hour; with product mix, a
+        chi-square test of the item distribution (NaN when either cohort sold
+        nothing). Columns Cohort, Reference,
+        Metric, Hour, Cohort/Reference values, Difference, Statistic, PValue.
+        """
+        reference = reference or self.names[0]
+        r = self.names.index(reference)
+        rows = []
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            daily_basket = np.where(self.daily_transactions > 0, self.daily_items / self.daily_transactions, np.nan)
+        metrics = {
+            'transactions_per_day': self._moments(self.daily_transactions.astype(np.float64)),
+            'basket_size': self._moments(daily_basket)
+        }
+        n = self.n_days
+        hour_mean = self._hour_sum / n[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            hour_var = np.maximum((self._hour_sumsq - n[:, None] * hour_mean ** 2) / (n[:, None] - 1), 0)
+
+        for c, name in enumerate(self.names):
+            if c == r:
+                continue
+            for metric, (count, mean, var) in metrics.items():
+                t, p = welch_test(mean[c], var[c], count[c], mean[r], var[r], count[r])
+                rows.append((name, reference, metric, np.nan, mean[c], mean[r], mean[c] - mean[r], float(t), float(p)))
+
+            t, p = welch_test(hour_mean[c], hour_var[c], n[c], hour_mean[r], hour_var[r], n[r])
+            for hour in np.flatnonzero(self._hour_sum[[c, r]].sum(axis=0) > 0):
+                rows.append((name, reference, 'hourly', hour, hour_mean[c, hour], hour_mean[r, hour],
+                             hour_mean[c, hour] - hour_mean[r, hour], t[hour], p[hour]))
+
+            if self.contrast.item_hours is not None:
+                mix = self.product_mix()[[name, reference]].to_numpy()
+                mix = mix[mix.sum(axis=1) > 0]
+                if mix.sum(axis=0).min() > 0:
+                    chi2, p, _, _ = stats.chi2_contingency(mix.T)
+                else:
+                    chi2, p = np.nan, np.nan
+                rows.append((name, reference, 'product_mix', np.nan, np.nan, np.nan, np.nan, chi2, p))
+
+        return pd.DataFrame(rows, columns=['Cohort', 'Reference', 'Metric', 'Hour', 'CohortValue',
+                                           'ReferenceValue', 'Difference', 'Statistic', 'PValue'])
+
+
+def _preset(name, args):
+    """Cohorts of the CLI presets."""
+    if name == 'weekend':
+        return {'Weekend': lambda d: d['IsWeekend'], 'Weekday': lambda d: ~d['IsWeekend']}
+    if name == 'weekday':
+        return {day: (lambda d, day=day: d['DayName'] == day) for day in DAY_NAMES}
+    if name == 'rain':
+        return {'Rainy': lambda d: d['IsRaining'] == True, 'Dry': lambda d: d['IsRaining'] == False}
+    if name == 'month':
+        return {month: (lambda d, month=month: d['Month'] == month) for month in args.months.split(',')}
+    if name == 'outlet':
+        return {outlet: (lambda d, outlet=outlet: d['Outlet'] == outlet) for outlet in args.outlets.split(',')}
+    raise ValueError(f"unknown preset {name!r}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare cohorts of trading days')
+    parser.add_argument('--by', default='weekend', choices=['weekend', 'weekday', 'rain', 'month', 'outlet'])
+    parser.add_argument('--months', default='2016-12,2017-02', help='YYYY-MM list for --by month')
+    parser.add_argument('--chain', default='../data/processed/chain', help='outlets.py output for --by outlet')
+    parser.add_argument('--outlets', default='outlet_001,outlet_002', help='outlet ids for --by outlet')
+    args = parser.parse_args()
+
+    print("="*80)
+    print(f"COHORT CONTRAST: {args.by.upper()}")
+    print("="*80)
+
+    if args.by == 'outlet':
+        cubes = {outlet: TrafficCube.load(os.path.join(args.chain, 'outlets', outlet, 'traffic_cube.npz'))
+                 for outlet in args.outlets.split(',')}
+        contrast = CohortContrast.from_cubes(cubes)
+    else:
+        daily = None
+        if args.by == 'rain':
+            try:
+                daily = rainy_days(pd.read_csv(WEATHER_PATH))
+            except FileNotFoundError:
+                print(f"✗ Error: {WEATHER_PATH} not found (run 00a_download_weather_data.py)")
+                exit(1)
+        lines = pd.read_csv('../data/processed/processed_bakery_data.csv', usecols=['DateTime', 'Item'])
+        contrast = CohortContrast.from_cube(TrafficCube.load(), lines=lines, daily=daily)
+
+    try:
+        result = contrast.compare(_preset(args.by, args))
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        exit(1)
+    print("\nPer cohort:")
+    for row in result.summary().itertuples():
+        print(f"  {row.Index:12s}: {row.Days:4d} days, {row.TransactionsPerDay:6.1f} transactions/day, "
+              f"{row.BasketSize:.2f} items/basket")
+
+    tests = result.tests()
+    print(f"\nAgainst {result.names[0]} (Welch t-test):")
+    for row in tests[tests['Metric'].isin(['transactions_per_day', 'basket_size', 'product_mix'])].itertuples():
+        difference = '' if np.isnan(row.Difference) else f"{row.Difference:+8.2f}"
+        print(f"  {row.Cohort:12s} {row.Metric:22s} {difference:>8s}  p = {row.PValue:.3g}")
+
+    hourly = tests[(tests['Metric'] == 'hourly') & (tests['PValue'] < 0.05)]
+    print(f"\nHours with significantly different traffic (p < 0.05): "
+          f"{', '.join(f'{row.Cohort} {int(row.Hour):02d}:00 ({row.Difference:+.1f}/day)' for row in hourly.itertuples()) or 'none'}")
@@ -0,0 +1,225 @@
+"""
+Streaming ingestion
+Reads a raw till export in chunks and writes it as date-partitioned parquet,
+so exports larger than memory never have to be loaded at once
+
+Usage:
+    python ingest.py
+    python ingest.py --raw ../data/synthetic/bakery_x100.csv --out ../data/processed/lines_x100
+    python ingest.py --raw ../data/synthetic/chain/outlet_007.csv --outlet outlet_007
+
+With --outlet the lines go to <out>/Outlet=<id>/Date=YYYY-MM-DD/, so several
+outlets share one dataset and read back with an Outlet column.
+
+Needs pyarrow (see requirements.txt).
+"""
+
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from catalogue import canonical
+from instrument import traced
+
+RAW_PATH = '../data/raw/BreadBasket_DMS.csv'
+INGEST_PATH = '../data/processed/lines'
+CHUNK_ROWS = 500_000
+
+RAW_RENAMES = {'TransactionNo': 'Transaction', 'Items': 'Item'}
+
+
+def _swap_day_month(timestamps):
+    """Timestamps with day and month exchanged where the day is 12 or less."""
+    ambiguous = (timestamps.dt.day <= 12) & (timestamps.dt.day != timestamps.dt.month)
+    return pd.to_datetime(pd.DataFrame({
+        'year': timestamps.dt.year, 'month': timestamps.dt.day.where(ambiguous, timestamps.dt.month),
+        'day': timestamps.dt.month.where(ambiguous, timestamps.dt.day)
+    })) + (timestamps - timestamps.dt.normalize())
+
+
+def _date_fit(timestamps, day_types=None, previous=None):
+    """
+    How well a reading of the timestamps fits the export (higher is better):
+    lines agreeing with their DayType label if there are any, otherwise minus
+    the lines that go back in time (after `previous`, the last timestamp before).
+    """
+    if day_types is not None:
+        return int(((timestamps.dt.dayofweek >= 5).to_numpy() == (np.asarray(day_types) == 'Weekend')).sum())
+    values = timestamps.to_numpy()
+    if previous is not None:
+        values = np.concatenate([[previous], values])
+    return -int((np.diff(values) < np.timedelta64(0)).sum())
+
+
+def parse_export_datetime(values, day_types=None, swapped=None):
+    """
+    Parse till-export timestamps.
+
+    The BreadBasket export writes YYYY-DD-MM whenever the day is 12 or less
+    (2016-01-11 is 1 Nov 2016). Day and month are swapped on those rows when
+    `swapped` is True; with None that is decided from these values, if the
+    swapped reading fits them better (see _date_fit). Exports with correct
+    dates are left as they are. Pass the decision of export_swaps_dates when
+    parsing an export piece by piece.
+    """
+    timestamps = pd.to_datetime(pd.Series(values))
+    if swapped is None:
+        swapped = _date_fit(_swap_day_month(timestamps), day_types) > _date_fit(timestamps, day_types)
+    return _swap_day_month(timestamps) if swapped else timestamps
+
+
+def export_swaps_dates(path=RAW_PATH, chunk_rows=CHUNK_ROWS):
+    """
+    Whether a whole export writes YYYY-DD-MM for days up to 12, decided once
+    from its DateTime and DayType columns (read chunk by chunk), so every
+    chunk of an ingestion parses its dates the same way.
+    """
+    as_is = fixed = 0
+    previous_as_is = previous_fixed = None
+    for chunk in pd.read_csv(path, usecols=lambda column: column in ('DateTime', 'DayType'), chunksize=chunk_rows):
+        timestamps = pd.to_datetime(chunk['DateTime'])
+        swapped = _swap_day_month(timestamps)
+        day_types = chunk.get('DayType')
+        as_is += _date_fit(timestamps, day_types, previous_as_is)
+        fixed += _date_fit(swapped, day_types, previous_fixed)
+        if len(chunk):
+            previous_as_is, previous_fixed = timestamps.to_numpy()[-1], swapped.to_numpy()[-1]
+    return fixed > as_is
+
+
+def normalise_chunk(chunk, swapped=None):
+    """
+    The column clean-up of 00b for one chunk: standard names, canonical
+    item names without NONE / empty lines, parsed DateTime and a Date key.
+    `swapped` is the export's date order (export_swaps_dates); None decides
+    from the chunk alone.
+    """
+    chunk = chunk.rename(columns=RAW_RENAMES)
+    chunk['Item'] = canonical(chunk['Item'])
+    chunk = chunk[chunk['Item'].notna()].copy()
+    chunk['DateTime'] = parse_export_datetime(chunk['DateTime'], chunk.get('DayType'), swapped)
+    chunk['Date'] = chunk['DateTime'].dt.strftime('%Y-%m-%d')
+    return chunk
+
+
+def transaction_chunks(path=RAW_PATH, chunk_rows=CHUNK_ROWS, txn_col='TransactionNo'):
+    """
+    Raw export in chunks of roughly chunk_rows lines, never splitting a basket.
+
+    Till exports list the lines of a transaction next to each other and in
+    transaction order. The lines of the last transaction of every chunk are
+    held back and prepended to the next chunk, because the rest of that basket
+    may still be unread. Raises ValueError if the export is not ordered by
+    transaction, since baskets could then be split silently.
+    """
+    carry = None
+    previous_last = None
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        ids = chunk[txn_col].to_numpy()
+        if len(ids) and (np.any(ids[1:] < ids[:-1]) or (previous_last is not None and ids[0] < previous_last)):
+            raise ValueError(f"{path} is not ordered by {txn_col}; sort it before streaming ingestion")
+        if len(ids):
+            previous_last = ids[-1]
+
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        straddling = chunk[txn_col].to_numpy() == previous_last
+        carry = chunk[straddling]
+        if (~straddling).any():
+            yield chunk[~straddling]
+
+    if carry is not None and len(carry):
+        yield carry
+
+
+def _write_partitions(chunk, out, part):
+    """One parquet file per date of the chunk, in hive layout Date=YYYY-MM-DD/."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    for date, lines in chunk.groupby('Date', sort=False):
+        directory = os.path.join(out, f'Date={date}')
+        os.makedirs(directory, exist_ok=True)
+        table = pa.Table.from_pandas(lines.drop(columns='Date'), preserve_index=False)
+        pq.write_table(table, os.path.join(directory, f'part-{part:05d}.parquet'))
+
+
+def outlet_path(out, outlet):
+    """Partition directory of one outlet in a multi-outlet dataset."""
+    return os.path.join(out, f'Outlet={outlet}')
+
+
+@traced('ingest')
+def ingest(path=RAW_PATH, out=INGEST_PATH, chunk_rows=CHUNK_ROWS, outlet=None):
+    """
+    Stream a raw export into a date-partitioned parquet dataset at `out`.
+
+    With an outlet id the export is written under its own Outlet=<id>
+    partition and only that partition is replaced; otherwise the whole
+    output directory is. Returns (lines, transactions, dates) written;
+    memory use is bounded by the chunk size, not the export size.
+    """
+    if outlet is not None:
+        out = outlet_path(out, outlet)
+    if os.path.exists(out):
+        shutil.rmtree(out)
+    os.makedirs(out)
+
+    # Date order decided once, so the dates do not depend on chunk_rows
+    swapped = export_swaps_dates(path, chunk_rows)
+    lines, transactions, dates = 0, 0, set()
+    for part, chunk in enumerate(transaction_chunks(path, chunk_rows)):
+        chunk = normalise_chunk(chunk, swapped)
+        _write_partitions(chunk, out, part)
+        lines += len(chunk)
+        transactions += chunk['Transaction'].nunique()
+        dates.update(chunk['Date'].unique())
+    return lines, transactions, len(dates)
+
+
+def load_lines(path=INGEST_PATH, start=None, end=None, columns=None, outlets=None):
+    """
+    Read an ingested dataset back, optionally only dates start..end
+    (inclusive, 'YYYY-MM-DD') and, for multi-outlet datasets, only the
+    given outlets; only the matching partitions are opened.
+    """
+    filters = []
+    if outlets is not None:
+        filters.append(('Outlet', 'in', list(outlets)))
+    if start:
+        filters.append(('Date', '>=', start))
+    if end:
+        filters.append(('Date', '<=', end))
+    df = pd.read_parquet(path, columns=columns, filters=filters or None)
+    if 'Date' in df.columns:
+        df['Date'] = df['Date'].astype(str)
+    if 'Outlet' in df.columns:
+        df['Outlet'] = df['Outlet'].astype(str)
+        return df.sort_values(['Outlet', 'Transaction'], kind='stable').reset_index(drop=True)
+    return df.sort_values(['Transaction'], kind='stable').reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stream a raw till export into date-partitioned parquet')
+    parser.add_argument('--raw', default=RAW_PATH)
+    parser.add_argument('--out', default=INGEST_PATH)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--outlet', default=None, help='outlet id; writes <out>/Outlet=<id>/')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("STREAMING INGESTION")
+    print("="*80)
+    print(f"Source: {args.raw} ({args.chunk_rows:,} lines per chunk)")
+
+    try:
+        lines, transactions, n_dates = ingest(args.raw, args.out, args.chunk_rows, args.outlet)
+    except FileNotFoundError:
+        print(f"✗ Error: {args.raw} not found")
+        exit(1)
+
+    target = args.out if args.outlet is None else outlet_path(args.out, args.outlet)
+    print(f"✓ Wrote {lines:,} lines / {transactions:,} transactions over {n_dates:,} dates to: {target}")
@@ -0,0 +1,192 @@
+"""
+Timing instrumentation
+Spans, a decorator and sequential step markers that write structured timing
+and memory records to a JSON-lines trace
+
+Controlled by environment variables so the scripts run unchanged:
+    BAKERY_TRACE=../trace.jsonl    append one JSON record per span
+    BAKERY_PROFILE=pairs,triplets  profile these spans / steps
+    BAKERY_PROFILER=pyinstrument   cprofile (default) or pyinstrument
+    BAKERY_PROFILE_DIR=../profiles where profile dumps are written
+
+Without BAKERY_TRACE or BAKERY_PROFILE every span is a no-op apart from two
+clock reads.
+
+Summarise a trace:
+    python instrument.py ../trace.jsonl
+"""
+
+import atexit
+import cProfile
+import functools
+import json
+import os
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+TRACE_PATH = os.environ.get('BAKERY_TRACE')
+PROFILE_STEPS = set(filter(None, os.environ.get('BAKERY_PROFILE', '').split(',')))
+PROFILER = os.environ.get('BAKERY_PROFILER', 'cprofile')
+PROFILE_DIR = os.environ.get('BAKERY_PROFILE_DIR', '../profiles')
+
+RUN_ID = uuid.uuid4().hex[:12]
+SCRIPT = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else 'interactive'
+
+_stack = []
+_open_step = None
+
+
+def _rss_mb():
+    """Current resident set size, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def _write(record):
+    with open(TRACE_PATH, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+@contextmanager
+def _profiled(name):
+    """cProfile or pyinstrument around a block, dumped to PROFILE_DIR/<name>.*"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = os.path.join(PROFILE_DIR, f"{os.path.splitext(SCRIPT)[0]}.{name}")
+
+    if PROFILER == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("⚠ pyinstrument not installed, falling back to cProfile")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(stem + '.html', 'w') as f:
+                    f.write(profiler.output_html())
+            return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(stem + '.prof')
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Time a block as a named span.
+
+    Nested spans record their parent, so the trace can be folded into a tree.
+    Extra keyword arguments are stored with the record (row counts, scale ...).
+    """
+    if not TRACE_PATH and name not in PROFILE_STEPS:
+        yield
+        return
+
+    span_id = uuid.uuid4().hex[:8]
+    parent = _stack[-1] if _stack else None
+    _stack.append(span_id)
+    rss_before = _rss_mb()
+    started = datetime.now().isoformat(timespec='milliseconds')
+    wall, cpu = time.perf_counter(), time.process_time()
+    error = None
+    try:
+        if name in PROFILE_STEPS:
+            with _profiled(name):
+                yield
+        else:
+            yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        _stack.pop()
+        if TRACE_PATH:
+            rss_after = _rss_mb()
+            record = {
+                'run': RUN_ID, 'script': SCRIPT, 'span': name, 'id': span_id, 'parent': parent,
+                'depth': len(_stack), 'start': started, 'wall_s': round(wall, 6), 'cpu_s': round(cpu, 6),
+                'rss_mb': rss_after, 'rss_delta_mb': None if rss_before is None else rss_after - rss_before,
+                'peak_rss_mb': _peak_rss_mb()
+            }
+            if error:
+                record['error'] = error
+            if attrs:
+                record['attrs'] = attrs
+            _write(record)
+
+
+def traced(name=None):
+    """Decorator form of span; the span is named after the function by default."""
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def step(name, **attrs):
+    """
+    Start a sequential step, ending the previous one.
+
+    For top-level scripts whose sections follow one another: one call per
+    section header, no re-indentation. The last step ends at exit.
+    """
+    global _open_step
+    end_step()
+    _open_step = span(name, **attrs)
+    _open_step.__enter__()
+
+
+def end_step():
+    """End the current step, if any."""
+    global _open_step
+    if _open_step is not None:
+        current, _open_step = _open_step, None
+        current.__exit__(None, None, None)
+
+
+atexit.register(end_step)
+
+
+def summarise(path):
+    """Total wall/cpu time per script and span over all runs in a trace (depth 0 = steps)."""
+    import pandas as pd
+
+    trace = pd.read_json(path, lines=True)
+    return (trace.groupby(['script', 'span'], sort=False)
+                 .agg(depth=('depth', 'min'), runs=('run', 'nunique'),
+                      wall_s=('wall_s', 'sum'), cpu_s=('cpu_s', 'sum'), peak_rss_mb=('peak_rss_mb', 'max'))
+                 .sort_values('wall_s', ascending=False))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python instrument.py <trace.jsonl>")
+        sys.exit(1)
+    print(summarise(sys.argv[1]).to_string(float_format=lambda x: f'{x:.3f}'))
@@ -0,0 +1,303 @@
+"""
+Itemset counting
+Vectorized pair/triplet counting over CSR baskets, a multi-core mode with the
+basket arrays in shared memory, and an out-of-core map-reduce over the date
+partitions written by ingest.py
+
+A k-itemset count matrix has one row per first item and one column per
+encoding of the remaining k-1 items (base n_items), so partial results from
+different partitions are plain sparse matrices that merge by addition.
+
+Usage:
+    python itemsets.py                       # ../data/processed/lines
+    python itemsets.py --processes 4 --sizes 2,3
+"""
+
+import argparse
+import multiprocessing
+import os
+from collections import Counter
+from itertools import combinations
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.special import comb
+
+from baskets import Baskets
+from ingest import INGEST_PATH
+from instrument import traced
+
+# Combinations materialised per block when enumerating itemsets
+BLOCK_COMBINATIONS = 1 << 22
+
+
+def basket_incidence(lines, items, txn_col='Transaction', item_col='Item'):
+    """
+    Binary transaction × item CSR matrix over a fixed item vocabulary.
+
+    Items outside the vocabulary are dropped. Column indices are sorted and
+    unique within each row, as count_itemsets expects.
+    """
+    return Baskets.from_lines(lines, txn_col, item_col, items).incidence()
+
+
+def count_itemsets(indptr, indices, n_items, k):
+    """
+    Count every k-itemset contained in the baskets of a CSR structure.
+
+    Baskets are grouped by size s; for each group the C(s, k) position
+    combinations are gathered from the item code array in one fancy-indexing
+    step, in blocks of at most BLOCK_COMBINATIONS itemsets. Returns a sparse
+    (n_items, n_items**(k-1)) int64 matrix; see itemset_table for decoding.
+    """
+    sizes = np.diff(indptr)
+    row_parts, col_parts = [], []
+    weights = n_items ** np.arange(k - 2, -1, -1, dtype=np.int64)
+
+    for s in np.unique(sizes[sizes >= k]):
+        combos = np.array(list(combinations(range(s), k)), dtype=np.int64)
+        baskets = np.flatnonzero(sizes == s)
+        per_block = max(1, BLOCK_COMBINATIONS // len(combos))
+        for start in range(0, len(baskets), per_block):
+            block = baskets[start:start + per_block]
+            basket_items = indices[indptr[block][:, None] + np.arange(s)]
+            itemsets = basket_items[:, combos].reshape(-1, k).astype(np.int64)
+            row_parts.append(itemsets[:, 0])
+            col_parts.append(itemsets[:, 1:] @ weights if k > 1 else np.zeros(len(itemsets), dtype=np.int64))
+
+    rows = np.concatenate(row_parts) if row_parts else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(col_parts) if col_parts else np.zeros(0, dtype=np.int64)
+    counts = sparse.coo_matrix((np.ones(len(rows), dtype=np.int64), (rows, cols)),
+                               shape=(n_items, n_items ** (k - 1)))
+    return counts.tocsr()
+
+
+def itemset_table(counts, items, k, top=None):
+    """
+    Long-format itemsets from a count matrix, most frequent first.
+
+    Columns Product1 .. Product{k} and Count; ties are broken by item names.
+    """
+    coo = counts.tocoo()
+    items = np.asarray(items)
+    n = len(items)
+    table = {'Product1': items[coo.row]}
+    rest = coo.col.astype(np.int64)
+    for j in range(k - 1, 0, -1):
+        table[f'Product{j + 1}'] = items[rest % n]
+        rest //= n
+    table = pd.DataFrame(table)[[f'Product{j + 1}' for j in range(k)]]
+    table['Count'] = coo.data
+    table = table.sort_values(['Count'] + [f'Product{j + 1}' for j in range(k)],
+                              ascending=[False] + [True] * k).reset_index(drop=True)
+    return table.head(top) if top else table
+
+
+def tree_reduce(partials, combine):
+    """
+    Merge a stream of partial results pairwise, like a binary counter.
+
+    Partials are combined as soon as two of the same level exist, so at most
+    O(log n) of them are alive at once and each merge joins similar sizes.
+    """
+    stack = []
+    for value in partials:
+        level = 0
+        while stack and stack[-1][0] == level:
+            value = combine(stack.pop()[1], value)
+            level += 1
+        stack.append((level, value))
+    if not stack:
+        return None
+    result = stack.pop()[1]
+    while stack:
+        result = combine(stack.pop()[1], result)
+    return result
+
+
+def to_counter(counts, items, k):
+    """Itemset counts as a Counter of item-name tuples, like processing.count_pairs."""
+    table = itemset_table(counts, items, k)
+    return Counter(dict(zip(table.iloc[:, :k].itertuples(index=False, name=None), table['Count'])))
+
+
+# ============================================================================
+# SHARED-MEMORY PARALLEL COUNTING
+# ============================================================================
+
+def _pool(processes):
+    """Process pool, forked where possible so top-level scripts are not re-imported."""
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    return context.Pool(processes)
+
+
+def _share(array):
+    """Copy an array into a new shared memory block; returns (block, spec)."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _count_shard(task):
+    """Map step: itemset counts of the baskets start..end, read from shared memory."""
+    (indptr_spec, indices_spec), n_items, sizes, start, end = task
+    blocks = [shared_memory.SharedMemory(name=spec[0]) for spec in (indptr_spec, indices_spec)]
+    try:
+        indptr, indices = (np.ndarray(spec[1], dtype=spec[2], buffer=block.buf)
+                           for spec, block in zip((indptr_spec, indices_spec), blocks))
+        counts = {k: count_itemsets(indptr[start:end + 1], indices, n_items, k) for k in sizes}
+        del indptr, indices
+    finally:
+        for block in blocks:
+            block.close()
+    return counts
+
+
+def shard_bounds(indptr, sizes, n_shards):
+    """
+    Split basket rows into contiguous shards of similar work, measured as
+    the number of itemsets each basket contributes.
+    """
+    basket_sizes = np.diff(indptr)
+    work = sum(comb(basket_sizes, k) for k in sizes)
+    cumulative = np.concatenate([[0], np.cumsum(work)])
+    targets = np.linspace(0, cumulative[-1], n_shards + 1)
+    bounds = np.unique(np.searchsorted(cumulative, targets))
+    bounds[0], bounds[-1] = 0, len(basket_sizes)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+@traced('parallel_itemsets')
+def count_parallel(B, sizes=(2, 3), processes=None, shards_per_process=4):
+    """
+    Itemset counts of a basket matrix on a process pool.
+
+    B.indptr and B.indices are placed in multiprocessing.shared_memory once;
+    each task only carries the block names and a row range, so basket data is
+    never pickled. Workers return partial count matrices, merged with
+    tree_reduce. Returns {k: counts} exactly equal to count_itemsets on the
+    whole matrix.
+    """
+    processes = processes or os.cpu_count()
+    B = sparse.csr_matrix(B)
+    B.sort_indices()
+    shared = [_share(B.indptr), _share(B.indices)]
+    specs = tuple(spec for _, spec in shared)
+    try:
+        tasks = [(specs, B.shape[1], tuple(sizes), start, end)
+                 for start, end in shard_bounds(B.indptr, sizes, processes * shards_per_process)]
+        with _pool(processes) as pool:
+            counts = tree_reduce(pool.imap_unordered(_count_shard, tasks), _merge)
+    finally:
+        for block, _ in shared:
+            block.close()
+            block.unlink()
+    if counts is None:
+        counts = {k: count_itemsets(B.indptr, B.indices, B.shape[1], k) for k in sizes}
+    return counts
+
+
+# ============================================================================
+# PARTITIONED COUNTING
+# ============================================================================
+
+def partition_paths(path=INGEST_PATH):
+    """
+    Date partitions (Date=YYYY-MM-DD directories) of an ingested dataset, in
+    date order. A chain dataset (Outlet=<id>/Date=...) lists every outlet's
+    partitions, outlet by outlet; each holds whole baskets of one outlet.
+    Raises ValueError if there are none.
+    """
+    partitions = []
+    for name in sorted(os.listdir(path)):
+        if name.startswith('Date='):
+            partitions.append(os.path.join(path, name))
+        elif name.startswith('Outlet='):
+            outlet = os.path.join(path, name)
+            partitions.extend(os.path.join(outlet, date) for date in sorted(os.listdir(outlet))
+                              if date.startswith('Date='))
+    if not partitions:
+        raise ValueError(f"{path}: no Date= or Outlet=/Date= partitions (run ingest.py first)")
+    return partitions
+
+
+def item_vocabulary(partitions):
+    """Sorted item names over all partitions, reading only the Item column of one partition at a time."""
+    import pyarrow.parquet as pq
+
+    items = set()
+    for partition in partitions:
+        items.update(pq.read_table(partition, columns=['Item']).column('Item').unique().to_pylist())
+    return pd.Index(sorted(items))
+
+
+_worker_items = None
+
+
+def _init_worker(items):
+    global _worker_items
+    _worker_items = items
+
+
+def _count_partition(task):
+    """Map step: itemset count matrices of one partition."""
+    partition, sizes = task
+    lines = pd.read_parquet(partition, columns=['Transaction', 'Item'])
+    B = basket_incidence(lines, _worker_items)
+    return {k: count_itemsets(B.indptr, B.indices, len(_worker_items), k) for k in sizes}
+
+
+def _merge(left, right):
+    return {k: left[k] + right[k] for k in left}
+
+
+@traced('partitioned_itemsets')
+def count_partitioned(path=INGEST_PATH, sizes=(2, 3), processes=None):
+    """
+    Itemset counts over an ingested dataset, one date partition at a time.
+
+    Every partition is mapped to partial count matrices (on a process pool
+    when processes > 1) and the partials are merged with tree_reduce as they
+    arrive. Peak memory is one partition per worker plus O(log partitions)
+    partial matrices, independent of the number of days. Transactions never
+    span partitions, since ingestion keeps each basket on its date.
+    Returns ({k: counts}, items).
+    """
+    partitions = partition_paths(path)
+    items = item_vocabulary(partitions)
+    tasks = [(partition, tuple(sizes)) for partition in partitions]
+
+    if processes and processes > 1:
+        with Pool(processes, initializer=_init_worker, initargs=(items,)) as pool:
+            counts = tree_reduce(pool.imap_unordered(_count_partition, tasks), _merge)
+    else:
+        _init_worker(items)
+        counts = tree_reduce(map(_count_partition, tasks), _merge)
+    return counts, items
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Count pairs/triplets over an ingested dataset')
+    parser.add_argument('--path', default=INGEST_PATH)
+    parser.add_argument('--sizes', default='2,3', help='itemset sizes to count')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    print("="*80)
+    print("PARTITIONED ITEMSET COUNTING")
+    print("="*80)
+
+    sizes = [int(k) for k in args.sizes.split(',')]
+    counts, items = count_partitioned(args.path, sizes, args.processes)
+    print(f"Partitions: {len(partition_paths(args.path)):,}  Items: {len(items):,}")
+
+    for k in sizes:
+        table = itemset_table(counts[k], items, k)
+        print(f"\nTop {args.top} itemsets of size {k} ({len(table):,} distinct):")
+        for _, row in table.head(args.top).iterrows():
+            names = ' + '.join(row[f'Product{j + 1}'][:20] for j in range(k))
+            print(f"  {names:70s}: {row['Count']:,}")
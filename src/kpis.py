@@ -0,0 +1,267 @@
+"""
+KPI registry
+Named metrics computed from the shared aggregates (transaction table and
+traffic cube) instead of figures typed into dashboard text
+
+Every KPI is a function registered with @kpi whose parameters name its
+inputs: either a base input ('transactions', 'traffic') or another KPI /
+aggregate. KPIs.get evaluates lazily in dependency order and caches each
+value, so shared aggregates such as the hourly totals are computed once
+however many KPIs use them.
+
+    from kpis import KPIs
+    kpis = KPIs.from_processed()
+    kpis['solo_rate']            # 0.3836
+    kpis.format('solo_rate')     # '38.4%'
+
+Usage:
+    python kpis.py               # every KPI of the processed data
+"""
+
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from traffic_cube import TrafficCube
+from transactions import load_transactions
+
+# Share of solo buyers assumed to add a second item when prompted
+CROSS_SELL_CONVERSION = 0.2
+DEAD_ZONE_HOUR = 17
+SLUMP_HOURS = (16, 18)
+MORNING_HOURS = (0, 12)
+
+BASE_INPUTS = ('transactions', 'traffic')
+
+REGISTRY = {}
+
+
+class KPI:
+    """A registered metric: its function, inputs, label and default format."""
+
+    def __init__(self, name, func, label, fmt, aggregate):
+        self.name = name
+        self.func = func
+        self.label = label
+        self.fmt = fmt
+        self.aggregate = aggregate
+        self.inputs = tuple(inspect.signature(func).parameters)
+
+    def format(self, value):
+        """Value in the KPI's format; 'n/a' for a missing (NaN) value."""
+        if np.isscalar(value) and pd.isna(value):
+            return 'n/a'
+        return self.fmt(value) if callable(self.fmt) else self.fmt.format(value)
+
+
+def kpi(label=None, fmt='{:.1%}', aggregate=False):
+    """
+    Register a function as a KPI named after it.
+
+    Aggregates (aggregate=True) are intermediate values shared by several
+    KPIs; they are cached like KPIs but left out of tables.
+    """
+    def register(func):
+        if func.__name__ in REGISTRY or func.__name__ in BASE_INPUTS:
+            raise ValueError(f"KPI {func.__name__!r} is already defined")
+        REGISTRY[func.__name__] = KPI(func.__name__, func, label or func.__name__.replace('_', ' ').capitalize(),
+                                      fmt, aggregate)
+        return func
+    return register
+
+
+class KPIs:
+    """Lazily evaluated, cached KPI values for one dataset."""
+
+    def __init__(self, transactions, traffic, registry=None):
+        self.registry = REGISTRY if registry is None else registry
+        self.values = {'transactions': transactions, 'traffic': traffic}
+        self._evaluating = []
+
+    @classmethod
+    def from_processed(cls):
+        """KPIs of the transaction table and traffic cube written by 00b."""
+        return cls(load_transactions(), TrafficCube.load())
+
+    def get(self, name):
+        if name in self.values:
+            return self.values[name]
+        if name not in self.registry:
+            raise KeyError(f"unknown KPI {name!r}")
+        if name in self._evaluating:
+            cycle = ' → '.join(self._evaluating[self._evaluating.index(name):] + [name])
+            raise ValueError(f"KPI dependency cycle: {cycle}")
+
+        metric = self.registry[name]
+        self._evaluating.append(name)
+        try:
+            value = metric.func(*(self.get(dependency) for dependency in metric.inputs))
+        finally:
+            self._evaluating.pop()
+        self.values[name] = value
+        return value
+
+    __getitem__ = get
+
+    def format(self, name):
+        return self.registry[name].format(self.get(name))
+
+    def evaluate(self):
+        """Compute every registered KPI (each shared aggregate once); returns {name: value}."""
+        return {name: self.get(name) for name, metric in self.registry.items() if not metric.aggregate}
+
+    def table(self):
+        """One row per KPI: Name, Label, Value, Formatted."""
+        values = self.evaluate()
+        return pd.DataFrame({
+            'Name': list(values),
+            'Label': [self.registry[name].label for name in values],
+            'Value': list(values.values()),
+            'Formatted': [self.registry[name].format(value) for name, value in values.items()]
+        })
+
+
+# ============================================================================
+# SHARED AGGREGATES
+# ============================================================================
+
+@kpi(aggregate=True)
+def hourly_transactions(traffic):
+    return traffic.by_hour()
+
+
+@kpi(aggregate=True)
+def basket_size_by_weekday(transactions):
+    return transactions.groupby('DayOfWeek')['BasketSize'].mean().reindex(range(7))
+
+
+# ============================================================================
+# KPIS
+# ============================================================================
+
+def _month_range(dates):
+    first, last = pd.Timestamp(dates[0]), pd.Timestamp(dates[1])
+    return f"{first:%b %Y} - {last:%b %Y}"
+
+
+@kpi('Dataset period', fmt=_month_range)
+def period(traffic):
+    return traffic.dates.min(), traffic.dates.max()
+
+
+@kpi('Total transactions', fmt='{:,}')
+def total_transactions(transactions):
+    return len(transactions)
+
+
+@kpi('Total items sold', fmt='{:,}')
+def total_items(transactions):
+    return int(transactions['BasketSize'].sum())
+
+
+@kpi('Average basket size', fmt='{:.2f} items')
+def avg_basket_size(transactions):
+    return transactions['BasketSize'].mean()
+
+
+@kpi('Solo buyers')
+def solo_rate(transactions):
+    return (transactions['BasketSize'] == 1).mean()
+
+
+@kpi('Cross-sell potential', fmt='{:+.1%} items')
+def cross_sell_potential(solo_rate):
+    """Extra items per transaction if CROSS_SELL_CONVERSION of solo buyers add one item."""
+    return solo_rate * CROSS_SELL_CONVERSION
+
+
+@kpi('Cross-sell revenue potential', fmt='{:+.1%} revenue')
+def cross_sell_revenue(transactions):
+    """
+    Extra revenue if CROSS_SELL_CONVERSION of solo buyers add one item at the
+    average line value of multi-item baskets; NaN without basket values (no price table).
+    """
+    if 'BasketValue' not in transactions.columns:
+        return np.nan
+    multi = transactions['BasketSize'] > 1
+    add_on_value = transactions.loc[multi, 'BasketValue'].sum() / transactions.loc[multi, 'BasketSize'].sum()
+    extra = CROSS_SELL_CONVERSION * (~multi).sum() * add_on_value
+    return extra / transactions['BasketValue'].sum()
+
+
+@kpi('Average basket value', fmt='£{:.2f}')
+def avg_basket_value(transactions):
+    return transactions['BasketValue'].mean() if 'BasketValue' in transactions.columns else np.nan
+
+
+@kpi('Coffee in multi-item baskets')
+def coffee_multi_item_share(transactions):
+    return transactions.loc[transactions['BasketSize'] > 1, 'HasCoffee'].mean()
+
+
+@kpi('Weekend morning transactions per day', fmt='{:.1f}')
+def weekend_morning_avg(traffic):
+    return traffic.by_date(traffic.is_weekend, hours=MORNING_HOURS).mean()
+
+
+@kpi('Weekday morning transactions per day', fmt='{:.1f}')
+def weekday_morning_avg(traffic):
+    return traffic.by_date(~traffic.is_weekend, hours=MORNING_HOURS).mean()
+
+
+@kpi('Weekend morning ratio', fmt='{:.2f}x')
+def weekend_morning_ratio(weekend_morning_avg, weekday_morning_avg):
+    return weekend_morning_avg / weekday_morning_avg
+
+
+@kpi('Weekend morning lift', fmt='{:+.0%}')
+def weekend_morning_lift(weekend_morning_ratio):
+    return weekend_morning_ratio - 1
+
+
+@kpi('Peak hour', fmt='{:02d}:00')
+def peak_hour(hourly_transactions):
+    return int(hourly_transactions.idxmax())
+
+
+@kpi('Dead zone vs peak', fmt='{:+.0%}')
+def dead_zone_drop(hourly_transactions):
+    """Transactions in the DEAD_ZONE_HOUR (5 PM) relative to the peak hour."""
+    return hourly_transactions.get(DEAD_ZONE_HOUR, 0) / hourly_transactions.max() - 1
+
+
+@kpi('Afternoon slump vs peak', fmt='{:+.0%}')
+def afternoon_slump(hourly_transactions):
+    """Average transactions per hour over SLUMP_HOURS (4-6 PM) relative to the peak hour."""
+    slump = hourly_transactions.reindex(range(*SLUMP_HOURS), fill_value=0).mean()
+    return slump / hourly_transactions.max() - 1
+
+
+@kpi('Sunday basket premium vs Friday', fmt='{:+.0%}')
+def sunday_basket_premium(basket_size_by_weekday):
+    return basket_size_by_weekday[6] / basket_size_by_weekday[4] - 1
+
+
+@kpi('Monday morning premium vs Tue-Fri', fmt='{:+.0%}')
+def monday_morning_premium(traffic):
+    """Morning transactions per Monday over those per Tuesday-Friday (per-day averages, like significance.py)."""
+    monday = traffic.by_date(traffic.weekday == 0, hours=MORNING_HOURS).mean()
+    tue_fri = traffic.by_date((traffic.weekday >= 1) & (traffic.weekday <= 4), hours=MORNING_HOURS).mean()
+    return monday / tue_fri - 1
+
+
+if __name__ == '__main__':
+    print("="*80)
+    print("KEY PERFORMANCE INDICATORS")
+    print("="*80)
+
+    try:
+        kpis = KPIs.from_processed()
+    except FileNotFoundError as e:
+        print(f"✗ Error: {e.filename} not found")
+        print("  Please run 00b_data_processing.py first")
+        raise SystemExit(1)
+
+    for row in kpis.table().itertuples(index=False):
+        print(f"  {row.Label:40s}: {row.Formatted}")
@@ -0,0 +1,413 @@
+"""
+Live till feed
+Consumes transaction lines as they are written (an append-only export file
+that is followed like tail -f, or lines sent to a local socket) and keeps
+the aggregates of 00b up to date in memory: traffic cube, item counts, pair
+counts and the basket size histogram
+
+Each line is an export row in the BreadBasket_DMS.csv schema (the header
+says which columns hold transaction, item and timestamp). The lines of a
+basket arrive together, as till exports write them (see
+ingest.transaction_chunks), so every line is a constant-time update plus
+one pair count per distinct item already in its basket. The aggregates are
+snapshotted to disk every --every seconds and on exit, and can be queried
+while the feed runs: over the socket, a line starting with # is a query
+answered with one JSON line (#summary, #items 10, #pairs 10, #baskets,
+#snapshot).
+
+Usage:
+    python live_feed.py --file ../data/live/till.csv                # follow a growing export
+    python live_feed.py --file ../data/raw/BreadBasket_DMS.csv --idle 1   # replay, stop when idle
+    python live_feed.py --port 8060                                 # lines over TCP
+    printf '#pairs 5\\n' | nc 127.0.0.1 8060
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from anomalies import AnomalyDetector
+from catalogue import canonical, load_aliases
+from traffic_cube import TrafficCube, SLOTS, SLOTS_PER_HOUR
+
+LIVE_PATH = '../data/processed/live'
+RAW_HEADER = 'TransactionNo,Items,DateTime,Daypart,DayType'
+SNAPSHOT_SECONDS = 60
+POLL_SECONDS = 0.2
+HOST = '127.0.0.1'
+PORT = 8060
+
+MINUTES_PER_SLOT = 60 // SLOTS_PER_HOUR
+
+
+class LineParser:
+    """Splits export lines into (transaction, item, timestamp) using the export header."""
+
+    def __init__(self, header=RAW_HEADER):
+        columns = [column.strip() for column in header.strip().split(',')]
+
+        def index(*names):
+            return next((columns.index(name) for name in names if name in columns), None)
+
+        self.transaction = index('TransactionNo', 'Transaction')
+        self.item = index('Items', 'Item')
+        self.datetime = index('DateTime')
+        self.date, self.time = index('Date'), index('Time')
+        self.day_type = index('DayType')
+        self.last = None
+        if self.transaction is None or self.item is None or (self.datetime is None and self.date is None):
+            raise ValueError(f"header {header.strip()!r} has no transaction, item or timestamp column")
+
+    @staticmethod
+    def is_header(line):
+        return not line.lstrip()[:1].isdigit()
+
+    def parse(self, line):
+        fields = next(csv.reader([line])) if '"' in line else line.rstrip('\r\n').split(',')
+        if self.datetime is not None:
+            timestamp = datetime.fromisoformat(fields[self.datetime])
+        else:
+            timestamp = datetime.fromisoformat(f"{fields[self.date]} {fields[self.time]}")
+        timestamp = self._resolve(timestamp, fields)
+        return int(fields[self.transaction]), fields[self.item], timestamp
+
+    def _resolve(self, timestamp, fields):
+        """
+        Line-at-a-time version of ingest.parse_export_datetime: where the
+        day is 12 or less the export may have swapped day and month, so take
+        the reading that matches the line's DayType, then the one that does
+        not go back in time.
+        """
+        if timestamp.day <= 12 and timestamp.day != timestamp.month:
+            readings = [timestamp, timestamp.replace(month=timestamp.day, day=timestamp.month)]
+            if self.day_type is not None:
+                weekend = fields[self.day_type] == 'Weekend'
+                readings = [reading for reading in readings if (reading.weekday() >= 5) == weekend] or readings
+            if self.last is not None and len(readings) > 1:
+                later = [reading for reading in readings if reading >= self.last]
+                readings = sorted(later or readings, key=lambda reading: abs(reading - self.last))
+            timestamp = readings[0]
+        self.last = timestamp
+        return timestamp
+
+
+class LiveAggregates:
+    """In-memory aggregates updated one line at a time."""
+
+    def __init__(self, detector=None):
+        self.days = {}
+        self.aliases = load_aliases()
+        self.codes = {}
+        self.spellings = {}
+        self.item_names = []
+        self.item_counts = []
+        self.pair_counts = Counter()
+        self.basket_sizes = Counter()
+        self.lines = 0
+        self.transactions = 0
+        self.detector = detector
+        self.anomalies = []
+        self.late = 0
+        self._basket = None
+        self._basket_items = set()
+        self._basket_size = 0
+        self._slot = None
+        self._slot_count = 0
+
+    def _intern(self, spelling):
+        """Code of a raw item spelling not seen before (-1 for lines 00b drops)."""
+        item = canonical([spelling], self.aliases)[0]
+        if item is None:
+            return -1
+        code = self.codes.get(item)
+        if code is None:
+            code = self.codes[item] = len(self.item_names)
+            self.item_names.append(item)
+            self.item_counts.append(0)
+        return code
+
+    def add(self, transaction, item, timestamp):
+        """Add one line; returns False for lines 00b drops (NONE / empty items)."""
+        code = self.spellings.get(item)
+        if code is None:
+            code = self.spellings[item] = self._intern(item)
+        if code < 0:
+            return False
+
+        date = timestamp.date()
+        slot = timestamp.hour * SLOTS_PER_HOUR + timestamp.minute // MINUTES_PER_SLOT
+        day = self.days.get(date)
+        if day is None:
+            day = self.days[date] = np.zeros((2, SLOTS), dtype=np.int64)
+
+        if transaction != self._basket:
+            self._basket, self._basket_items, self._basket_size = transaction, set(), 0
+            self.transactions += 1
+            day[0, slot] += 1
+            if self.detector is not None:
+                self._count_slot(date, slot)
+        day[1, slot] += 1
+        self.item_counts[code] += 1
+        self.lines += 1
+
+        if code not in self._basket_items:
+            for other in self._basket_items:
+                self.pair_counts[(other, code) if other < code else (code, other)] += 1
+            self._basket_items.add(code)
+        if self._basket_size:
+            self.basket_sizes[self._basket_size] -= 1
+        self._basket_size += 1
+        self.basket_sizes[self._basket_size] += 1
+        return True
+
+    def _count_slot(self, date, slot):
+        """
+        Pass completed quarter hours to the anomaly detector.
+
+        Baskets stamped before the open quarter hour (a till clock set back,
+        or the swapped dates of the raw export) are in the cube but cannot
+        be scored any more; they are only counted as late.
+        """
+        if self._slot is not None and (date, slot) < self._slot:
+            self.late += 1
+            return
+        if self._slot is None or (date, slot) > self._slot:
+            if self._slot is not None:
+                self.anomalies += self.detector.observe(*self._slot, self._slot_count)
+            self._slot, self._slot_count = (date, slot), 0
+        self._slot_count += 1
+
+    def close(self):
+        """End of feed: hand the open quarter hour and day to the detector."""
+        if self.detector is not None and self._slot is not None:
+            self.anomalies += self.detector.observe(*self._slot, self._slot_count)
+            self.anomalies += self.detector.flush()
+            self._slot = None
+
+    # ------------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------------
+
+    def cube(self):
+        """TrafficCube of everything seen so far."""
+        dates = sorted(self.days)
+        counts = np.stack([self.days[date] for date in dates]) if dates else np.zeros((0, 2, SLOTS), dtype=np.int64)
+        return TrafficCube(np.array(dates, dtype='datetime64[D]'), counts[:, 0], counts[:, 1])
+
+    def item_table(self, top=None):
+        """Item, Count; most sold first."""
+        table = pd.DataFrame({'Item': self.item_names, 'Count': self.item_counts})
+        table = table.sort_values(['Count', 'Item'], ascending=[False, True]).reset_index(drop=True)
+        return table.head(top) if top else table
+
+    def pair_table(self, top=None):
+        """Product1, Product2 (alphabetical) and Count, like itemsets.itemset_table."""
+        names = self.item_names
+        rows = [(*sorted((names[a], names[b])), count) for (a, b), count in self.pair_counts.items()]
+        table = pd.DataFrame(rows, columns=['Product1', 'Product2', 'Count'])
+        table = table.sort_values(['Count', 'Product1', 'Product2'], ascending=[False, True, True]).reset_index(drop=True)
+        return table.head(top) if top else table
+
+    def basket_size_table(self):
+        """BasketSize, Baskets."""
+        sizes = sorted(size for size, baskets in self.basket_sizes.items() if baskets)
+        return pd.DataFrame({'BasketSize': sizes, 'Baskets': [self.basket_sizes[size] for size in sizes]})
+
+    def summary(self):
+        dates = sorted(self.days)
+        return {
+            'lines': self.lines,
+            'transactions': self.transactions,
+            'items': len(self.item_names),
+            'dates': len(dates),
+            'first_date': str(dates[0]) if dates else None,
+            'last_date': str(dates[-1]) if dates else None,
+            'anomalies': len(self.anomalies),
+            'late_baskets': self.late
+        }
+
+    def query(self, command):
+        """Answer a '#name [top]' query as a JSON-serialisable object."""
+        name, _, argument = command.lstrip('#').strip().partition(' ')
+        top = int(argument) if argument.strip() else None
+        if name == 'summary':
+            return self.summary()
+        if name == 'items':
+            return self.item_table(top).to_dict(orient='records')
+        if name == 'pairs':
+            return self.pair_table(top).to_dict(orient='records')
+        if name == 'baskets':
+            return self.basket_size_table().to_dict(orient='records')
+        raise KeyError(f"unknown query {name!r} (summary, items, pairs, baskets, snapshot)")
+
+    def snapshot(self, directory=LIVE_PATH):
+        """Write the aggregates to directory; each file is replaced atomically."""
+        os.makedirs(directory, exist_ok=True)
+
+        def replace(name, write):
+            root, extension = os.path.splitext(name)
+            temporary = os.path.join(directory, f'{root}.tmp{extension}')
+            write(temporary)
+            os.replace(temporary, os.path.join(directory, name))
+
+        replace('traffic_cube.npz', self.cube().save)
+        replace('item_counts.csv', lambda path: self.item_table().to_csv(path, index=False))
+        replace('product_pairs.csv', lambda path: self.pair_table().to_csv(path, index=False))
+        replace('basket_sizes.csv', lambda path: self.basket_size_table().to_csv(path, index=False))
+        replace('summary.json', lambda path: _write_json(path, self.summary()))
+
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+def follow(path, from_start=True, poll=POLL_SECONDS, idle=None):
+    """
+    Complete lines appended to a file, like tail -f.
+
+    A partly written last line is held until its newline arrives. Stops
+    after `idle` seconds without new data (never when idle is None).
+    """
+    with open(path) as f:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        partial = ''
+        waited = 0.0
+        while True:
+            line = f.readline()
+            if not line:
+                if idle is not None and waited >= idle:
+                    return
+                time.sleep(poll)
+                waited += poll
+                continue
+            waited = 0.0
+            if not line.endswith('\n'):
+                partial += line
+                continue
+            yield partial + line
+            partial = ''
+
+
+def consume(lines, aggregates, parser=None, snapshot_dir=LIVE_PATH, every=SNAPSHOT_SECONDS):
+    """Feed lines into aggregates, snapshotting every `every` seconds and at the end; returns the parser used."""
+    parser = parser or LineParser()
+    last = time.monotonic()
+    for line in lines:
+        if LineParser.is_header(line):
+            if line.strip():
+                parser = LineParser(line)
+            continue
+        aggregates.add(*parser.parse(line))
+        if snapshot_dir and time.monotonic() - last >= every:
+            aggregates.snapshot(snapshot_dir)
+            last = time.monotonic()
+    aggregates.close()
+    if snapshot_dir:
+        aggregates.snapshot(snapshot_dir)
+    return parser
+
+
+async def _serve_connection(aggregates, snapshot_dir, reader, writer):
+    parser = LineParser()
+    try:
+        while line := (await reader.readline()).decode():
+            if line.startswith('#'):
+                try:
+                    if line.strip() == '#snapshot':
+                        aggregates.snapshot(snapshot_dir)
+                        answer = {'snapshot': snapshot_dir}
+                    else:
+                        answer = aggregates.query(line)
+                except (KeyError, ValueError) as e:
+                    answer = {'error': e.args[0]}
+                writer.write(json.dumps(answer).encode() + b'\n')
+                await writer.drain()
+            elif LineParser.is_header(line):
+                if line.strip():
+                    parser = LineParser(line)
+            else:
+                aggregates.add(*parser.parse(line))
+    except (ConnectionResetError, ValueError) as e:
+        print(f"⚠ Connection closed: {e}")
+    finally:
+        writer.close()
+
+
+async def _snapshots(aggregates, snapshot_dir, every):
+    while True:
+        await asyncio.sleep(every)
+        aggregates.snapshot(snapshot_dir)
+
+
+async def serve(aggregates, host=HOST, port=PORT, snapshot_dir=LIVE_PATH, every=SNAPSHOT_SECONDS):
+    server = await asyncio.start_server(lambda r, w: _serve_connection(aggregates, snapshot_dir, r, w), host, port)
+    print(f"✓ Listening on {host}:{port} (snapshots every {every} s to {snapshot_dir})", flush=True)
+    snapshots = asyncio.create_task(_snapshots(aggregates, snapshot_dir, every))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        snapshots.cancel()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Incremental aggregates over a live till feed')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--file', help='append-only export to follow')
+    source.add_argument('--port', type=int, help='accept lines on this local TCP port')
+    parser.add_argument('--from-end', action='store_true', help='skip the lines already in --file')
+    parser.add_argument('--idle', type=float, default=None, help='stop after this many idle seconds')
+    parser.add_argument('--out', default=LIVE_PATH, help='snapshot directory')
+    parser.add_argument('--every', type=float, default=SNAPSHOT_SECONDS, help='seconds between snapshots')
+    parser.add_argument('--anomalies', action='store_true', help='flag unusual hours and days as they complete')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("LIVE TILL FEED")
+    print("="*80)
+
+    aggregates = LiveAggregates(AnomalyDetector(flagged_only=True) if args.anomalies else None)
+    if args.port is not None:
+        try:
+            asyncio.run(serve(aggregates, HOST, args.port, args.out, args.every))
+        except KeyboardInterrupt:
+            pass
+        aggregates.close()
+        aggregates.snapshot(args.out)
+    else:
+        if not os.path.exists(args.file):
+            print(f"✗ Error: {args.file} not found")
+            exit(1)
+        start = time.perf_counter()
+        try:
+            consume(follow(args.file, not args.from_end, idle=args.idle), aggregates,
+                    snapshot_dir=args.out, every=args.every)
+        except KeyboardInterrupt:
+            aggregates.close()
+            aggregates.snapshot(args.out)
+        elapsed = time.perf_counter() - start
+        print(f"✓ {aggregates.lines:,} lines / {aggregates.transactions:,} transactions in {elapsed:.1f} s")
+
+    summary = aggregates.summary()
+    print(f"  {summary['dates']} dates ({summary['first_date']} to {summary['last_date']}), {summary['items']} items")
+    for row in aggregates.pair_table(5).itertuples(index=False):
+        print(f"  {row.Product1[:20]:20s} + {row.Product2[:20]:20s}: {row.Count:,}")
+    for anomaly in aggregates.anomalies:
+        hour = '' if anomaly['Level'] == 'day' else f" {int(anomaly['Hour']):02d}:00"
+        print(f"  ⚠ Unusual {anomaly['Level']}: {anomaly['Date']}{hour} ({anomaly['Transactions']} transactions, "
+              f"z = {anomaly['Score']:+.1f})")
+    print(f"✓ Snapshot in: {args.out}")
@@ -0,0 +1,201 @@
+"""
+Prices and revenue
+Joins a price table with effective-date ranges onto the line items by item
+code and derives revenue-weighted basket, pair and daypart metrics next to
+the count-based ones
+
+The price table is sorted by (item code, EffectiveFrom) into one int64 key
+per period, so pricing every line is a single searchsorted: the period a
+line falls in is the last one starting on or before its date, and the line
+is priced if that period belongs to its item and has not ended.
+
+    prices = PriceTable.load(catalogue)
+    bakery_df['Price'] = prices.price(bakery_df['ItemCode'], bakery_df['DateTime'])
+    pair_revenue_table(B, V, items)       # pair counts and the revenue they carry
+
+Prices live in data/raw/item_prices.csv (Item, Price, EffectiveFrom and an
+optional EffectiveTo; lines starting with # are comments). The BreadBasket
+export has no prices, so none is shipped: item_prices.example.csv shows the
+format with made-up prices. Without a price file the scripts skip the
+revenue figures and the revenue KPIs are n/a.
+
+Usage:
+    python pricing.py                     # price coverage and revenue of the processed data
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from processing import classify_daypart
+
+PRICES_PATH = '../data/raw/item_prices.csv'
+PAIR_REVENUE_PATH = '../data/processed/pair_revenue.csv'
+
+# Days since the epoch fit in the low 32 bits of a period key
+_DAY_BITS = 32
+
+
+def _days(dates):
+    """Dates / timestamps as int64 days since 1970-01-01."""
+    return np.asarray(pd.to_datetime(dates).to_numpy(), dtype='datetime64[D]').astype(np.int64)
+
+
+class PriceTable:
+    """Item prices by effective-date period, keyed by catalogue item code."""
+
+    def __init__(self, codes, starts, ends, prices):
+        order = np.lexsort((starts, codes))
+        self.codes = np.asarray(codes, dtype=np.int64)[order]
+        self.starts = np.asarray(starts, dtype=np.int64)[order]
+        self.ends = np.asarray(ends, dtype=np.int64)[order]
+        self.prices = np.asarray(prices, dtype=np.float64)[order]
+        self.keys = (self.codes << _DAY_BITS) | self.starts
+
+        same_item = self.codes[1:] == self.codes[:-1]
+        overlapping = same_item & (self.starts[1:] < self.ends[:-1])
+        if overlapping.any():
+            raise ValueError(f"Overlapping price periods for item codes {sorted(set(self.codes[1:][overlapping].tolist()))}")
+
+    @classmethod
+    def from_frame(cls, table, catalogue):
+        """
+        Price table from a frame with Item, Price, EffectiveFrom and optional
+        EffectiveTo (exclusive; missing means open-ended). Items the catalogue
+        does not sell are ignored.
+        """
+        codes = catalogue.encode(table['Item'])
+        known = codes >= 0
+        table = table[known]
+        ends = table['EffectiveTo'] if 'EffectiveTo' in table.columns else pd.Series(np.nan, index=table.index)
+        open_ended = ends.isna().to_numpy()
+        end_days = np.where(open_ended, np.iinfo(np.int64).max, _days(ends.fillna(table['EffectiveFrom'])))
+        return cls(codes[known], _days(table['EffectiveFrom']), end_days, table['Price'].astype(float))
+
+    @classmethod
+    def load(cls, catalogue, path=PRICES_PATH):
+        """Price table of the price file; None if there is none."""
+        if not os.path.exists(path):
+            return None
+        return cls.from_frame(pd.read_csv(path, comment='#', skipinitialspace=True), catalogue)
+
+    def price(self, item_codes, dates):
+        """Unit price of every line (item code, date); NaN where no period applies."""
+        item_codes = np.asarray(item_codes, dtype=np.int64)
+        days = _days(dates)
+        period = np.searchsorted(self.keys, (item_codes << _DAY_BITS) | days, side='right') - 1
+        found = period >= 0
+        period = np.maximum(period, 0)
+        found &= (self.codes[period] == item_codes) & (days < self.ends[period]) & (item_codes >= 0)
+        return np.where(found, self.prices[period], np.nan) if len(self.prices) else np.full(len(days), np.nan)
+
+
+def add_prices(bakery_df, prices):
+    """Price column (unit price, NaN when unpriced) for lines with ItemCode and DateTime, in place."""
+    bakery_df['Price'] = prices.price(bakery_df['ItemCode'], bakery_df['DateTime'])
+    return bakery_df
+
+
+def value_matrix(baskets, prices):
+    """
+    Basket × item revenue matrix: the price of every line of an item in a
+    basket, summed (unpriced lines count 0). Same shape as baskets.incidence().
+    """
+    prices = np.nan_to_num(baskets.ordered(prices))
+    known = baskets.codes >= 0
+    rows = np.repeat(np.arange(len(baskets)), baskets.sizes)
+    V = sparse.csr_matrix((prices[known], (rows[known], baskets.codes[known])),
+                          shape=(len(baskets), len(baskets.items)))
+    V.sum_duplicates()
+    return V
+
+
+def basket_values(baskets, prices):
+    """Revenue of every basket (unpriced lines count 0)."""
+    prices = np.nan_to_num(baskets.ordered(prices))
+    return np.add.reduceat(prices, baskets.offsets[:-1]) if len(prices) else np.zeros(len(baskets))
+
+
+def pair_revenue_table(B, V, items):
+    """
+    Pair counts with the revenue they carry: Revenue is what the two items
+    took in the baskets that contain both, BasketRevenue the full value of
+    those baskets. Most frequent pairs first, like baskets.pair_table.
+    """
+    B = sparse.csr_matrix(B, dtype=np.float64)
+    counts = (B.T @ B).tocsr()
+    item_revenue = (V.T @ B).tocsr()
+    basket_revenue = (B.T @ sparse.diags(np.asarray(V.sum(axis=1)).ravel()) @ B).tocsr()
+
+    upper = sparse.triu(counts, k=1).tocoo()
+    rows, cols = upper.row, upper.col
+    items = np.asarray(items)
+    pairs = pd.DataFrame({
+        'Product1': items[rows],
+        'Product2': items[cols],
+        'Count': upper.data.astype(np.int64),
+        'Revenue': np.asarray(item_revenue[rows, cols]).ravel() + np.asarray(item_revenue[cols, rows]).ravel(),
+        'BasketRevenue': np.asarray(basket_revenue[rows, cols]).ravel()
+    })
+    pairs['RevenuePerBasket'] = pairs['BasketRevenue'] / pairs['Count']
+    return pairs.sort_values(['Count', 'Product1', 'Product2'],
+                             ascending=[False, True, True]).reset_index(drop=True)
+
+
+def daypart_revenue(transactions_df):
+    """Revenue, baskets, items and average basket value per daypart (baskets need BasketValue)."""
+    table = transactions_df.groupby(classify_daypart(transactions_df['Hour'])).agg(
+        Revenue=('BasketValue', 'sum'),
+        Transactions=('BasketValue', 'size'),
+        Items=('BasketSize', 'sum'),
+        AvgBasketValue=('BasketValue', 'mean')
+    )
+    table.index.name = 'DayPart'
+    table['RevenueShare'] = table['Revenue'] / table['Revenue'].sum()
+    return table.sort_values('Revenue', ascending=False)
+
+
+if __name__ == '__main__':
+    from baskets import Baskets
+    from catalogue import Catalogue
+    from processing import load_bakery, prepare
+    from transactions import build_transactions
+
+    print("="*80)
+    print("PRICES AND REVENUE")
+    print("="*80)
+
+    try:
+        catalogue = Catalogue.load()
+    except FileNotFoundError as e:
+        print(f"✗ Error: {e.filename} not found")
+        print("  Please run 00b_data_processing.py first")
+        raise SystemExit(1)
+    prices = PriceTable.load(catalogue)
+    if prices is None:
+        print(f"⚠ No price table at {PRICES_PATH}")
+        raise SystemExit(1)
+
+    bakery_df = add_prices(prepare(load_bakery(), catalogue), prices)
+    unpriced = bakery_df['Price'].isna()
+    print(f"Priced lines: {(~unpriced).mean():.1%} ({len(set(prices.codes))} of {len(catalogue)} products have prices)")
+    if unpriced.any():
+        print(f"⚠ Unpriced: {', '.join(sorted(bakery_df.loc[unpriced, 'Item'].unique()))}")
+
+    baskets = Baskets.from_lines(bakery_df, catalogue=catalogue)
+    transactions_df = build_transactions(bakery_df)
+    print(f"\nRevenue: £{bakery_df['Price'].sum():,.2f} over {len(transactions_df):,} baskets "
+          f"(£{transactions_df['BasketValue'].mean():.2f} per basket)")
+
+    print("\nRevenue by daypart:")
+    for daypart, row in daypart_revenue(transactions_df).iterrows():
+        print(f"  {daypart:10s}: £{row['Revenue']:>9,.2f} ({row['RevenueShare']:.1%}), "
+              f"£{row['AvgBasketValue']:.2f} per basket")
+
+    pairs = pair_revenue_table(baskets.incidence(), value_matrix(baskets, bakery_df['Price']), baskets.items)
+    print("\nTop pairs by revenue:")
+    for row in pairs.sort_values('Revenue', ascending=False).head(10).itertuples(index=False):
+        print(f"  {row.Product1[:20]:20s} + {row.Product2[:20]:20s}: £{row.Revenue:>8,.2f} "
+              f"({row.Count:,} baskets, £{row.RevenuePerBasket:.2f} per basket)")
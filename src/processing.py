@@ -0,0 +1,195 @@
+"""
+Pipeline stages
+Loading, feature engineering, pair/triplet counting, weather merge and the
+temperature fit, as plain functions shared by the scripts and the benchmarks
+"""
+
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import curve_fit
+
+from baskets import Baskets
+from catalogue import Catalogue
+from ingest import parse_export_datetime
+from instrument import traced
+from itemsets import basket_incidence, count_parallel, to_counter
+
+RAW_PATH = '../data/raw/BreadBasket_DMS.csv'
+WEATHER_PATH = '../data/raw/edinburgh_weather.csv'
+
+
+@traced('read_bakery_csv')
+def load_bakery(path=RAW_PATH):
+    """Raw line-item export as shipped."""
+    return pd.read_csv(path)
+
+
+@traced('read_weather_csv')
+def load_weather(path=WEATHER_PATH):
+    """Hourly weather with a parsed timestamp column."""
+    weather_df = pd.read_csv(path)
+    weather_df['timestamp'] = pd.to_datetime(weather_df['timestamp'])
+    return weather_df
+
+
+@traced('parse_datetime')
+def standardise_columns(bakery_df):
+    """Rename to Transaction/Item and parse DateTime, in place."""
+    if 'TransactionNo' in bakery_df.columns:
+        bakery_df.rename(columns={'TransactionNo': 'Transaction'}, inplace=True)
+    if 'Items' in bakery_df.columns:
+        bakery_df.rename(columns={'Items': 'Item'}, inplace=True)
+
+    if 'DateTime' in bakery_df.columns:
+        bakery_df['DateTime'] = parse_export_datetime(bakery_df['DateTime'], bakery_df.get('DayType'))
+    elif 'Date' in bakery_df.columns and 'Time' in bakery_df.columns:
+        bakery_df['DateTime'] = pd.to_datetime(bakery_df['Date'] + ' ' + bakery_df['Time'])
+    else:
+        raise ValueError("No datetime column found")
+    return bakery_df
+
+
+def classify_daypart(hours):
+    """Morning 5-12, Afternoon 12-17, Evening 17-21, otherwise Night."""
+    hours = np.asarray(hours)
+    return np.select([(hours >= 5) & (hours < 12), (hours >= 12) & (hours < 17), (hours >= 17) & (hours < 21)],
+                     ['Morning', 'Afternoon', 'Evening'], 'Night')
+
+
+@traced('feature_engineering')
+def add_temporal_features(bakery_df):
+    """Calendar, 15-minute and daypart columns derived from DateTime, in place."""
+    timestamps = bakery_df['DateTime'].dt
+    bakery_df['Date'] = timestamps.date
+    bakery_df['Year'] = timestamps.year
+    bakery_df['Month'] = timestamps.month
+    bakery_df['MonthName'] = timestamps.month_name()
+    bakery_df['DayOfWeek'] = timestamps.dayofweek
+    bakery_df['DayName'] = timestamps.day_name()
+    bakery_df['Hour'] = timestamps.hour
+    bakery_df['Minute'] = timestamps.minute
+    bakery_df['TimeOfDay'] = bakery_df['Hour'] + bakery_df['Minute']/60
+    bakery_df['IsWeekend'] = bakery_df['DayOfWeek'].isin([5, 6])
+
+    # Create 15-minute intervals
+    bakery_df['QuarterHour'] = (bakery_df['Hour'] * 4 + bakery_df['Minute'] // 15) / 4
+    bakery_df['DayPart'] = classify_daypart(bakery_df['Hour'])
+    return bakery_df
+
+
+@traced('clean_items')
+def clean_items(bakery_df, catalogue=None):
+    """
+    Canonical item names (catalogue.py) with an ItemCode column; NONE / empty
+    lines dropped. Without a catalogue, one is built from the lines themselves.
+    """
+    if catalogue is None:
+        catalogue = Catalogue.from_items(bakery_df['Item'])
+    return catalogue.clean(bakery_df)
+
+
+@traced('prepare')
+def prepare(bakery_df, catalogue=None):
+    """Full feature engineering step of 00b: columns, temporal features, clean items."""
+    standardise_columns(bakery_df)
+    add_temporal_features(bakery_df)
+    return clean_items(bakery_df, catalogue)
+
+
+@traced('basket_lists')
+def transaction_item_lists(bakery_df, catalogue=None):
+    """One row per transaction with the list of its items."""
+    baskets = Baskets.from_lines(bakery_df, catalogue=catalogue)
+    return pd.DataFrame({'Transaction': baskets.txn_ids, 'Item': baskets.lists()})
+
+
+@traced('pairs')
+def count_pairs(transactions_items):
+    """Counter of item pairs bought together (each pair once per basket)."""
+    pair_counts = Counter()
+    for items in transactions_items['Item']:
+        if len(items) >= 2:
+            for pair in combinations(sorted(set(items)), 2):
+                pair_counts[pair] += 1
+    return pair_counts
+
+
+@traced('triplets')
+def count_triplets(transactions_items):
+    """Counter of item triplets bought together (each triplet once per basket)."""
+    triplet_counts = Counter()
+    for items in transactions_items['Item']:
+        if len(items) >= 3:
+            for triplet in combinations(sorted(set(items)), 3):
+                triplet_counts[triplet] += 1
+    return triplet_counts
+
+
+def count_itemsets_parallel(bakery_df, processes, sizes=(2, 3)):
+    """
+    Counters of each itemset size, mined on `processes` worker processes.
+
+    Equal to count_pairs / count_triplets; see itemsets.count_parallel.
+    """
+    items = pd.Index(sorted(bakery_df['Item'].unique()))
+    counts = count_parallel(basket_incidence(bakery_df, items), sizes, processes)
+    return [to_counter(counts[k], items, k) for k in sizes]
+
+
+@traced('weather_merge')
+def merge_weather(bakery_df, weather_df):
+    """
+    Hourly weather joined onto every line item.
+
+    Adds Date_dt and DateHour to bakery_df (and Date/DateHour to weather_df)
+    in place, as 00b saves them with the processed data.
+    """
+    bakery_df['Date_dt'] = pd.to_datetime(bakery_df['Date'])
+    weather_df['Date'] = weather_df['timestamp'].dt.date
+
+    bakery_df['DateHour'] = bakery_df['DateTime'].dt.floor('h')
+    weather_df['DateHour'] = weather_df['timestamp'].dt.floor('h')
+
+    return bakery_df.merge(
+        weather_df[['DateHour', 'temperature', 'precipitation', 'humidity']],
+        on='DateHour',
+        how='left'
+    )
+
+
+@traced('daily_temperature')
+def daily_temperature_table(bakery_df, weather_df):
+    """Transactions, items and mean temperature per trading day (script 03)."""
+    bakery_daily = bakery_df.groupby('Date').agg({
+        'Transaction': 'nunique',
+        'Item': 'count',
+        'DayOfWeek': 'first'
+    }).reset_index()
+    bakery_daily.columns = ['Date', 'Transactions', 'Items', 'DayOfWeek']
+
+    weather_dates = weather_df['timestamp'].dt.date
+    weather_daily = weather_df.groupby(weather_dates)['temperature'].mean().reset_index()
+    weather_daily.columns = ['Date', 'AvgTemp']
+
+    return bakery_daily.merge(weather_daily, on='Date', how='inner')
+
+
+def quadratic(x, a, b, c):
+    return a * x**2 + b * x + c
+
+
+@traced('temperature_fit')
+def fit_temperature_curve(daily_df):
+    """
+    Quadratic fit of daily transactions on temperature.
+
+    Returns ((a, b, c), optimal_temp, optimal_txns) where the optimum is the
+    vertex of the parabola.
+    """
+    params, _ = curve_fit(quadratic, daily_df['AvgTemp'], daily_df['Transactions'])
+    a, b, c = params
+    optimal_temp = -b / (2 * a)
+    return (a, b, c), optimal_temp, quadratic(optimal_temp, a, b, c)
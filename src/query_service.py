@@ -0,0 +1,299 @@
+"""
+Bakery query service
+Local HTTP/JSON server over the aggregates of the 00b outputs. Everything is
+computed once at start-up; a request is a dictionary lookup plus (the first
+time a query is seen) JSON encoding, cached per query string
+
+Endpoints (GET):
+    /                                   list of endpoints
+    /hourly?day=Monday                  average transactions per hour of a weekday (day=all for every day)
+    /peak?day=Saturday                  busiest quarter hour of a weekday
+    /dayparts                           transactions per daypart
+    /pairs?daypart=Morning&top=10       most frequent product pairs in a daypart (daypart=all)
+    /basket-sizes?day=all               basket size distribution
+    /recommend?items=BREAD,TEA&k=3      suggestions from the recommender index
+
+Usage:
+    python query_service.py --port 8050
+    curl 'http://127.0.0.1:8050/pairs?daypart=Afternoon&top=5'
+"""
+
+import argparse
+import asyncio
+import json
+from functools import lru_cache
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from baskets import basket_matrix, cooccurrence_matrix, pair_table
+from recommender import default_recommender
+from transactions import load_transactions
+
+PROCESSED_PATH = '../data/processed/processed_bakery_data.csv'
+
+HOST = '127.0.0.1'
+PORT = 8050
+TOP_PAIRS = 50
+QUERY_CACHE_SIZE = 4096
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+DAYPART_ORDER = ['Morning', 'Afternoon', 'Evening', 'Night']
+
+
+class QueryError(Exception):
+    """A bad query; answered with HTTP 400 (or 404 for unknown paths)."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _quarter_label(quarter_hour):
+    return f"{int(quarter_hour):02d}:{int(round(quarter_hour % 1 * 60)):02d}"
+
+
+def _by_day(transactions):
+    """{'all': transactions, 'Monday': ..., ...}."""
+    groups = {'all': transactions}
+    groups.update({day: transactions[transactions['DayName'] == day] for day in DAY_ORDER})
+    return groups
+
+
+def hourly_profiles(transactions):
+    """Average transactions per hour for each weekday, over the dates that weekday traded."""
+    profiles = {}
+    for day, group in _by_day(transactions).items():
+        n_dates = group['Date'].nunique()
+        per_hour = group.groupby('Hour').size().sort_index() / max(n_dates, 1)
+        profiles[day] = {
+            'day': day,
+            'dates': int(n_dates),
+            'hours': {str(hour): round(float(avg), 2) for hour, avg in per_hour.items()}
+        }
+    return profiles
+
+
+def peak_quarter_hours(transactions):
+    """Busiest quarter hour (average transactions per date) for each weekday."""
+    peaks = {}
+    for day, group in _by_day(transactions).items():
+        per_quarter = group.groupby('QuarterHour').size() / max(group['Date'].nunique(), 1)
+        if per_quarter.empty:
+            continue
+        quarter = per_quarter.idxmax()
+        peaks[day] = {
+            'day': day,
+            'quarter_hour': _quarter_label(quarter),
+            'avg_transactions': round(float(per_quarter.max()), 2)
+        }
+    return peaks
+
+
+def daypart_split(bakery_df):
+    """Transactions per daypart and their share, as in 00b."""
+    counts = bakery_df.groupby('DayPart')['Transaction'].nunique().reindex(DAYPART_ORDER, fill_value=0)
+    total = counts.sum()
+    return {'dayparts': [{'daypart': part, 'transactions': int(n), 'share': round(n / total, 4)}
+                         for part, n in counts.items()]}
+
+
+def top_pairs(bakery_df, top=TOP_PAIRS):
+    """Most frequent product pairs overall and within each daypart."""
+    groups = {'all': bakery_df}
+    groups.update({part: bakery_df[bakery_df['DayPart'] == part] for part in DAYPART_ORDER})
+    pairs = {}
+    for part, lines in groups.items():
+        if lines.empty:
+            pairs[part] = []
+            continue
+        B, items, _ = basket_matrix(lines)
+        table = pair_table(cooccurrence_matrix(B), items).head(top)
+        pairs[part] = [{'pair': [row.Product1, row.Product2], 'baskets': int(row.Count)}
+                       for row in table.itertuples(index=False)]
+    return pairs
+
+
+def basket_size_distributions(transactions):
+    """Number and share of baskets by line-item count, for each weekday."""
+    distributions = {}
+    for day, group in _by_day(transactions).items():
+        sizes = group['BasketSize'].value_counts().sort_index()
+        distributions[day] = {
+            'day': day,
+            'baskets': int(sizes.sum()),
+            'mean': round(float(group['BasketSize'].mean()), 3) if len(group) else None,
+            'sizes': {str(size): {'baskets': int(n), 'share': round(n / sizes.sum(), 4)}
+                      for size, n in sizes.items()}
+        }
+    return distributions
+
+
+class BakeryQueries:
+    """In-memory aggregates and the query handlers over them."""
+
+    def __init__(self, bakery_df, transactions, recommender=None):
+        self.hourly = hourly_profiles(transactions)
+        self.peaks = peak_quarter_hours(transactions)
+        self.dayparts = daypart_split(bakery_df)
+        self.pairs = top_pairs(bakery_df)
+        self.basket_sizes = basket_size_distributions(transactions)
+        self.recommender = recommender
+        self.routes = {
+            '/': self._index,
+            '/hourly': self._hourly,
+            '/peak': self._peak,
+            '/dayparts': lambda query: self.dayparts,
+            '/pairs': self._pairs,
+            '/basket-sizes': self._basket_sizes,
+            '/recommend': self._recommend
+        }
+        self.answer = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._answer)
+
+    @classmethod
+    def from_processed(cls, processed_path=PROCESSED_PATH):
+        """Aggregates of the files written by 00b."""
+        bakery_df = pd.read_csv(processed_path, usecols=['Transaction', 'Item', 'DayPart'])
+        return cls(bakery_df, load_transactions(), default_recommender())
+
+    @staticmethod
+    def _param(query, name, default=None):
+        values = query.get(name)
+        return values[-1] if values else default
+
+    @classmethod
+    def _key(cls, query, name):
+        """Day or daypart parameter in the table's spelling ('all' or title case)."""
+        key = cls._param(query, name, 'all')
+        return 'all' if key.lower() == 'all' else key.title()
+
+    @classmethod
+    def _lookup(cls, table, query, name):
+        key = cls._key(query, name)
+        if key not in table:
+            raise QueryError(f"unknown {name} {key!r}; expected one of {sorted(table)}")
+        return table[key]
+
+    def _int_param(self, query, name, default):
+        value = self._param(query, name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise QueryError(f"{name} must be an integer, got {value!r}")
+        if value < 1:
+            raise QueryError(f"{name} must be at least 1")
+        return value
+
+    def _index(self, query):
+        return {'endpoints': sorted(self.routes)}
+
+    def _hourly(self, query):
+        return self._lookup(self.hourly, query, 'day')
+
+    def _peak(self, query):
+        return self._lookup(self.peaks, query, 'day')
+
+    def _pairs(self, query):
+        pairs = self._lookup(self.pairs, query, 'daypart')
+        return {'daypart': self._key(query, 'daypart'), 'pairs': pairs[:self._int_param(query, 'top', 10)]}
+
+    def _basket_sizes(self, query):
+        return self._lookup(self.basket_sizes, query, 'day')
+
+    def _recommend(self, query):
+        if self.recommender is None:
+            raise QueryError("no recommender index loaded", status=404)
+        items = [item.strip().upper() for item in self._param(query, 'items', '').split(',') if item.strip()]
+        k = self._int_param(query, 'k', 3)
+        return {'items': items,
+                'recommendations': [{'item': item, 'score': round(score, 4)}
+                                    for item, score in self.recommender.recommend(items, k)]}
+
+    def _answer(self, target):
+        """(status, JSON body) for a request target such as '/peak?day=Monday'."""
+        url = urlsplit(target)
+        handler = self.routes.get(url.path.rstrip('/') or '/')
+        try:
+            if handler is None:
+                raise QueryError(f"unknown endpoint {url.path!r}", status=404)
+            return 200, json.dumps(handler(parse_qs(url.query))).encode()
+        except QueryError as error:
+            return error.status, json.dumps({'error': str(error)}).encode()
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+def _response(status, body, keep_alive):
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def _serve_connection(queries, reader, writer):
+    """Answer GET requests on one connection until the client closes it (HTTP/1.1 keep-alive)."""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, target, version = lines[0].split(' ', 2)
+            except ValueError:
+                break
+            headers = {name.strip().lower(): value.strip()
+                       for name, _, value in (line.partition(':') for line in lines[1:] if line)}
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+            if method == 'GET':
+                status, body = queries.answer(target)
+            else:
+                status, body = 405, json.dumps({'error': 'only GET is supported'}).encode()
+            writer.write(_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve(queries, host=HOST, port=PORT):
+    server = await asyncio.start_server(lambda r, w: _serve_connection(queries, r, w), host, port)
+    for sock in server.sockets:
+        print(f"✓ Serving on http://{sock.getsockname()[0]}:{sock.getsockname()[1]}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local JSON query service over the 00b outputs')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--processed', default=PROCESSED_PATH)
+    args = parser.parse_args()
+
+    print("="*80)
+    print("BAKERY QUERY SERVICE")
+    print("="*80)
+
+    try:
+        queries = BakeryQueries.from_processed(args.processed)
+    except FileNotFoundError as error:
+        print(f"✗ Error: {error.filename} not found")
+        print("  Please run 00b_data_processing.py first")
+        raise SystemExit(1)
+    print(f"Loaded aggregates: {len(queries.hourly) - 1} weekdays, "
+          f"{sum(len(p) for p in queries.pairs.values()):,} top pairs")
+
+    try:
+        asyncio.run(serve(queries, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nStopped")
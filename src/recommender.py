@@ -0,0 +1,152 @@
+"""
+Basket recommender
+"Customer has X, suggest Y" from association rules, served from a per-item
+top-k consequent index precomputed from the co-occurrence matrix
+
+    from recommender import recommend
+    recommend(['BREAD'], k=3)   # [('COFFEE', 0.28), ...]
+
+Calls only touch the index rows of the basket's items, a few list lookups
+per item, so a recommendation takes microseconds.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from baskets import basket_matrix, cooccurrence_matrix
+
+INDEX_PATH = '../data/processed/recommender_index.npz'
+PROCESSED_PATH = '../data/processed/processed_bakery_data.csv'
+
+INDEX_DEPTH = 10
+MIN_PAIR_BASKETS = 5
+METRICS = ('confidence', 'lift')
+
+
+def rule_scores(P, n_baskets, metric='confidence', min_pair_baskets=MIN_PAIR_BASKETS):
+    """
+    Sparse antecedent × consequent rule scores from a co-occurrence matrix.
+
+    confidence = P(consequent | antecedent), lift = confidence / P(consequent).
+    Pairs seen in fewer than min_pair_baskets baskets are dropped as noise.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+    baskets_with = P.diagonal().astype(np.float64)
+    pairs = sparse.triu(P, k=1).tocoo()
+    keep = pairs.data >= min_pair_baskets
+    rows = np.concatenate([pairs.row[keep], pairs.col[keep]])
+    cols = np.concatenate([pairs.col[keep], pairs.row[keep]])
+    together = np.concatenate([pairs.data[keep], pairs.data[keep]]).astype(np.float64)
+
+    scores = together / baskets_with[rows]
+    if metric == 'lift':
+        scores = scores / (baskets_with[cols] / n_baskets)
+    return sparse.csr_matrix((scores, (rows, cols)), shape=P.shape)
+
+
+class Recommender:
+    """
+    Precomputed top-k consequent index.
+
+    For every item the index holds its `depth` best consequents with their
+    scores, best first. recommend() merges the rows of the basket's items,
+    keeping each candidate's best score, and skips items already in the
+    basket. Baskets with no known items get the most popular products.
+    """
+
+    def __init__(self, items, consequents, scores, popular, popular_share, metric='confidence'):
+        self.items = [str(item) for item in items]
+        self.codes = {item: code for code, item in enumerate(self.items)}
+        self.metric = metric
+        self.consequents = np.asarray(consequents)
+        self.scores = np.asarray(scores)
+        self.popular = np.asarray(popular)
+        self.popular_share = np.asarray(popular_share)
+        # Plain lists: per-call work is a handful of small lookups, where
+        # numpy's per-call overhead would dominate
+        self._rows = [[(self.items[c], float(s)) for c, s in zip(row_c, row_s) if c >= 0]
+                      for row_c, row_s in zip(self.consequents, self.scores)]
+        self._popular = [(self.items[c], float(s)) for c, s in zip(self.popular, self.popular_share)]
+
+    @classmethod
+    def from_cooccurrence(cls, P, items, n_baskets, depth=INDEX_DEPTH, metric='confidence',
+                          min_pair_baskets=MIN_PAIR_BASKETS):
+        """Build the index from baskets.cooccurrence_matrix output."""
+        S = rule_scores(P, n_baskets, metric, min_pair_baskets)
+        n = len(items)
+        consequents = np.full((n, depth), -1, dtype=np.int32)
+        scores = np.zeros((n, depth), dtype=np.float64)
+        for item in range(n):
+            start, end = S.indptr[item], S.indptr[item + 1]
+            order = np.lexsort((S.indices[start:end], -S.data[start:end]))[:depth]
+            consequents[item, :len(order)] = S.indices[start:end][order]
+            scores[item, :len(order)] = S.data[start:end][order]
+
+        baskets_with = P.diagonal()
+        top = np.lexsort((np.arange(n), -baskets_with))[:depth]
+        return cls(items, consequents, scores, top, baskets_with[top] / n_baskets, metric)
+
+    @classmethod
+    def from_lines(cls, df, txn_col='Transaction', item_col='Item', **options):
+        """Build the index straight from line items."""
+        B, items, _ = basket_matrix(df, txn_col, item_col)
+        return cls.from_cooccurrence(cooccurrence_matrix(B), items, B.shape[0], **options)
+
+    def save(self, path=INDEX_PATH):
+        np.savez_compressed(path, items=np.asarray(self.items), consequents=self.consequents,
+                            scores=self.scores, popular=self.popular, popular_share=self.popular_share,
+                            metric=self.metric)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        index = np.load(path)
+        return cls(index['items'], index['consequents'], index['scores'], index['popular'],
+                   index['popular_share'], str(index['metric']))
+
+    def recommend(self, basket_items, k=3):
+        """
+        Up to k (item, score) suggestions for a basket, best first.
+
+        Item names must be spelled as in the index (upper case after 00b);
+        unknown items are ignored. Without known items, or when they have no
+        candidates left, the most popular items are suggested.
+        """
+        in_basket = set(basket_items)
+        codes = [self.codes[item] for item in in_basket if item in self.codes]
+        if len(codes) == 1:
+            suggestions = [pair for pair in self._rows[codes[0]] if pair[0] not in in_basket][:k]
+        else:
+            best = {}
+            for code in codes:
+                for item, score in self._rows[code]:
+                    if item not in in_basket and score > best.get(item, 0.0):
+                        best[item] = score
+            suggestions = sorted(best.items(), key=lambda pair: (-pair[1], pair[0]))[:k]
+        if not suggestions:
+            return [pair for pair in self._popular if pair[0] not in in_basket][:k]
+        return suggestions
+
+    def recommend_batch(self, baskets, k=3):
+        """recommend() for each basket of an iterable."""
+        return [self.recommend(basket, k) for basket in baskets]
+
+
+_default = None
+
+
+def default_recommender():
+    """The index saved by 00b, built from the processed data if it is missing."""
+    global _default
+    if _default is None:
+        try:
+            _default = Recommender.load()
+        except FileNotFoundError:
+            _default = Recommender.from_lines(pd.read_csv(PROCESSED_PATH, usecols=['Transaction', 'Item']))
+    return _default
+
+
+def recommend(basket_items, k=3):
+    """Suggestions for a basket from the default index; see Recommender.recommend."""
+    return default_recommender().recommend(basket_items, k)
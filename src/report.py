@@ -0,0 +1,544 @@
+"""
+Analysis report
+Assembles a Markdown and HTML report from the aggregates 00b writes and the
+figures of 01-06: key metrics, business opportunities, pairs, centrality,
+revenue, significance of the findings, unusual days and every figure
+
+Every section is a function registered with @section together with the
+data and figure files it reads. A section's fingerprint is a digest of
+those files, its own source, the report helpers it calls (and the
+renderers) and every module of src/ it imports, directly or through those
+helpers; its rendered Markdown and HTML are cached under that fingerprint
+in <out>/.cache/sections.json, so a rebuild only reruns the sections
+whose inputs (or code) changed. File digests are kept next to the
+sections and only recomputed when a file's size or mtime changes, so a run
+where nothing changed reads no data and finishes well under a second.
+Heavy modules (pandas, kpis, significance, ...) are imported inside the
+sections for the same reason.
+
+Usage:
+    python report.py                       # reports/report.md and reports/report.html
+    python report.py --format md
+    python report.py --force               # rebuild every section
+"""
+
+import argparse
+import ast
+import hashlib
+import html
+import inspect
+import json
+import os
+import textwrap
+import time
+from functools import lru_cache
+
+REPORT_DIR = '../reports'
+# Section cache, kept inside the report directory it renders for
+CACHE_FILE = os.path.join('.cache', 'sections.json')
+CACHE_PATH = os.path.join(REPORT_DIR, CACHE_FILE)
+FORMATS = ('md', 'html')
+TITLE = 'Bakery Sales Intelligence Report'
+
+PROCESSED_DIR = '../data/processed'
+RAW_DIR = '../data/raw'
+FIGURES_DIR = '../visualizations'
+
+TRANSACTIONS = f'{PROCESSED_DIR}/transactions.csv'
+TRAFFIC = f'{PROCESSED_DIR}/traffic_cube.npz'
+PAIRS = f'{PROCESSED_DIR}/product_pairs.csv'
+PAIR_REVENUE = f'{PROCESSED_DIR}/pair_revenue.csv'
+CENTRALITY = f'{PROCESSED_DIR}/product_centrality.csv'
+CATALOGUE = f'{PROCESSED_DIR}/item_catalogue.csv'
+ALIASES = f'{RAW_DIR}/item_aliases.csv'
+WEATHER = f'{RAW_DIR}/edinburgh_weather.csv'
+
+TOP_ROWS = 10
+
+# Helpers of this file whose code is part of the fingerprint of the sections calling them
+SHARED_HELPERS = ('text', 'bullets', 'table', 'figure', '_kpis', '_traffic', '_read_csv')
+# ... and the renderers, which every section goes through
+RENDERING = ('_markdown_cell', 'to_markdown', 'to_html')
+
+SECTIONS = {}
+
+
+class Section:
+    """A registered report section: its function, title and input files."""
+
+    def __init__(self, name, func, title, inputs):
+        self.name = name
+        self.func = func
+        self.title = title
+        self.inputs = tuple(inputs)
+        self.source = inspect.getsource(func)
+        names = {node.id for node in ast.walk(ast.parse(textwrap.dedent(self.source))) if isinstance(node, ast.Name)}
+        self.helpers = sorted(names & set(SHARED_HELPERS))
+
+
+def section(title, inputs=()):
+    """Register a function returning a list of blocks (text, bullets, table, figure) as a section."""
+    def register(func):
+        if func.__name__ in SECTIONS:
+            raise ValueError(f"Section {func.__name__!r} is already defined")
+        SECTIONS[func.__name__] = Section(func.__name__, func, title, inputs)
+        return func
+    return register
+
+
+# ============================================================================
+# BLOCKS AND RENDERING
+# ============================================================================
+
+def text(paragraph):
+    return ('text', paragraph)
+
+
+def bullets(items):
+    return ('bullets', list(items))
+
+
+def table(df, columns=None):
+    """Table block of a DataFrame (values as shown, so format numbers first)."""
+    df = df if columns is None else df[columns]
+    return ('table', (list(df.columns), [[str(value) for value in row] for row in df.itertuples(index=False)]))
+
+
+def figure(path, caption):
+    return ('figure', (path, caption))
+
+
+def _markdown_cell(value):
+    return value.replace('|', '\\|')
+
+
+def to_markdown(title, blocks, out_dir):
+    lines = [f"## {title}", ""]
+    for kind, payload in blocks:
+        if kind == 'text':
+            lines += [payload, ""]
+        elif kind == 'bullets':
+            lines += [f"- {item}" for item in payload] + [""]
+        elif kind == 'table':
+            columns, rows = payload
+            lines.append("| " + " | ".join(map(_markdown_cell, columns)) + " |")
+            lines.append("|" + "|".join("---" for _ in columns) + "|")
+            lines += ["| " + " | ".join(map(_markdown_cell, row)) + " |" for row in rows]
+            lines.append("")
+        elif kind == 'figure':
+            path, caption = payload
+            lines += [f"![{caption}]({os.path.relpath(path, out_dir)})", f"*{caption}*", ""]
+    return "\n".join(lines)
+
+
+def to_html(title, blocks, out_dir):
+    parts = [f"<h2>{html.escape(title)}</h2>"]
+    for kind, payload in blocks:
+        if kind == 'text':
+            parts.append(f"<p>{html.escape(payload)}</p>")
+        elif kind == 'bullets':
+            parts.append("<ul>" + "".join(f"<li>{html.escape(item)}</li>" for item in payload) + "</ul>")
+        elif kind == 'table':
+            columns, rows = payload
+            head = "".join(f"<th>{html.escape(column)}</th>" for column in columns)
+            body = "".join("<tr>" + "".join(f"<td>{html.escape(value)}</td>" for value in row) + "</tr>"
+                           for row in rows)
+            parts.append(f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>")
+        elif kind == 'figure':
+            path, caption = payload
+            source = html.escape(os.path.relpath(path, out_dir))
+            parts.append(f'<figure><img src="{source}" alt="{html.escape(caption)}">'
+                         f"<figcaption>{html.escape(caption)}</figcaption></figure>")
+    return f'<section id="{html.escape(title.lower().replace(" ", "-"))}">\n' + "\n".join(parts) + "\n</section>"
+
+
+RENDERERS = {'md': to_markdown, 'html': to_html}
+
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; max-width: 1100px; margin: 2em auto; color: #222; }}
+table {{ border-collapse: collapse; margin: 1em 0; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 10px; text-align: left; }}
+th {{ background: #f4e9d8; }}
+figure {{ margin: 1.5em 0; }}
+img {{ max-width: 100%; }}
+figcaption {{ font-style: italic; color: #555; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+
+def assemble(fmt, parts):
+    if fmt == 'md':
+        return f"# {TITLE}\n\n" + "\n".join(parts)
+    return HTML_PAGE.format(title=html.escape(TITLE), body="\n".join(parts))
+
+
+# ============================================================================
+# FINGERPRINTS AND CACHE
+# ============================================================================
+
+class FileDigests:
+    """Content digests of input files, recomputed only when size or mtime change."""
+
+    def __init__(self, known=None):
+        self.known = known if known is not None else {}
+
+    def digest(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return 'missing'
+        entry = self.known.get(path)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        content = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                content.update(chunk)
+        self.known[path] = [stat.st_size, stat.st_mtime_ns, content.hexdigest()]
+        return content.hexdigest()
+
+
+def _local_imports(nodes):
+    """Modules of src/ imported by these statements (run from src/, like the scripts)."""
+    names = set()
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    return {name for name in names if os.path.exists(f'{name}.py')}
+
+
+@lru_cache(maxsize=None)
+def _module_imports(name):
+    """Local modules a module imports at top level (not in its __main__ block)."""
+    with open(f'{name}.py') as f:
+        return _local_imports(ast.parse(f.read()).body)
+
+
+def section_modules(sec):
+    """Module files a section depends on: its imports and its helpers' imports, transitively."""
+    pending = set()
+    for func in [sec.func] + [globals()[name] for name in sec.helpers]:
+        pending |= _local_imports(ast.walk(ast.parse(textwrap.dedent(inspect.getsource(func)))))
+    modules = set()
+    while pending:
+        name = pending.pop()
+        if name not in modules:
+            modules.add(name)
+            pending |= _module_imports(name)
+    return [f'{name}.py' for name in sorted(modules)]
+
+
+def fingerprint(sec, digests, out_dir=REPORT_DIR):
+    """
+    Digest of a section's code, the helpers it calls, its input files, the
+    modules it imports and the report directory (figure links are relative
+    to it); returns (fingerprint, {input: digest}).
+    """
+    helpers = [inspect.getsource(globals()[name]) for name in sec.helpers + list(RENDERING)]
+    inputs = {path: digests.digest(path) for path in list(sec.inputs) + section_modules(sec)}
+    key = json.dumps([sec.name, sec.title, sec.source, helpers, os.path.abspath(out_dir), sorted(inputs.items())])
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest(), inputs
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'files': {}, 'sections': {}}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump(cache, f)
+    os.replace(temporary, path)
+
+
+def _write_if_changed(path, content):
+    """Write a file unless it already holds content; returns whether it was written."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
+def build_report(out_dir=REPORT_DIR, formats=FORMATS, force=False, cache_path=None, sections=None):
+    """
+    Render every section (from cache where its fingerprint is unchanged) and
+    write report.<fmt> for each format. Returns one row per section:
+    (name, status, seconds, changed inputs); status is 'cached' or 'rebuilt'.
+    """
+    sections = SECTIONS if sections is None else sections
+    if cache_path is None:
+        cache_path = os.path.join(out_dir, CACHE_FILE)
+    cache = load_cache(cache_path)
+    digests = FileDigests(cache.get('files'))
+    cached_sections = cache.get('sections', {})
+    os.makedirs(out_dir, exist_ok=True)
+
+    rendered = {fmt: [] for fmt in formats}
+    stats = []
+    for name, sec in sections.items():
+        start = time.perf_counter()
+        key, inputs = fingerprint(sec, digests, out_dir)
+        entry = cached_sections.get(name)
+        if not force and entry is not None and entry['fingerprint'] == key and all(fmt in entry for fmt in formats):
+            status, changed = 'cached', []
+        else:
+            previous = entry['inputs'] if entry is not None else inputs
+            changed = [path for path, digest in inputs.items() if previous.get(path) != digest]
+            try:
+                blocks = sec.func()
+            except FileNotFoundError as e:
+                blocks = [text(f"⚠ Input not found: {e.filename} (run 00b_data_processing.py and 01-06 first)")]
+            entry = {'fingerprint': key, 'inputs': inputs}
+            entry.update({fmt: RENDERERS[fmt](sec.title, blocks, out_dir) for fmt in FORMATS})
+            cached_sections[name] = entry
+            status = 'rebuilt'
+        for fmt in formats:
+            rendered[fmt].append(entry[fmt])
+        stats.append((name, status, time.perf_counter() - start, changed))
+
+    for fmt in formats:
+        _write_if_changed(os.path.join(out_dir, f'report.{fmt}'), assemble(fmt, rendered[fmt]))
+    save_cache({'files': digests.known, 'sections': cached_sections}, cache_path)
+    return stats
+
+
+# ============================================================================
+# SHARED INPUTS (loaded once, only by sections that rebuild)
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def _kpis():
+    from kpis import KPIs
+    return KPIs.from_processed()
+
+
+@lru_cache(maxsize=None)
+def _traffic():
+    from traffic_cube import TrafficCube
+    return TrafficCube.load(TRAFFIC)
+
+
+def _read_csv(path):
+    import pandas as pd
+    return pd.read_csv(path, keep_default_na=False)
+
+
+# ============================================================================
+# SECTIONS
+# ============================================================================
+
+@section('Key metrics', inputs=(TRANSACTIONS, TRAFFIC))
+def key_metrics():
+    kpis = _kpis().table()
+    # Revenue KPIs are NaN without a price table
+    kpis = kpis[kpis['Formatted'] != 'n/a']
+    return [table(kpis[['Label', 'Formatted']].rename(columns={'Label': 'Metric', 'Formatted': 'Value'}))]
+
+
+@section('Business impact opportunities', inputs=(TRANSACTIONS, TRAFFIC))
+def opportunities():
+    kpis = _kpis()
+    priced = 'BasketValue' in kpis['transactions'].columns
+    cross_sell = kpis.format('cross_sell_revenue' if priced else 'cross_sell_potential')
+    return [bullets([
+        f"Solo buyers: {kpis.format('solo_rate')} → cross-sell potential {cross_sell}",
+        f"Coffee in multi-item baskets: {kpis.format('coffee_multi_item_share')} → anchor product for upselling",
+        f"Weekend morning lift: {kpis.format('weekend_morning_lift')} → staffing & inventory optimization",
+        f"5 PM dead zone: {kpis.format('dead_zone_drop')} from peak → major promotion opportunity",
+        f"Sunday basket premium vs Friday: {kpis.format('sunday_basket_premium')}"
+    ])]
+
+
+@section('Data processing summary', inputs=(TRANSACTIONS, CATALOGUE, PAIRS, WEATHER))
+def data_summary():
+    transactions = _read_csv(TRANSACTIONS)
+    catalogue = _read_csv(CATALOGUE)
+    pairs = _read_csv(PAIRS)
+    dates = transactions['Date']
+    top = pairs.iloc[0] if len(pairs) else None
+    return [bullets([
+        f"Transactions analyzed: {len(transactions):,}",
+        f"Unique items: {len(catalogue):,}",
+        f"Time period: {dates.min()} to {dates.max()}",
+        "Granularity: minute-level (96 15-min intervals per day)",
+        f"Top pair: {top['Product1']} + {top['Product2']} ({top['Count']:,} baskets)" if top is not None else "Top pair: N/A",
+        f"Weather integration: {'Yes' if os.path.exists(WEATHER) else 'No'}"
+    ])]
+
+
+@section('Top product pairs', inputs=(PAIRS, PAIR_REVENUE))
+def product_pairs():
+    pairs = _read_csv(PAIRS).head(TOP_ROWS)
+    columns = ['Product1', 'Product2', 'Count']
+    if os.path.exists(PAIR_REVENUE):
+        revenue = _read_csv(PAIR_REVENUE)[['Product1', 'Product2', 'Revenue', 'RevenuePerBasket']]
+        pairs = pairs.merge(revenue, on=['Product1', 'Product2'], how='left')
+        pairs['Revenue'] = pairs['Revenue'].map('£{:,.2f}'.format)
+        pairs['RevenuePerBasket'] = pairs['RevenuePerBasket'].map('£{:.2f}'.format)
+        columns += ['Revenue', 'RevenuePerBasket']
+    pairs['Count'] = pairs['Count'].map('{:,}'.format)
+    return [table(pairs, columns)]
+
+
+@section('Product centrality', inputs=(CENTRALITY,))
+def centrality():
+    ranking = _read_csv(CENTRALITY).head(TOP_ROWS)
+    for column in ('PageRank', 'Betweenness'):
+        ranking[column] = ranking[column].map('{:.3f}'.format)
+    return [text(f"Anchor product: {ranking['Item'].iloc[0]} (highest PageRank in the co-occurrence graph)."),
+            table(ranking, ['Rank', 'Item', 'Baskets', 'PageRank', 'Betweenness', 'Community'])]
+
+
+@section('Revenue by daypart', inputs=(TRANSACTIONS, TRAFFIC))
+def revenue():
+    from pricing import daypart_revenue
+
+    transactions = _kpis()['transactions']
+    if 'BasketValue' not in transactions.columns:
+        return [text("⚠ No price table (data/raw/item_prices.csv), revenue figures skipped.")]
+    dayparts = daypart_revenue(transactions).reset_index()
+    dayparts['Revenue'] = dayparts['Revenue'].map('£{:,.2f}'.format)
+    dayparts['RevenueShare'] = dayparts['RevenueShare'].map('{:.1%}'.format)
+    dayparts['AvgBasketValue'] = dayparts['AvgBasketValue'].map('£{:.2f}'.format)
+    return [table(dayparts, ['DayPart', 'Revenue', 'RevenueShare', 'Transactions', 'AvgBasketValue'])]
+
+
+@section('Are the findings real?', inputs=(TRAFFIC,))
+def significance():
+    from significance import test_findings
+
+    results = test_findings(_traffic())
+    results['Effect'] = [f"{effect:+.1%} [{low:+.1%}, {high:+.1%}]"
+                         for effect, low, high in zip(results['Effect'], results['CILow'], results['CIHigh'])]
+    results['PAdjusted'] = results['PAdjusted'].map('{:.4f}'.format)
+    results['Significant'] = results['Significant'].map({True: '✓', False: '✗'})
+    return [text("Permutation tests with 95% bootstrap intervals, Holm-corrected across findings (significance.py)."),
+            table(results, ['Label', 'Effect', 'PAdjusted', 'Significant'])]
+
+
+@section('Unusual days', inputs=(TRAFFIC,))
+def anomalies():
+    from anomalies import AnomalyDetector, _weekday
+    from traffic_cube import DAY_NAMES
+
+    scores = AnomalyDetector().backfill(_traffic())
+    days = scores[(scores['Level'] == 'day') & scores['IsAnomaly']]
+    if days.empty:
+        return [text("No day is unusual against its weekday baseline.")]
+    return [text("Days whose traffic is far from the same weekday over the previous weeks (anomalies.py)."),
+            bullets(f"{row.Date:%Y-%m-%d} ({DAY_NAMES[_weekday(row.Date)]}): {row.Transactions} transactions, "
+                    f"typical {row.Median:.0f} (z = {row.Score:+.1f})" for row in days.itertuples(index=False))]
+
+
+@section('Item catalogue', inputs=(CATALOGUE, ALIASES))
+def item_catalogue():
+    from catalogue import load_aliases
+
+    catalogue = _read_csv(CATALOGUE)
+    aliases = load_aliases(ALIASES)
+    return [text(f"{len(catalogue):,} products with int codes; {len(aliases)} aliases resolved "
+                 f"from {os.path.basename(ALIASES)}.")]
+
+
+FIGURES = {
+    'Temporal patterns': [
+        ('viz1_temporal_heatmap_minute_level.png', 'Minute-level transaction patterns'),
+        ('viz3_daypart_performance.png', 'Performance by time of day'),
+        ('viz4_basket_and_affinity.png', 'Basket analysis'),
+    ],
+    'Product pairings': [
+        ('viz2_product_pairing_bar_chart.png', 'Top product pairs'),
+        ('viz2_product_pairing_network.png', 'Product relationship network'),
+        ('viz2_product_affinity_heatmap.png', 'Product affinity matrix'),
+        ('viz2_product_pairing_flow.png', 'Product flow diagram'),
+        ('viz2_coffee_centric_radial.png', 'Coffee-centric pairings'),
+        ('viz2_product_categories_analysis.png', 'Category analysis'),
+    ],
+    'Temperature': [
+        ('viz_temperature_statistical_analysis.png', 'Temperature impact analysis'),
+    ],
+    'Weekend vs weekday': [
+        ('viz7_weekend_weekday_comprehensive.png', 'Weekend vs weekday patterns'),
+    ],
+    'Supplemental': [
+        ('viz_supplemental1_entry_vs_addon.png', 'Entry vs add-on products'),
+        ('viz_supplemental2_coffee_centrality.png', 'Coffee as anchor product'),
+        ('viz_supplemental4_executive_dashboard.png', 'Executive summary'),
+    ],
+    'Surprising findings': [
+        ('viz_surprise1_weekend_morning_boom.png', 'Weekend morning patterns'),
+        ('viz_surprise2_slump_and_baskets.png', 'Afternoon slump analysis'),
+        ('viz_surprise3_daves_hypotheses.png', 'Hypothesis validation'),
+    ],
+}
+
+
+def _figure_section(title, figures):
+    paths = [(os.path.join(FIGURES_DIR, name), caption) for name, caption in figures]
+
+    def render():
+        blocks = [figure(path, caption) for path, caption in paths if os.path.exists(path)]
+        missing = [os.path.basename(path) for path, _ in paths if not os.path.exists(path)]
+        if missing:
+            blocks.append(text(f"⚠ Not generated yet: {', '.join(missing)}"))
+        return blocks
+
+    render.__name__ = 'figures_' + title.lower().replace(' ', '_')
+    # Fingerprint on the figure list; the shared function body alone would not tell sections apart
+    section(f"Figures: {title}", inputs=[path for path, _ in paths])(render)
+    SECTIONS[render.__name__].source += repr(figures)
+
+
+for _title, _figures in FIGURES.items():
+    _figure_section(_title, _figures)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the Markdown / HTML report with cached sections')
+    parser.add_argument('--format', default=','.join(FORMATS), help='comma-separated: md,html')
+    parser.add_argument('--out', default=REPORT_DIR)
+    parser.add_argument('--force', action='store_true', help='rebuild every section')
+    args = parser.parse_args()
+
+    formats = [fmt.strip() for fmt in args.format.split(',') if fmt.strip()]
+    unknown = sorted(set(formats) - set(FORMATS))
+    if unknown:
+        parser.error(f"unknown format(s) {unknown}; choose from {list(FORMATS)}")
+
+    print("="*80)
+    print("ANALYSIS REPORT")
+    print("="*80)
+
+    start = time.perf_counter()
+    stats = build_report(args.out, formats, args.force)
+    for name, status, seconds, changed in stats:
+        reason = f" ({', '.join(os.path.basename(path) for path in changed)} changed)" if changed else ""
+        print(f"  {'✓' if status == 'cached' else '↻'} {name:32s} {status:8s} {seconds * 1000:7.1f} ms{reason}")
+
+    rebuilt = sum(status == 'rebuilt' for _, status, _, _ in stats)
+    print(f"\n✓ {rebuilt} of {len(stats)} sections rebuilt in {time.perf_counter() - start:.2f}s")
+    for fmt in formats:
+        print(f"✓ Saved report to: {os.path.join(args.out, f'report.{fmt}')}")
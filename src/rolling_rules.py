@@ -0,0 +1,173 @@
+"""
+Rolling-window association rules
+Pair and item counts for a trailing window of days, maintained by adding the
+newest day and subtracting the expired one, so a daily refresh costs one
+day of baskets instead of the whole window
+
+Usage:
+    python rolling_rules.py                          # last 28 days of the processed data
+    python rolling_rules.py --window 28 --all-days   # rules for every day, written to CSV
+"""
+
+import argparse
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from itemsets import basket_incidence, count_itemsets
+
+PROCESSED_PATH = '../data/processed/processed_bakery_data.csv'
+ROLLING_RULES_PATH = '../data/processed/rolling_rules.csv'
+
+WINDOW_DAYS = 28
+MIN_SUPPORT = 0.01
+MIN_CONFIDENCE = 0.1
+
+
+class DayCounts:
+    """Basket, item and pair counts of one trading day, in item codes."""
+
+    def __init__(self, date, baskets, item_codes, item_counts, pair_rows, pair_cols, pair_counts):
+        self.date = date
+        self.baskets = baskets
+        self.item_codes = item_codes
+        self.item_counts = item_counts
+        self.pair_rows = pair_rows
+        self.pair_cols = pair_cols
+        self.pair_counts = pair_counts
+
+
+class RollingRules:
+    """
+    Association rules over a trailing window of `window` calendar days.
+
+    Item and pair totals are dense arrays indexed by item code, which grow
+    when a new product shows up. add_day touches only the pairs of the day
+    that enters and the day that leaves the window. Pair totals take
+    n_items² integers, which is small for a bakery catalogue (a few hundred
+    products).
+    """
+
+    def __init__(self, window=WINDOW_DAYS):
+        self.window = pd.Timedelta(days=window)
+        self.codes = {}
+        self.items = []
+        self.days = deque()
+        self.baskets = 0
+        self.item_totals = np.zeros(0, dtype=np.int64)
+        self.pair_totals = np.zeros((0, 0), dtype=np.int64)
+
+    def _encode(self, names):
+        """Item codes for names, registering unseen items."""
+        new = [name for name in pd.unique(names) if name not in self.codes]
+        if new:
+            for name in new:
+                self.codes[name] = len(self.items)
+                self.items.append(name)
+            grow = len(new)
+            self.item_totals = np.pad(self.item_totals, (0, grow))
+            self.pair_totals = np.pad(self.pair_totals, ((0, grow), (0, grow)))
+        return np.array([self.codes[name] for name in names], dtype=np.int64)
+
+    def day_counts(self, date, lines, txn_col='Transaction', item_col='Item'):
+        """Counts of one day's line items (any order, duplicates allowed)."""
+        day_items = pd.Index(sorted(lines[item_col].unique()))
+        B = basket_incidence(lines, day_items, txn_col, item_col)
+        codes = self._encode(day_items)
+        pairs = count_itemsets(B.indptr, B.indices, len(day_items), 2).tocoo()
+        return DayCounts(pd.Timestamp(date), B.shape[0], codes, np.asarray(B.sum(axis=0)).ravel(),
+                         codes[pairs.row], codes[pairs.col], pairs.data)
+
+    def _apply(self, day, sign):
+        self.baskets += sign * day.baskets
+        np.add.at(self.item_totals, day.item_codes, sign * day.item_counts)
+        # Pairs are stored in both orientations so rules can be read in either direction
+        np.add.at(self.pair_totals, (day.pair_rows, day.pair_cols), sign * day.pair_counts)
+        np.add.at(self.pair_totals, (day.pair_cols, day.pair_rows), sign * day.pair_counts)
+
+    def add_day(self, date, lines, txn_col='Transaction', item_col='Item'):
+        """
+        Slide the window forward to `date` with that day's line items.
+
+        Days older than the window are subtracted. Days must arrive in
+        date order.
+        """
+        day = self.day_counts(date, lines, txn_col, item_col)
+        if self.days and day.date <= self.days[-1].date:
+            raise ValueError(f"days must be added in order: {day.date.date()} after {self.days[-1].date.date()}")
+        self._apply(day, +1)
+        self.days.append(day)
+        while self.days and self.days[0].date <= day.date - self.window:
+            self._apply(self.days.popleft(), -1)
+
+    def rules(self, min_support=MIN_SUPPORT, min_confidence=MIN_CONFIDENCE, min_lift=0.0):
+        """
+        Rules Antecedent → Consequent for the current window, by lift.
+
+        Support is the share of the window's baskets containing both items,
+        Confidence P(consequent | antecedent) and Lift the confidence over the
+        consequent's own basket share.
+        """
+        columns = ['Antecedent', 'Consequent', 'Baskets', 'Support', 'Confidence', 'Lift']
+        if self.baskets == 0:
+            return pd.DataFrame(columns=columns)
+
+        antecedent, consequent = np.nonzero(self.pair_totals)
+        together = self.pair_totals[antecedent, consequent]
+        support = together / self.baskets
+        confidence = together / self.item_totals[antecedent]
+        lift = confidence / (self.item_totals[consequent] / self.baskets)
+
+        keep = (support >= min_support) & (confidence >= min_confidence) & (lift >= min_lift)
+        items = np.asarray(self.items, dtype=object)
+        rules = pd.DataFrame({
+            'Antecedent': items[antecedent[keep]],
+            'Consequent': items[consequent[keep]],
+            'Baskets': together[keep],
+            'Support': support[keep],
+            'Confidence': confidence[keep],
+            'Lift': lift[keep]
+        }, columns=columns)
+        return rules.sort_values(['Lift', 'Baskets', 'Antecedent', 'Consequent'],
+                                 ascending=[False, False, True, True]).reset_index(drop=True)
+
+
+def daily_rules(bakery_df, window=WINDOW_DAYS, **thresholds):
+    """Yield (date, rules) for every trading day, refreshing the window incrementally."""
+    engine = RollingRules(window)
+    dates = pd.to_datetime(bakery_df['DateTime']).dt.normalize()
+    for date, lines in bakery_df.groupby(dates, sort=True):
+        engine.add_day(date, lines)
+        yield date, engine.rules(**thresholds)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Association rules over a trailing window of days')
+    parser.add_argument('--window', type=int, default=WINDOW_DAYS, help='window length in days')
+    parser.add_argument('--min-support', type=float, default=MIN_SUPPORT)
+    parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE)
+    parser.add_argument('--all-days', action='store_true', help=f'write every day\'s rules to {ROLLING_RULES_PATH}')
+    args = parser.parse_args()
+
+    print("="*80)
+    print(f"ROLLING {args.window}-DAY ASSOCIATION RULES")
+    print("="*80)
+
+    bakery_df = pd.read_csv(PROCESSED_PATH, usecols=['Transaction', 'Item', 'DateTime'])
+    thresholds = dict(min_support=args.min_support, min_confidence=args.min_confidence)
+
+    history = []
+    for date, rules in daily_rules(bakery_df, args.window, **thresholds):
+        if args.all_days:
+            history.append(rules.assign(Date=date.date()))
+
+    print(f"\nWindow ending {date.date()}: {len(rules):,} rules "
+          f"(support ≥ {args.min_support:.0%}, confidence ≥ {args.min_confidence:.0%})")
+    for _, rule in rules.head(15).iterrows():
+        print(f"  {rule['Antecedent'][:20]:20s} → {rule['Consequent'][:20]:20s}: "
+              f"lift {rule['Lift']:.2f}, confidence {rule['Confidence']:.0%}, support {rule['Support']:.1%}")
+
+    if args.all_days:
+        pd.concat(history, ignore_index=True).to_csv(ROLLING_RULES_PATH, index=False)
+        print(f"\n✓ Saved daily rules to: {ROLLING_RULES_PATH}")
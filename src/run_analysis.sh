@@ -16,5 +16,9 @@ for script in 0*.py; do
     echo
 done
 
+echo "Building report..."
+python3 report.py
+echo
+
 echo "===================================="
 echo "Pipeline completed successfully!"
@@ -0,0 +1,49 @@
+"""
+Product sequencing
+Where each item sits within its basket, for the whole catalogue at once
+"""
+
+import numpy as np
+import pandas as pd
+
+from baskets import Baskets
+
+
+def basket_positions(df, txn_col='Transaction', item_col='Item'):
+    """
+    0-based position of every line item within its basket.
+
+    Lines are in basket order (stably sorted by transaction, a no-op for
+    till exports), so the order of lines inside a basket is the order of the
+    input rows (the till order in the raw export).
+    """
+    baskets = Baskets.from_lines(df, txn_col, item_col)
+    return pd.DataFrame({
+        'Item': baskets.names(),
+        'Position': baskets.positions()
+    }, index=df.index if baskets.order is None else df.index[baskets.order])
+
+
+def sequencing_profile(df, max_position=3, txn_col='Transaction', item_col='Item'):
+    """
+    Basket position histogram, entry rate and add-on rate for every item.
+
+    Columns Pos1 .. Pos{max_position}+ count how often the item was bought
+    in each position (the last bucket collects everything from max_position
+    on). EntryRate is the share of the item's lines that opened a basket and
+    AddOnRate the share that came later, both in percent. Sorted by total
+    lines sold.
+    """
+    positions = basket_positions(df, txn_col, item_col)
+    item_codes, items = pd.factorize(positions['Item'], sort=True)
+    bucket = np.minimum(positions['Position'].to_numpy(), max_position - 1)
+
+    histogram = np.bincount(item_codes * max_position + bucket,
+                            minlength=len(items) * max_position).reshape(len(items), max_position)
+    columns = [f'Pos{i + 1}' for i in range(max_position - 1)] + [f'Pos{max_position}+']
+
+    profile = pd.DataFrame(histogram, index=pd.Index(items, name='Item'), columns=columns)
+    profile.insert(0, 'Total', histogram.sum(axis=1))
+    profile['EntryRate'] = profile['Pos1'] / profile['Total'] * 100
+    profile['AddOnRate'] = 100 - profile['EntryRate']
+    return profile.sort_values('Total', ascending=False, kind='stable')
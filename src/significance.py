@@ -0,0 +1,291 @@
+"""
+Significance of the surprising findings
+Permutation tests, bootstrap confidence intervals and multiple-comparison
+correction for the findings quoted in 06 (weekend morning boom, afternoon
+slump, Sunday basket premium, Monday morning peak)
+
+Every finding is a ratio effect over trading days, registered with
+@finding like the KPIs of kpis.py:
+
+    contrast  the cohort's per-day rate over the reference's, minus 1, e.g.
+              weekend vs weekday morning transactions; the null shuffles the
+              day labels between the two cohorts
+    paired    two measurements of the same days, e.g. 5 PM vs peak hour
+              transactions; the null swaps the two within random days
+
+Permutations are drawn in batches as (batch × days) label matrices, so one
+matrix product per batch gives the statistic of every permutation; there
+is no Python loop per permutation. Confidence intervals are percentile
+bootstraps over days drawn the same way (multinomial day weights).
+
+Usage:
+    python significance.py
+    python significance.py --permutations 100000 --correction bh
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from contrasts import day_table
+from kpis import DEAD_ZONE_HOUR, MORNING_HOURS, SLUMP_HOURS
+from traffic_cube import TrafficCube, SLOTS_PER_HOUR
+
+PERMUTATIONS = 10_000
+BATCH = 2_000
+CONFIDENCE = 0.95
+ALPHA = 0.05
+SEED = 42
+
+REGISTRY = {}
+
+
+class Finding:
+    """A registered finding: its label and the function building its test inputs."""
+
+    def __init__(self, name, func, label):
+        self.name = name
+        self.func = func
+        self.label = label
+
+
+def finding(label):
+    """
+    Register a function of (days, traffic) as a finding named after it.
+
+    The function returns contrast(...) or paired(...) over the cube rows;
+    days is the contrasts.day_table of the cube.
+    """
+    def register(func):
+        if func.__name__ in REGISTRY:
+            raise ValueError(f"finding {func.__name__!r} is already defined")
+        REGISTRY[func.__name__] = Finding(func.__name__, func, label)
+        return func
+    return register
+
+
+def contrast(numerator, denominator, cohort, reference):
+    """Test inputs of sum(numerator)/sum(denominator) in cohort vs reference days."""
+    return {'kind': 'contrast', 'numerator': numerator, 'denominator': denominator,
+            'cohort': np.asarray(cohort, dtype=bool), 'reference': np.asarray(reference, dtype=bool)}
+
+
+def paired(measured, baseline, days=None):
+    """Test inputs of sum(measured)/sum(baseline) over the same days (all by default)."""
+    days = np.ones(len(measured), dtype=bool) if days is None else np.asarray(days, dtype=bool)
+    return {'kind': 'paired', 'measured': measured, 'baseline': baseline, 'days': days}
+
+
+# ============================================================================
+# VECTORIZED TESTS
+# ============================================================================
+
+def _batches(total, batch):
+    while total > 0:
+        yield min(batch, total)
+        total -= batch
+
+
+def _ratio(num_a, den_a, num_b, den_b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (num_a / den_a) / (num_b / den_b) - 1
+
+
+def contrast_effect(numerator, denominator, labels):
+    """Effect of every row of a (k × days) 0/1 label matrix against its complement."""
+    num_a, den_a = labels @ numerator, labels @ denominator
+    return _ratio(num_a, den_a, numerator.sum() - num_a, denominator.sum() - den_a)
+
+
+def paired_effect(measured, baseline, swaps):
+    """Effect of every row of a (k × days) 0/1 swap matrix (1 = measurements exchanged)."""
+    difference = baseline - measured
+    shift = swaps @ difference
+    return _ratio(measured.sum() + shift, 1, baseline.sum() - shift, 1)
+
+
+def permutation_test(spec, permutations=PERMUTATIONS, rng=None, batch=BATCH):
+    """
+    Observed effect and two-sided permutation p-value of one finding.
+
+    p = (1 + #{|permuted effect| >= |observed|}) / (1 + permutations), so it
+    is never 0 and is exact in expectation.
+    """
+    rng = rng or np.random.default_rng(SEED)
+    if spec['kind'] == 'contrast':
+        population = spec['cohort'] | spec['reference']
+        numerator = spec['numerator'][population].astype(np.float64)
+        denominator = spec['denominator'][population].astype(np.float64)
+        labels = spec['cohort'][population].astype(np.float64)
+        observed = contrast_effect(numerator, denominator, labels)
+        draw = lambda size: contrast_effect(numerator, denominator, rng.permuted(np.tile(labels, (size, 1)), axis=1))
+    else:
+        measured = spec['measured'][spec['days']].astype(np.float64)
+        baseline = spec['baseline'][spec['days']].astype(np.float64)
+        observed = paired_effect(measured, baseline, np.zeros(len(measured)))
+        draw = lambda size: paired_effect(measured, baseline, rng.integers(0, 2, (size, len(measured))).astype(np.float64))
+
+    extreme = 0
+    for size in _batches(permutations, batch):
+        extreme += np.count_nonzero(np.abs(draw(size)) >= abs(observed) - 1e-12)
+    return float(observed), (1 + extreme) / (1 + permutations)
+
+
+def _bootstrap_weights(rng, n, size):
+    """(size × n) multinomial resampling counts of n days."""
+    return rng.multinomial(n, np.full(n, 1 / n), size=size).astype(np.float64)
+
+
+def bootstrap_ci(spec, resamples=PERMUTATIONS, confidence=CONFIDENCE, rng=None, batch=BATCH):
+    """Percentile bootstrap interval of a finding's effect, resampling days (within each cohort)."""
+    rng = rng or np.random.default_rng(SEED)
+    effects = []
+    for size in _batches(resamples, batch):
+        if spec['kind'] == 'contrast':
+            sums = []
+            for mask in (spec['cohort'], spec['reference']):
+                weights = _bootstrap_weights(rng, int(mask.sum()), size)
+                sums.append((weights @ spec['numerator'][mask], weights @ spec['denominator'][mask]))
+            (num_a, den_a), (num_b, den_b) = sums
+            effects.append(_ratio(num_a, den_a, num_b, den_b))
+        else:
+            days = spec['days']
+            weights = _bootstrap_weights(rng, int(days.sum()), size)
+            effects.append(_ratio(weights @ spec['measured'][days], 1, weights @ spec['baseline'][days], 1))
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.nanpercentile(np.concatenate(effects), [tail, 100 - tail])
+    return float(low), float(high)
+
+
+# ============================================================================
+# MULTIPLE COMPARISONS
+# ============================================================================
+
+def holm(p_values):
+    """Holm-Bonferroni adjusted p-values (family-wise error rate)."""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    m = len(p_values)
+    order = np.argsort(p_values)
+    adjusted = np.minimum(np.maximum.accumulate((m - np.arange(m)) * p_values[order]), 1)
+    result = np.empty(m)
+    result[order] = adjusted
+    return result
+
+
+def benjamini_hochberg(p_values):
+    """Benjamini-Hochberg adjusted p-values (false discovery rate)."""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    m = len(p_values)
+    order = np.argsort(p_values)
+    scaled = p_values[order] * m / np.arange(1, m + 1)
+    adjusted = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1)
+    result = np.empty(m)
+    result[order] = adjusted
+    return result
+
+
+CORRECTIONS = {'holm': holm, 'bh': benjamini_hochberg}
+
+
+def test_findings(traffic, registry=None, permutations=PERMUTATIONS, correction='holm', seed=SEED):
+    """
+    Test every registered finding on one traffic cube.
+
+    Returns one row per finding: Name, Label, Effect, CILow, CIHigh,
+    PValue, PAdjusted (with `correction`) and Significant (PAdjusted < ALPHA).
+    """
+    registry = REGISTRY if registry is None else registry
+    days = day_table(traffic.dates)
+    rng = np.random.default_rng(seed)
+    rows = []
+    for name, item in registry.items():
+        spec = item.func(days, traffic)
+        effect, p_value = permutation_test(spec, permutations, rng)
+        low, high = bootstrap_ci(spec, permutations, rng=rng)
+        rows.append({'Name': name, 'Label': item.label, 'Effect': effect,
+                     'CILow': low, 'CIHigh': high, 'PValue': p_value})
+    table = pd.DataFrame(rows)
+    table['PAdjusted'] = CORRECTIONS[correction](table['PValue'])
+    table['Significant'] = table['PAdjusted'] < ALPHA
+    return table
+
+
+# ============================================================================
+# FINDINGS
+# ============================================================================
+
+def _window(traffic, hours):
+    start, end = hours
+    return traffic.transactions[:, start * SLOTS_PER_HOUR:end * SLOTS_PER_HOUR].sum(axis=1)
+
+
+@finding('Weekend morning lift (transactions per day)')
+def weekend_morning_lift(days, traffic):
+    morning = _window(traffic, MORNING_HOURS)
+    return contrast(morning, morning > 0, days['IsWeekend'], ~days['IsWeekend'])
+
+
+@finding('Weekend basket size premium')
+def weekend_basket_premium(days, traffic):
+    return contrast(traffic.items.sum(axis=1), traffic.transactions.sum(axis=1),
+                    days['IsWeekend'], ~days['IsWeekend'])
+
+
+@finding('Sunday basket premium vs Friday')
+def sunday_basket_premium(days, traffic):
+    return contrast(traffic.items.sum(axis=1), traffic.transactions.sum(axis=1),
+                    days['DayName'] == 'Sunday', days['DayName'] == 'Friday')
+
+
+@finding('Monday morning premium vs Tue-Fri (per day)')
+def monday_morning_premium(days, traffic):
+    morning = _window(traffic, MORNING_HOURS)
+    return contrast(morning, np.ones(len(morning)),
+                    days['DayOfWeek'] == 0, days['DayOfWeek'].between(1, 4))
+
+
+@finding('Dead zone (5 PM) vs peak hour')
+def dead_zone_drop(days, traffic):
+    hourly = traffic.hourly('transactions')
+    peak = int(np.argmax(hourly.sum(axis=0)))
+    return paired(hourly[:, DEAD_ZONE_HOUR], hourly[:, peak])
+
+
+@finding('Afternoon slump (4-6 PM) vs peak hour')
+def afternoon_slump(days, traffic):
+    hourly = traffic.hourly('transactions')
+    peak = int(np.argmax(hourly.sum(axis=0)))
+    start, end = SLUMP_HOURS
+    return paired(hourly[:, start:end].mean(axis=1), hourly[:, peak])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Permutation tests of the surprising findings')
+    parser.add_argument('--permutations', type=int, default=PERMUTATIONS)
+    parser.add_argument('--correction', default='holm', choices=sorted(CORRECTIONS))
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args()
+
+    print("="*80)
+    print("SIGNIFICANCE OF SURPRISING FINDINGS")
+    print("="*80)
+
+    try:
+        traffic = TrafficCube.load()
+    except FileNotFoundError as e:
+        print(f"✗ Error: {e.filename} not found")
+        print("  Please run 00b_data_processing.py first")
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    table = test_findings(traffic, permutations=args.permutations, correction=args.correction, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.permutations:,} permutations and bootstrap resamples per finding, "
+          f"{args.correction} correction, {elapsed:.1f} s\n")
+    for row in table.itertuples(index=False):
+        mark = '✓' if row.Significant else '✗'
+        print(f"  {mark} {row.Label:45s}: {row.Effect:+6.1%} "
+              f"[{row.CILow:+6.1%}, {row.CIHigh:+6.1%}]  p = {row.PValue:.4f}  adjusted = {row.PAdjusted:.4f}")
@@ -0,0 +1,223 @@
+"""
+Synthetic Transaction Generator
+Seeded generator reproducing the marginals of the Bread Basket export
+(item popularity, basket sizes, weekday/hour profile, coffee pairing)
+at arbitrary scale, for benchmarking the pipeline
+
+Usage:
+    python synthetic.py --scale 10 --out ../data/synthetic/bakery_x10.csv
+    python synthetic.py --scale 1 --outlets 25 --out ../data/synthetic/chain
+"""
+
+import argparse
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from ingest import parse_export_datetime
+
+RAW_PATH = '../data/raw/BreadBasket_DMS.csv'
+RAW_COLUMNS = ['TransactionNo', 'Items', 'DateTime', 'Daypart', 'DayType']
+
+# Basket sizes above this are pooled when estimating the coffee rate
+MAX_MODELLED_SIZE = 8
+# Upper bound on the baskets generated at once, whatever the scale
+CHUNK_BASKETS = 50_000
+# Bumped whenever the same seed starts producing different data, so cached
+# benchmark trees are regenerated
+GENERATOR_VERSION = 2
+
+SyntheticProfile = namedtuple('SyntheticProfile', [
+    'items',                 # item names as spelled in the raw export
+    'anchor_code',           # index of the anchor (coffee) item in `items`
+    'size_values',           # observed basket sizes
+    'size_probs',            # basket size distribution
+    'anchor_rate',           # P(anchor in basket | size), indexed by size
+    'probs_with_anchor',     # distribution of the other lines in anchor baskets
+    'probs_without_anchor',  # item distribution in baskets without the anchor
+    'weekday_factor',        # baskets per weekday relative to the daily mean
+    'hour_cdf',              # 7 × 24 cumulative hour distribution per weekday
+    'baskets_per_day',       # mean baskets per trading day
+    'trading_days',          # number of distinct trading days observed
+    'start_date'             # first trading day
+])
+
+
+def fit_profile(raw_df, anchor='Coffee'):
+    """Estimate the generator's marginal distributions from a raw export."""
+    raw_df = raw_df[raw_df['Items'].str.upper() != 'NONE']
+    timestamps = parse_export_datetime(raw_df['DateTime'], raw_df.get('DayType'))
+    item_codes, items = pd.factorize(raw_df['Items'], sort=True)
+    txn_codes, _ = pd.factorize(raw_df['TransactionNo'], sort=True)
+    anchor_code = items.get_loc(anchor)
+
+    baskets = pd.DataFrame({
+        'Size': np.bincount(txn_codes),
+        'HasAnchor': np.bincount(txn_codes, weights=item_codes == anchor_code) > 0
+    })
+    first_line = np.unique(txn_codes, return_index=True)[1]
+    baskets['DateTime'] = timestamps.to_numpy()[first_line]
+
+    size_counts = baskets['Size'].value_counts().sort_index()
+    pooled_size = baskets['Size'].clip(upper=MAX_MODELLED_SIZE)
+    rate_by_size = baskets.groupby(pooled_size)['HasAnchor'].mean()
+    anchor_rate = rate_by_size.reindex(np.arange(size_counts.index.max() + 1)).ffill().fillna(0).to_numpy()
+
+    # In anchor baskets one anchor line is generated explicitly; the remaining
+    # lines (including repeat anchor lines) follow probs_with_anchor
+    line_has_anchor = baskets['HasAnchor'].to_numpy()[txn_codes]
+    with_anchor = np.bincount(item_codes[line_has_anchor], minlength=len(items)).astype(float)
+    with_anchor[anchor_code] -= baskets['HasAnchor'].sum()
+    without_anchor = np.bincount(item_codes[~line_has_anchor], minlength=len(items)).astype(float)
+
+    dates = baskets['DateTime'].dt.normalize()
+    weekday = baskets['DateTime'].dt.dayofweek
+    per_weekday = baskets.groupby(weekday).size() / dates.groupby(weekday).nunique()
+    baskets_per_day = len(baskets) / dates.nunique()
+
+    hour_counts = pd.crosstab(weekday, baskets['DateTime'].dt.hour).reindex(
+        index=range(7), columns=range(24), fill_value=0).to_numpy().astype(float)
+    hour_counts[hour_counts.sum(axis=1) == 0] = hour_counts.sum(axis=0)
+
+    return SyntheticProfile(
+        items=np.asarray(items),
+        anchor_code=anchor_code,
+        size_values=size_counts.index.to_numpy(),
+        size_probs=(size_counts / size_counts.sum()).to_numpy(),
+        anchor_rate=anchor_rate,
+        probs_with_anchor=with_anchor / with_anchor.sum(),
+        probs_without_anchor=without_anchor / without_anchor.sum(),
+        weekday_factor=(per_weekday.reindex(range(7)).fillna(per_weekday.mean()) / baskets_per_day).to_numpy(),
+        hour_cdf=np.cumsum(hour_counts / hour_counts.sum(axis=1, keepdims=True), axis=1),
+        baskets_per_day=baskets_per_day,
+        trading_days=dates.nunique(),
+        start_date=dates.min()
+    )
+
+
+def _daypart(hours):
+    """Daypart labels as used in the raw export."""
+    return np.select([hours < 12, hours < 17, hours < 21], ['Morning', 'Afternoon', 'Evening'], 'Night')
+
+
+def generate_days(profile, rng, day_offsets, baskets_per_day, first_txn=1):
+    """
+    Line items for a block of consecutive trading days, in raw export schema.
+
+    Everything is drawn with vectorized numpy calls over all baskets of the
+    block; transaction numbers increase with time starting at first_txn.
+    """
+    days = profile.start_date + pd.to_timedelta(day_offsets, unit='D')
+    weekday = days.dayofweek.to_numpy()
+    n_per_day = rng.poisson(baskets_per_day * profile.weekday_factor[weekday])
+
+    basket_day = np.repeat(np.arange(len(days)), n_per_day)
+    basket_weekday = weekday[basket_day]
+    n_baskets = len(basket_day)
+
+    u = rng.random(n_baskets)
+    hour = (u[:, None] > profile.hour_cdf[basket_weekday]).sum(axis=1).clip(max=23)
+    seconds = hour * 3600 + rng.integers(0, 3600, size=n_baskets)
+    order = np.lexsort((seconds, basket_day))
+    basket_day, hour, seconds = basket_day[order], hour[order], seconds[order]
+    basket_time = days.to_numpy()[basket_day] + seconds.astype('timedelta64[s]')
+
+    sizes = rng.choice(profile.size_values, size=n_baskets, p=profile.size_probs)
+    rate = profile.anchor_rate[np.minimum(sizes, len(profile.anchor_rate) - 1)]
+    has_anchor = rng.random(n_baskets) < rate
+
+    line_basket = np.repeat(np.arange(n_baskets), sizes)
+    line_position = np.arange(len(line_basket)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    n_items = len(profile.items)
+    with_anchor = rng.choice(n_items, size=len(line_basket), p=profile.probs_with_anchor)
+    without_anchor = rng.choice(n_items, size=len(line_basket), p=profile.probs_without_anchor)
+    line_anchor = has_anchor[line_basket]
+    item_code = np.where(line_anchor, with_anchor, without_anchor)
+    # The anchor line goes anywhere in its basket, not always first
+    anchor_position = rng.integers(0, sizes)
+    item_code[line_anchor & (line_position == anchor_position[line_basket])] = profile.anchor_code
+
+    line_weekday = basket_weekday[order][line_basket]
+    return pd.DataFrame({
+        'TransactionNo': first_txn + line_basket,
+        'Items': profile.items[item_code],
+        'DateTime': pd.DatetimeIndex(basket_time[line_basket]).strftime('%Y-%m-%d %H:%M:%S'),
+        'Daypart': _daypart(hour)[line_basket],
+        'DayType': np.where(line_weekday >= 5, 'Weekend', 'Weekday')
+    })
+
+
+def write_outlet(path, profile, rng, scale=1.0, days=None, chunk_days=28, chunk_baskets=CHUNK_BASKETS):
+    """
+    Stream one outlet's synthetic export to `path`, chunk_days at a time.
+
+    Daily volume is set so the file holds roughly `scale` times the baskets of
+    the profiled export over `days` trading days (default: as many as the
+    original). Chunks are shortened so the busiest days of a chunk stay within
+    chunk_baskets, keeping memory flat as the scale grows. Returns (lines,
+    transactions) written.
+    """
+    days = days or profile.trading_days
+    baskets_per_day = profile.baskets_per_day * scale * profile.trading_days / days
+    busiest_day = baskets_per_day * profile.weekday_factor.max()
+    chunk_days = max(1, min(chunk_days, int(chunk_baskets // max(busiest_day, 1))))
+
+    next_txn, lines = 1, 0
+    for chunk_start in range(0, days, chunk_days):
+        offsets = np.arange(chunk_start, min(chunk_start + chunk_days, days))
+        chunk = generate_days(profile, rng, offsets, baskets_per_day, first_txn=next_txn)
+        chunk.to_csv(path, mode='w' if chunk_start == 0 else 'a', header=chunk_start == 0, index=False)
+        if len(chunk):
+            next_txn = chunk['TransactionNo'].iloc[-1] + 1
+        lines += len(chunk)
+    return lines, next_txn - 1
+
+
+def generate(out, scale=1.0, outlets=1, days=None, seed=42, raw_path=RAW_PATH, chunk_days=28,
+             chunk_baskets=CHUNK_BASKETS):
+    """
+    Write a synthetic dataset.
+
+    With one outlet `out` is a CSV path; with several it is a directory that
+    receives outlet_001.csv, outlet_002.csv, ... each with an independent
+    random stream derived from `seed`.
+    """
+    profile = fit_profile(pd.read_csv(raw_path))
+    streams = np.random.SeedSequence(seed).spawn(outlets)
+
+    if outlets == 1:
+        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+        targets = [out]
+    else:
+        os.makedirs(out, exist_ok=True)
+        targets = [os.path.join(out, f'outlet_{i:03d}.csv') for i in range(1, outlets + 1)]
+
+    totals = []
+    for target, stream in zip(targets, streams):
+        totals.append(write_outlet(target, profile, np.random.default_rng(stream),
+                                   scale=scale, days=days, chunk_days=chunk_days,
+                                   chunk_baskets=chunk_baskets))
+    return targets, totals
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic bakery transactions')
+    parser.add_argument('--scale', type=float, default=1.0, help='volume relative to the real export, per outlet')
+    parser.add_argument('--outlets', type=int, default=1, help='number of outlets (one CSV each)')
+    parser.add_argument('--days', type=int, default=None, help='trading days (default: same as the real export)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--raw', default=RAW_PATH, help='raw export to profile')
+    parser.add_argument('--out', default='../data/synthetic/BreadBasket_synthetic.csv')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("SYNTHETIC TRANSACTION GENERATOR")
+    print("="*80)
+    print(f"Scale: {args.scale:g}x  Outlets: {args.outlets}  Seed: {args.seed}")
+
+    targets, totals = generate(args.out, scale=args.scale, outlets=args.outlets,
+                               days=args.days, seed=args.seed, raw_path=args.raw)
+    for target, (lines, txns) in zip(targets, totals):
+        print(f"✓ {target}: {lines:,} lines, {txns:,} transactions")
@@ -0,0 +1,104 @@
+"""
+Transaction-level summaries
+One row per basket, built from the basket runs of the line items (no groupby)
+"""
+
+import numpy as np
+import pandas as pd
+
+from baskets import Baskets
+from pricing import basket_values
+
+
+def transaction_summary(df, txn_col='Transaction', item_col='Item'):
+    """
+    Per-transaction summary table.
+
+    BasketSize counts line items, DistinctItems counts unique products and
+    FirstItem is the first line of the basket in input order, kept as a
+    categorical so it is stored as an integer item code. QuarterHour is the
+    15-minute bucket of the basket timestamp, in the same units as 00b.
+    With a Price column (pricing.add_prices), BasketValue is the revenue of
+    the basket; unpriced lines count 0.
+    """
+    baskets = Baskets.from_lines(df, txn_col, item_col)
+    timestamps = df['DateTime']
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps)
+    summary = pd.DataFrame({
+        'BasketSize': baskets.sizes,
+        'DistinctItems': np.diff(baskets.incidence().indptr).astype(np.int64),
+        'FirstItem': pd.Categorical.from_codes(baskets.codes[baskets.offsets[:-1]], baskets.items),
+        'DateTime': baskets.first(timestamps.to_numpy())
+    }, index=pd.Index(baskets.txn_ids, name=txn_col))
+    summary['QuarterHour'] = (summary['DateTime'].dt.hour * 4 + summary['DateTime'].dt.minute // 15) / 4
+    if 'Price' in df.columns:
+        summary['BasketValue'] = basket_values(baskets, df['Price'].to_numpy())
+    return summary
+
+
+def entry_product_metrics(summary):
+    """
+    Basket metrics for every entry product (the first item of a basket).
+
+    One groupby over the transaction summary; sorted by number of baskets
+    the product opens.
+    """
+    metrics = summary.assign(IsMultiItem=summary['BasketSize'] > 1).groupby('FirstItem', observed=True).agg(
+        Baskets=('BasketSize', 'size'),
+        AvgBasketSize=('BasketSize', 'mean'),
+        AvgDistinctItems=('DistinctItems', 'mean'),
+        MultiItemRate=('IsMultiItem', 'mean')
+    )
+    metrics.index = metrics.index.astype(str)
+    metrics.index.name = 'Item'
+    return metrics.sort_values('Baskets', ascending=False)
+
+
+TRANSACTIONS_PATH = '../data/processed/transactions.csv'
+COFFEE_ITEM = 'COFFEE'
+
+
+def build_transactions(df, txn_col='Transaction', item_col='Item', coffee_item=COFFEE_ITEM):
+    """
+    Materialised per-transaction table shared by all stages.
+
+    Extends transaction_summary() with calendar fields, a coffee flag and a
+    weekend flag so basket-level questions become a groupby over one row per
+    basket instead of one row per line item.
+    """
+    summary = transaction_summary(df, txn_col, item_col)
+    has_coffee = (df[item_col] == coffee_item).groupby(df[txn_col]).any()
+
+    timestamps = summary['DateTime']
+    transactions = pd.DataFrame({
+        'Transaction': summary.index.to_numpy(),
+        'DateTime': timestamps.to_numpy(),
+        'Date': timestamps.dt.date.to_numpy(),
+        'Hour': timestamps.dt.hour.to_numpy(),
+        'QuarterHour': summary['QuarterHour'].to_numpy(),
+        'DayOfWeek': timestamps.dt.dayofweek.to_numpy(),
+        'DayName': timestamps.dt.day_name().to_numpy(),
+        'BasketSize': summary['BasketSize'].to_numpy(),
+        'DistinctItems': summary['DistinctItems'].to_numpy(),
+        'FirstItem': summary['FirstItem'].values,
+        'HasCoffee': has_coffee.reindex(summary.index).to_numpy(),
+        'IsWeekend': timestamps.dt.dayofweek.isin([5, 6]).to_numpy()
+    })
+    if 'BasketValue' in summary.columns:
+        transactions['BasketValue'] = summary['BasketValue'].to_numpy()
+    return transactions
+
+
+def save_transactions(transactions, path=TRANSACTIONS_PATH):
+    """Write the transaction table next to the processed line items."""
+    transactions.to_csv(path, index=False)
+
+
+def load_transactions(path=TRANSACTIONS_PATH):
+    """Read the transaction table written by 00b, restoring column types."""
+    transactions = pd.read_csv(path)
+    transactions['DateTime'] = pd.to_datetime(transactions['DateTime'])
+    transactions['Date'] = transactions['DateTime'].dt.date
+    transactions['FirstItem'] = transactions['FirstItem'].astype('category')
+    return transactions